@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+analytics.py – Glättung + Kennzahlen für alle Chart-Ansichten
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+Gemeinsam genutzt von ChartTile, FullScreenView und CSVGraphView:
+
+    ema(values, alpha)              exponentiell (wie bisher in den Tiles)
+    median_filter(values, size)     Ausreißer (RSSI-Spikes) weg
+    savgol(values, window, order)   Savitzky–Golay, Kanten bleiben scharf
+    smooth(values, mode, ...)       Auswahl per Name (FILTERS)
+    rolling(values, window)         gleitend min / max / mean
+    summary(values)                 n, last, min, max, mean, p5/p50/p95
+
+Mit numpy komplett vektorisiert (Millionen Punkte ohne Python-Schleife pro
+Wert), ohne numpy dieselben Ergebnisse über reine Python-Pfade (Listen).
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:       # Android-Build ohne numpy → reine Python-Pfade
+    np = None
+
+
+FILTERS = ("ema", "median", "savgol", "raw")
+PERCENTILES = (5, 50, 95)
+
+# EMA blockweise: (1-alpha)^-m darf höchstens e^_EMA_RANGE werden (Genauigkeit)
+_EMA_RANGE = math.log(1e8)
+
+
+def _arr(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def to_list(values):
+    return values.tolist() if np is not None and isinstance(values, np.ndarray) else list(values)
+
+
+# ------------------------------------------------------------
+# EMA
+# ------------------------------------------------------------
+def ema(values, alpha):
+    """
+    y[0] = x[0], y[i] = y[i-1] * (1 - alpha) + x[i] * alpha
+
+    Vektorisiert: Daten in Blöcke der Länge m; innerhalb eines Blocks per
+    cumsum (geschlossene Form), zwischen den Blöcken nur ein Übertrag pro
+    Block → Python-Schleife über n/m statt n Werte.
+    """
+    alpha = float(alpha)
+    if np is None:
+        out = []
+        last = None
+        for v in values:
+            last = float(v) if last is None else last * (1 - alpha) + float(v) * alpha
+            out.append(last)
+        return out
+
+    x = _arr(values)
+    n = len(x)
+    if n == 0 or alpha >= 1.0:
+        return x.copy()
+    if alpha <= 0.0:
+        return np.full(n, x[0])
+
+    d = 1.0 - alpha
+    m = max(1, min(n, int(_EMA_RANGE / -math.log(d))))
+    pad = (-n) % m
+    blocks = np.concatenate([x, np.zeros(pad)]).reshape(-1, m)
+
+    k = np.arange(m, dtype=np.float64)
+    # innerhalb des Blocks, Start bei 0: z[i] = d^i * Σ alpha * x[j] * d^-j
+    part = np.cumsum(blocks * (alpha * d ** -k), axis=1) * d ** k
+
+    # Übertrag: Zustand vor jedem Block (vor dem ersten = x[0] → y[0] = x[0])
+    carry = []
+    c = float(x[0])
+    dm = d ** m
+    for end in part[:, -1].tolist():
+        carry.append(c)
+        c = end + dm * c
+
+    out = part + np.asarray(carry)[:, None] * d ** (k + 1)
+    return out.ravel()[:n]
+
+
+# ------------------------------------------------------------
+# MEDIAN / SAVITZKY–GOLAY
+# ------------------------------------------------------------
+def median_filter(values, size=5):
+    """Zentrierter Median, Ränder mit dem Randwert aufgefüllt."""
+    size = max(1, int(size) | 1)
+    half = size // 2
+    if np is None:
+        vals = [float(v) for v in values]
+        if not vals:
+            return []
+        padded = [vals[0]] * half + vals + [vals[-1]] * half
+        return [sorted(padded[i:i + size])[half] for i in range(len(vals))]
+
+    x = _arr(values)
+    if len(x) == 0 or size == 1:
+        return x.copy()
+    padded = np.pad(x, half, mode="edge")
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, size), axis=1)
+
+
+def _savgol_coeffs(window, order):
+    half = window // 2
+    A = np.vander(np.arange(-half, half + 1, dtype=np.float64), order + 1, increasing=True)
+    # erste Zeile der Pseudoinversen = Wert des Polynoms in der Fenstermitte
+    return np.linalg.pinv(A)[0]
+
+
+def savgol(values, window=11, order=2):
+    """Savitzky–Golay (Polynom-Fit im gleitenden Fenster), Ränder wie median_filter."""
+    window = max(3, int(window) | 1)
+    order = max(0, min(int(order), window - 1))
+    if np is None:
+        # ohne numpy kein Least-Squares → gleitender Mittelwert als Näherung
+        return rolling(values, window, center=True)["mean"]
+
+    x = _arr(values)
+    if len(x) < window:
+        return x.copy()
+    half = window // 2
+    coeffs = _savgol_coeffs(window, order)
+    padded = np.pad(x, half, mode="edge")
+    return np.convolve(padded, coeffs[::-1], mode="valid")
+
+
+def smooth(values, mode="ema", alpha=0.25, size=5, window=11, order=2):
+    """Filter per Name (FILTERS); unbekannt/"raw" → unverändert."""
+    if mode == "ema":
+        return ema(values, alpha)
+    if mode == "median":
+        return median_filter(values, size)
+    if mode == "savgol":
+        return savgol(values, window, order)
+    return _arr(values) if np is not None else [float(v) for v in values]
+
+
+# ------------------------------------------------------------
+# ROLLING / SUMMARY
+# ------------------------------------------------------------
+def rolling(values, window, center=False):
+    """
+    Gleitend min / max / mean über window Werte → dict von Arrays (Länge n).
+    Der Anfang (bzw. bei center beide Ränder) nutzt die vorhandenen Werte.
+    """
+    window = max(1, int(window))
+    if np is None:
+        vals = [float(v) for v in values]
+        out = {"min": [], "max": [], "mean": []}
+        lo_off = window // 2 if center else window - 1
+        for i in range(len(vals)):
+            part = vals[max(0, i - lo_off):i - lo_off + window]
+            out["min"].append(min(part))
+            out["max"].append(max(part))
+            out["mean"].append(sum(part) / len(part))
+        return out
+
+    x = _arr(values)
+    n = len(x)
+    if n == 0:
+        return {"min": x.copy(), "max": x.copy(), "mean": x.copy()}
+
+    before = window // 2 if center else window - 1
+    after = window - 1 - before
+
+    csum = np.concatenate([[0.0], np.cumsum(x)])
+    idx = np.arange(n)
+    lo = np.maximum(0, idx - before)
+    hi = np.minimum(n, idx + after + 1)
+    mean = (csum[hi] - csum[lo]) / (hi - lo)
+
+    mn = np.lib.stride_tricks.sliding_window_view(
+        np.pad(x, (before, after), constant_values=np.inf), window).min(axis=1)
+    mx = np.lib.stride_tricks.sliding_window_view(
+        np.pad(x, (before, after), constant_values=-np.inf), window).max(axis=1)
+    return {"min": mn, "max": mx, "mean": mean}
+
+
+def summary(values, percentiles=PERCENTILES):
+    """Kennzahlen eines Buffers; nicht-endliche Werte zählen nicht → dict oder None."""
+    if np is None:
+        vals = sorted(float(v) for v in values if v is not None and math.isfinite(v))
+        if not vals:
+            return None
+        out = {
+            "n": len(vals),
+            "last": float(values[-1]),
+            "min": vals[0],
+            "max": vals[-1],
+            "mean": sum(vals) / len(vals),
+        }
+        for p in percentiles:
+            out[f"p{p}"] = vals[min(len(vals) - 1, int(round(p / 100 * (len(vals) - 1))))]
+        return out
+
+    x = _arr(values)
+    if len(x) == 0:
+        return None
+    last = float(x[-1])
+    x = x[np.isfinite(x)]
+    if len(x) == 0:
+        return None
+    out = {
+        "n": int(len(x)),
+        "last": last,
+        "min": float(x.min()),
+        "max": float(x.max()),
+        "mean": float(x.mean()),
+    }
+    if percentiles:
+        for p, v in zip(percentiles, np.percentile(x, percentiles)):
+            out[f"p{p}"] = float(v)
+    return out
+
+
+def main():
+    import time
+    rnd = np.random.default_rng(1) if np is not None else None
+    vals = (np.cumsum(rnd.normal(size=2_000_000)) if rnd is not None
+            else [math.sin(i / 50) for i in range(200_000)])
+
+    for name, fn in (
+        ("ema", lambda: ema(vals, 0.25)),
+        ("median5", lambda: median_filter(vals, 5)),
+        ("savgol11", lambda: savgol(vals, 11, 2)),
+        ("rolling60", lambda: rolling(vals, 60)),
+        ("summary", lambda: summary(vals)),
+    ):
+        t0 = time.perf_counter()
+        fn()
+        print(f"{name:10s} {len(vals)} Werte in {time.perf_counter() - t0:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@
 #  - adv_raw / log_raw / andere Devices bleiben unberührt
 
 import os
+import sys
 import json
 import asyncio
 from datetime import datetime, timezone
@@ -41,6 +42,11 @@ PROJECT_ROOT = os.path.abspath(os.path.join(BRIDGE_DIR, "..", ".."))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 OUTFILE = os.path.join(DATA_DIR, "ble_dump.json")
 
+# gemeinsamer Dump-Snapshot (ein Parse pro Dateiversion)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from dump_snapshot import get_snapshot
+
 # Bridge-Profile: data/bridge_profiles
 PROFILE_DIR = os.path.join(DATA_DIR, "bridge_profiles")
 
@@ -63,21 +69,26 @@ def _safe_load_dump():
       "<address>": { ... }
     }
     """
-    if not os.path.exists(OUTFILE):
+    snap = get_snapshot(OUTFILE)
+    if snap.sig is None:
         return {}
 
-    try:
-        with open(OUTFILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception:
-        return {}
+    if snap.valid:
+        data = snap.entries
+    else:
+        # kein List-Format → evtl. Dict-Format, direkt lesen
+        try:
+            with open(OUTFILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return {}
 
     # Neues Format: dict
     if isinstance(data, dict):
         return data
 
     # Altes Format: list → konvertieren
-    if isinstance(data, list):
+    if isinstance(data, (list, tuple)):
         devices = {}
         for entry in data:
             addr = entry.get("address")
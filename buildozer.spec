@@ -19,7 +19,7 @@ fullscreen = 1
 
 # Nur Font Awesome Solid soll eingebunden werden
 android.add_assets = assets/fonts/fa-solid-900.ttf
-requirements = python3,kivy,pyjnius,pillow,certifi,six,kivy_garden.graph
+requirements = python3,kivy,pyjnius,pillow,certifi,six,kivy_garden.graph,numpy,sqlite3
 
 android.add_src = src/main/java
 android.permissions = BLUETOOTH, BLUETOOTH_ADMIN, ACCESS_FINE_LOCATION, ACCESS_COARSE_LOCATION, BLUETOOTH_SCAN, BLUETOOTH_CONNECT, BLUETOOTH_ADVERTISE, FOREGROUND_SERVICE, POST_NOTIFICATIONS
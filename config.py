@@ -23,13 +23,33 @@ DEFAULTS = {
     "refresh_interval": 2.0,
     "stale_timeout": 15.0,
     "ui_refresh_interval": 1.0,
+    "ui_max_fps": 10.0,              # Obergrenze für Ticks bei neuen Daten
+    "ui_idle_interval": 5.0,         # s – Tick ohne neue Daten / alle Geräte offline
     "temperature_unit": "C",
     "temperature_offset": 0.0,
     "humidity_offset": 0.0,
-    "leaf_offset": 0.0
+    "leaf_offset": 0.0,
+    "transport": "file",             # "file" | "memory" (Android In-Process)
+    "debug_snapshot_interval": 10.0, # JSON-Snapshots im memory-Transport
+    "decoded_format": "json",        # "json" (decoded.json) | "binary" (decoded.bin, opt-in)
+
+    # Verlauf (log.csv) – siehe history_writer.py
+    "history_flush_interval": 5.0,   # s
+    "history_flush_rows": 200,
+    "history_fsync": "rotate",       # "never" | "flush" | "rotate"
+    "history_rotate": "daily",       # "daily" | "size" | "none"
+    "history_max_mb": 50,
+    "history_compress": True,
+    "history_skip_empty": True,      # komplett leere Offline-Zeilen nicht loggen
+    "history_mode": "full",          # "full" (jede Zeile) | "change" (nur Änderungen)
+    "history_epsilon": 0.05,         # Mindeständerung im change-Modus
+    "history_heartbeat": 300.0,      # s – spätestens dann eine Zeile (online)
+    "history_backend": "csv",        # "csv" | "sqlite" | "both"
+    "history_index_rows": 1000       # Zeilen pro Block im Zeitindex log.csv.idx (0 = aus)
 }
 
 _config = None
+_generation = 0     # zählt jede Config-Änderung (save/reload) → Decoder-Caches
 
 
 def _init():
@@ -61,8 +81,9 @@ def _init():
 
 
 def save(cfg):
-    global _config
+    global _config, _generation
     _config = cfg
+    _generation += 1
 
     tmp = CONFIG_PATH + ".tmp"
     with open(tmp, "w", encoding="utf-8") as f:
@@ -110,6 +131,14 @@ def get_ui_refresh_interval():
     return float(_init().get("ui_refresh_interval"))
 
 
+def get_ui_max_fps():
+    return max(0.1, float(_init().get("ui_max_fps", 10.0)))
+
+
+def get_ui_idle_interval():
+    return float(_init().get("ui_idle_interval", 5.0))
+
+
 def get_temperature_unit():
     return _init().get("temperature_unit", "C").upper()
 
@@ -125,12 +154,56 @@ def get_humidity_offset():
 def get_leaf_offset():
     return float(_init().get("leaf_offset"))
 
+def get_transport():
+    return str(_init().get("transport", "file")).lower()
+
+
+def get_debug_snapshot_interval():
+    return float(_init().get("debug_snapshot_interval", 10.0))
+
+def get_decoded_format():
+    fmt = str(_init().get("decoded_format", "json")).lower()
+    return fmt if fmt in ("binary", "json") else "json"
+
+
+def decoded_path():
+    """decoded.json (Standard) oder decoded.bin – je nach decoded_format."""
+    name = "decoded.bin" if get_decoded_format() == "binary" else "decoded.json"
+    return os.path.join(DATA, name)
+
+def get_history_settings():
+    cfg = _init()
+    return {
+        "flush_interval": float(cfg.get("history_flush_interval", 5.0)),
+        "flush_rows": int(cfg.get("history_flush_rows", 200)),
+        "fsync": str(cfg.get("history_fsync", "rotate")).lower(),
+        "rotate": str(cfg.get("history_rotate", "daily")).lower(),
+        "max_bytes": int(float(cfg.get("history_max_mb", 50)) * 1024 * 1024),
+        "compress": bool(cfg.get("history_compress", True)),
+        "index_rows": int(cfg.get("history_index_rows", 1000)),
+    }
+
+
+def get_history_backend():
+    backend = str(_init().get("history_backend", "csv")).lower()
+    return backend if backend in ("csv", "sqlite", "both") else "csv"
+
+
+def get_history_mode():
+    mode = str(_init().get("history_mode", "full")).lower()
+    return mode if mode in ("full", "change") else "full"
+
 def reload():
-    global _config
+    global _config, _generation
     with open(CONFIG_PATH, "r", encoding="utf-8") as f:
         _config = json.load(f)
+    _generation += 1
     print("[config] reload OK")
 
+
+def get_generation():
+    return _generation
+
 def get_bridge_profiles():
     return _init().get("bridge_profiles", {})
 
@@ -8,6 +8,7 @@ import config
 from bridge_manager import get_bridge
 from watchdog_manager import DumpWatchdog
 from decoder import start_decoder_thread, update_bridge_state
+import transport
 
 # ------------------------------------------------------------
 # 🔥 100 % zuverlässige Android-Erkennung
@@ -35,16 +36,17 @@ def _wd_callback(status):
         last_seen=status["last_seen"]
     )
 # ------------------------------------------------------------
-# decoded.json löschen
+# decoded.json / decoded.bin löschen
 # ------------------------------------------------------------
 def _cleanup_decoded():
-    try:
-        path = os.path.join(config.DATA, "decoded.json")
-        if os.path.exists(path):
-            os.remove(path)
-            print("[Core] decoded.json entfernt")
-    except:
-        pass
+    for name in ("decoded.json", "decoded.bin"):
+        try:
+            path = os.path.join(config.DATA, name)
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"[Core] {name} entfernt")
+        except:
+            pass
 
 
 
@@ -85,12 +87,15 @@ def start():
         _bridge.start()
         print("[Core] Android-Bridge gestartet")
 
+        # optional: Bridge → Decoder → UI im Speicher statt über JSON
+        transport.start_android()
+
     else:
         print("[Core] Desktop Mode – externe blebridge_desktop benutzen")
         _bridge = None
 
     # -----------------------------------------------------
-    # Decoder starten (liefert decoded.json)
+    # Decoder starten (liefert decoded.json bzw. decoded.bin)
     # -----------------------------------------------------
     start_decoder_thread(config.get_refresh_interval())
     print("[Core] Decoder-Thread gestartet")
@@ -154,6 +159,8 @@ def stop():
     except:
         pass
 
+    transport.stop()
+
     try:
         if is_android() and _bridge:
             _bridge.stop()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+csv_index.py – dünner Zeitindex (.idx) neben log.csv
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+Alle block_rows Zeilen ein Eintrag:  Byte-Offset, Ende, Zeilenzahl,
+kleinster und größter Zeitstempel im Block. Damit lesen Viewer nur die
+Bytes eines Zeitbereichs bzw. der letzten n Zeilen – unabhängig davon,
+wie groß die Datei ist.
+
+    log.csv.idx
+        HEADER  "CIX1" | u32 block_rows | u64 header_end
+        BLOCK   u64 start | u64 end | u32 rows | f64 min_ts | f64 max_ts
+
+Der Index wächst inkrementell: update() liest nur die Bytes nach dem letzten
+vollständigen Block. Der angefangene letzte Block steht nicht in der Datei,
+Leser nehmen ihn einfach immer mit (max. block_rows Zeilen).
+
+Nur der Writer (HistoryWriter, persist=True) schreibt die .idx – angehängt
+unter fcntl-Lock und nur, wenn die Datei noch so lang ist wie erwartet.
+Viewer laden sie, holen bei update() neue Blöcke von der Platte nach und
+indexieren den Rest nur im Speicher.
+
+Zeitstempel sind pro Gerät nicht streng monoton (Offline-Frames tragen den
+letzten Bridge-Zeitstempel) → Suche über Präfix-Maximum / Suffix-Minimum.
+"""
+
+import os
+import io
+import csv
+import bisect
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:       # Windows → ohne Datei-Lock (nur ein Writer pro Datei)
+    fcntl = None
+
+from timeparse import parse_ts
+
+MAGIC = b"CIX1"
+HEADER = struct.Struct("<4sIQ")
+BLOCK = struct.Struct("<QQIdd")
+
+DEFAULT_BLOCK_ROWS = 1000
+
+
+def _read_disk(path):
+    """.idx lesen → (block_rows, header_end, blocks) oder None (fehlt / kaputt)."""
+    try:
+        with open(path, "rb") as f:
+            buf = f.read()
+        magic, block_rows, header_end = HEADER.unpack_from(buf, 0)
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or not block_rows:
+        return None
+    n = (len(buf) - HEADER.size) // BLOCK.size
+    blocks = [BLOCK.unpack_from(buf, HEADER.size + i * BLOCK.size) for i in range(n)]
+    return block_rows, header_end, blocks
+
+
+class CsvIndex:
+    def __init__(self, csv_path, block_rows=DEFAULT_BLOCK_ROWS, persist=False):
+        self.csv_path = csv_path
+        self.path = csv_path + ".idx"
+        self.block_rows = int(block_rows)
+        self.persist = bool(persist)    # nur der Writer schreibt die .idx
+        self.header_end = 0
+        self.header = b""
+        self.blocks = []          # [(start, end, rows, min_ts, max_ts), ...]
+        self._disk_blocks = 0     # so viele Blöcke stehen in der .idx
+        self._prefix_max = None
+        self._suffix_min = None
+        self._lock = threading.Lock()
+        self.cancelled = False    # Writer rotiert → laufendes update() abbrechen
+        self._load()
+
+    # --------------------------------------------------------
+    # LADEN / PRÜFEN
+    # --------------------------------------------------------
+    def _reset(self):
+        self.blocks = []
+        self._disk_blocks = 0
+        self.header_end = 0
+        self.header = b""
+        self._prefix_max = self._suffix_min = None
+        if not self.persist:
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _load(self):
+        disk = _read_disk(self.path)
+        if disk is None:
+            if os.path.exists(self.path):
+                self._reset()
+            return
+        block_rows, header_end, blocks = disk
+        # vorhandener Index gibt die Blockgröße vor (Writer und Viewer teilen ihn)
+        self.block_rows = block_rows
+        self.blocks = blocks
+        self._disk_blocks = len(blocks)
+        self.header_end = header_end
+
+        # Datei ersetzt / gekürzt (Rotation) → Index verwerfen
+        try:
+            size = os.path.getsize(self.csv_path)
+        except OSError:
+            size = 0
+        if size < self.indexed_end or size < header_end:
+            self._reset()
+            return
+
+        with open(self.csv_path, "rb") as f:
+            self.header = f.read(header_end)
+
+    @property
+    def indexed_end(self):
+        return self.blocks[-1][1] if self.blocks else self.header_end
+
+    def _sync_disk(self):
+        """Viewer: inzwischen vom Writer geschriebene Blöcke übernehmen."""
+        disk = _read_disk(self.path)
+        if disk is None:
+            return
+        block_rows, header_end, blocks = disk
+        if len(blocks) <= self._disk_blocks or (self.header_end and header_end != self.header_end):
+            return
+        end = blocks[-1][1] if blocks else header_end
+        # eigene Speicher-Blöcke dahinter passen nur bei gleicher Ausrichtung
+        rest = [b for b in self.blocks if b[0] >= end]
+        if rest and rest[0][0] != end:
+            rest = []
+        self.block_rows = block_rows
+        self.header_end = header_end
+        if not self.header:
+            # Viewer startete vor der .idx → Header gehört zum übernommenen header_end
+            with open(self.csv_path, "rb") as f:
+                self.header = f.read(header_end)
+        self.blocks = blocks + rest
+        self._disk_blocks = len(blocks)
+        self._prefix_max = self._suffix_min = None
+
+    def _persist(self, new_blocks):
+        """Writer: anhängen unter fcntl-Lock, nur wenn die .idx unseren Stand hat."""
+        with open(self.path, "a+b") as out:
+            if fcntl is not None:
+                fcntl.flock(out.fileno(), fcntl.LOCK_EX)
+            size = out.seek(0, os.SEEK_END)
+            expected = HEADER.size + self._disk_blocks * BLOCK.size
+            if size == 0:
+                out.write(HEADER.pack(MAGIC, self.block_rows, self.header_end))
+                out.write(b"".join(BLOCK.pack(*b) for b in self.blocks))
+            elif size == expected:
+                out.write(b"".join(BLOCK.pack(*b) for b in new_blocks))
+            else:
+                # fremder Schreiber → nichts doppelt anhängen, Datei neu aufbauen
+                print("[CsvIndex] unexpected .idx length, rewriting:", self.path)
+                out.truncate(0)
+                out.write(HEADER.pack(MAGIC, self.block_rows, self.header_end))
+                out.write(b"".join(BLOCK.pack(*b) for b in self.blocks))
+        self._disk_blocks = len(self.blocks)
+
+    # --------------------------------------------------------
+    # INKREMENTELL ERWEITERN
+    # --------------------------------------------------------
+    def update(self):
+        """Neue vollständige Blöcke seit dem letzten Aufruf indexieren."""
+        with self._lock:
+            if not self.persist:
+                self._sync_disk()
+            try:
+                size = os.path.getsize(self.csv_path)
+            except OSError:
+                return self
+            if size < self.indexed_end:
+                self._reset()
+
+            new_blocks = []
+            with open(self.csv_path, "rb") as f:
+                if not self.header_end:
+                    self.header = f.readline()
+                    if not self.header.endswith(b"\n"):
+                        self.header = b""
+                        return self
+                    self.header_end = len(self.header)
+
+                pos = self.indexed_end
+                f.seek(pos)
+
+                start, rows, lo, hi = pos, 0, None, None
+                for line in f:
+                    if self.cancelled:
+                        return self
+                    if not line.endswith(b"\n"):
+                        break                   # Zeile wird gerade geschrieben
+                    pos += len(line)
+                    t = parse_ts(line.split(b",", 1)[0].decode("utf-8", "replace").strip('"'))
+                    if t is not None:
+                        lo = t if lo is None or t < lo else lo
+                        hi = t if hi is None or t > hi else hi
+                    rows += 1
+                    if rows == self.block_rows:
+                        # Block ohne lesbaren Zeitstempel: fällt aus jeder Suche
+                        new_blocks.append((start, pos, rows,
+                                           lo if lo is not None else float("inf"),
+                                           hi if hi is not None else float("-inf")))
+                        start, rows, lo, hi = pos, 0, None, None
+
+            if new_blocks:
+                self.blocks.extend(new_blocks)
+                self._prefix_max = self._suffix_min = None
+            if self.persist and (new_blocks or not os.path.exists(self.path)):
+                try:
+                    self._persist(new_blocks)
+                except OSError as e:
+                    # schreibgeschützt → Index nur im Speicher
+                    print("[CsvIndex] write failed:", self.path, e)
+        return self
+
+    # --------------------------------------------------------
+    # SUCHE
+    # --------------------------------------------------------
+    def _bounds(self):
+        if self._prefix_max is None:
+            pm, m = [], float("-inf")
+            for b in self.blocks:
+                m = max(m, b[4])
+                pm.append(m)
+            sm, m = [], float("inf")
+            for b in reversed(self.blocks):
+                m = min(m, b[3])
+                sm.append(m)
+            sm.reverse()
+            self._prefix_max, self._suffix_min = pm, sm
+        return self._prefix_max, self._suffix_min
+
+    def byte_range(self, t0=None, t1=None):
+        """
+        (start, end) mit allen Zeilen aus [t0, t1]; end=None → bis EOF.
+        Der nicht indexierte Rest am Ende ist immer enthalten.
+        """
+        if not self.blocks:
+            return self.header_end, None
+        pm, sm = self._bounds()
+
+        i = 0 if t0 is None else bisect.bisect_left(pm, t0)
+        j = len(self.blocks) if t1 is None else bisect.bisect_right(sm, t1)
+
+        start = self.blocks[i][0] if i < len(self.blocks) else self.indexed_end
+        if j >= len(self.blocks):
+            return start, None
+        return start, max(start, self.blocks[j][0])
+
+    def tail_start(self, n):
+        """Byte-Offset, ab dem mindestens n Zeilen folgen (bzw. Dateianfang)."""
+        have = 0
+        for b in reversed(self.blocks):
+            if have >= n:
+                return b[1]
+            have += b[2]
+        return self.header_end
+
+
+# ------------------------------------------------------------
+# LESEN
+# ------------------------------------------------------------
+def read_rows(index, start, end=None):
+    """DictReader-Zeilen aus dem Byte-Bereich [start, end)."""
+    with open(index.csv_path, "rb") as f:
+        f.seek(start)
+        data = f.read() if end is None else f.read(max(0, end - start))
+
+    # angefangene letzte Zeile (Writer schreibt gerade) weglassen
+    if end is None and data and not data.endswith(b"\n"):
+        data = data[:data.rfind(b"\n") + 1]
+
+    text = (index.header + data).decode("utf-8", "replace")
+    return list(csv.DictReader(io.StringIO(text, newline="")))
+
+
+def open_index(csv_path, block_rows=DEFAULT_BLOCK_ROWS):
+    """Index laden und auf den aktuellen Dateistand bringen (nur unkomprimierte CSV)."""
+    if csv_path.endswith(".gz"):
+        raise ValueError(f"gzip segment is not seekable: {csv_path}")
+    return CsvIndex(csv_path, block_rows).update()
+
+
+def range_rows(csv_path, t0=None, t1=None):
+    idx = open_index(csv_path)
+    start, end = idx.byte_range(t0, t1)
+    rows = read_rows(idx, start, end)
+    if t0 is None and t1 is None:
+        return rows
+    out = []
+    for r in rows:
+        t = parse_ts(r.get("timestamp"))
+        if t is None or ((t0 is None or t >= t0) and (t1 is None or t <= t1)):
+            out.append(r)
+    return out
+
+
+def tail_rows(csv_path, n):
+    idx = open_index(csv_path)
+    rows = read_rows(idx, idx.tail_start(n))
+    return rows[-n:] if n else rows
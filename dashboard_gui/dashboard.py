@@ -107,6 +107,7 @@ class DashboardScreen(Screen):
         self.tile_temp_ex.reset()
         self.tile_hum_ex.reset()
         self.tile_vpd_ex.reset()
+        self.content.invalidate()
 
         # Header minimal
         self.header.set_clock("--:--")
@@ -1,53 +1,307 @@
 # data_buffer.py – erweitert für LED-Status-Flow
+#
+# Laden läuft im FrameLoader-Thread: Datei lesen, parsen, pro Gerät
+# vorverarbeiten → EIN neuer Snapshot, per Zuweisung getauscht (atomar).
+# Der UI-Thread liest nur noch den aktuellen Snapshot und blockiert nie
+# auf der Platte; neue Daten wecken die UI über einen Clock-Trigger.
+#
+# Frames im Snapshot gelten als read-only – nicht im UI-Thread verändern.
+# Im memory-Transport gehören sie dem Decoder: Abgeleitetes (MAC, aktive
+# Keys, Tile-Werte) liegt deshalb parallel in snapshot.prepared, nie im Frame.
 
 import os
-import json
+import threading
+import time
+from collections import namedtuple
+
+import config
+import transport
+import frame_codec
+from file_watch import file_sig, FileWatcher
+
+
+Snapshot = namedtuple(
+    "Snapshot",
+    "version data file_exists data_ok alive_flag devices prepared",
+)
+# devices: device_id → Index in data
+# prepared: Prepared je Frame (gleicher Index wie data, None = kein Frame-Dict)
+
+Prepared = namedtuple("Prepared", "mac keys values")
+# mac: flache MAC · keys: aktive Tile-Keys · values: {kanal: tile_values()}
+
+_EMPTY = Snapshot(0, None, False, False, False, {}, ())
+
+
+# ------------------------------------------------------------
+# VORVERARBEITUNG (im Loader-Thread)
+# ------------------------------------------------------------
+def extract_mac(dev):
+    """Normiert device_id auf reine MAC."""
+    if isinstance(dev, dict):
+        return dev.get("device_id")
+    return dev
+
+
+def tile_values(stream):
+    """
+    Kanal-Stream → {tile_key: (wert, einheit)} in Tile-Reihenfolge.
+    Extern zählt nur, wenn der Sensor als present gemeldet ist.
+    """
+    out = {}
+    if not isinstance(stream, dict):
+        return out
+
+    internal = stream.get("internal", {}) or {}
+    external = stream.get("external", {}) or {}
+    vpd_int = stream.get("vpd_internal", {}) or {}
+    vpd_ext = stream.get("vpd_external", {}) or {}
+
+    t = internal.get("temperature", {}) or {}
+    h = internal.get("humidity", {}) or {}
+    if t.get("value") is not None:
+        out["temp_in"] = (t["value"], t.get("unit"))
+    if h.get("value") is not None:
+        out["hum_in"] = (h["value"], h.get("unit"))
+    if vpd_int.get("value") is not None:
+        out["vpd_in"] = (vpd_int["value"], vpd_int.get("unit"))
+
+    if external.get("present"):
+        t = external.get("temperature", {}) or {}
+        h = external.get("humidity", {}) or {}
+        if t.get("value") is not None:
+            out["temp_ex"] = (t["value"], t.get("unit"))
+        if h.get("value") is not None:
+            out["hum_ex"] = (h["value"], h.get("unit"))
+        if vpd_ext.get("value") is not None:
+            out["vpd_ex"] = (vpd_ext["value"], vpd_ext.get("unit"))
+    return out
+
+
+def active_keys(d):
+    """Tile-Keys mit Werten – adv + gatt ohne Vorrang, sonst alter Single-Channel-Frame."""
+    active = set()
+    for ch_name in ("adv", "gatt"):
+        active.update(tile_values(d.get(ch_name)))
+
+    # Fallback für ALTEN Single-Channel-Frame (falls mal nötig)
+    if not active and "internal" in d:
+        active.update(tile_values(d))
+
+    return list(active)
+
+
+def _prepare(frames):
+    """
+    MAC flach, aktive Keys + Tile-Werte pro Kanal einmalig berechnen.
+    → (frames, devices, prepared); die Dicts des Erzeugers bleiben unberührt,
+    nur Frames mit verschachtelter device_id werden flach kopiert.
+    """
+    if not isinstance(frames, list):
+        return frames, {}, ()
+
+    out = []
+    devices = {}
+    prepared = []
+    for i, d in enumerate(frames):
+        if not isinstance(d, dict):
+            out.append(d)
+            prepared.append(None)
+            continue
+        mac = extract_mac(d.get("device_id"))
+        if mac is not d.get("device_id"):
+            d = dict(d, device_id=mac)
+        out.append(d)
+        prepared.append(Prepared(
+            mac,
+            active_keys(d),
+            {ch: tile_values(d.get(ch)) for ch in ("adv", "gatt")},
+        ))
+        if mac is not None:
+            devices.setdefault(mac, i)
+    return out, devices, tuple(prepared)
+
+
+def _snap_field(name):
+    def fget(self):
+        return getattr(self._snap, name)
+
+    def fset(self, value):
+        # main.init_buffer setzt Startwerte → neuer Snapshot statt Mutation
+        fields = {name: value}
+        if name == "data":
+            fields["data"], fields["devices"], fields["prepared"] = _prepare(value)
+        self._snap = self._snap._replace(**fields)
+    return property(fget, fset)
+
 
 class DataBuffer:
     def __init__(self):
         self.path = os.path.join("data", "decoded.json")
-        self.data = None
 
-        # neue Felder für LED-Flow
-        self.file_exists = False
-        self.data_ok = False
-        self.alive_flag = False
+        # Datei-Signatur (mtime_ns, size, inode) des letzten Parses →
+        # unverändert = kein erneutes Parsen, Snapshot bleibt der Cache
+        self._sig = None
+        self._snap = _EMPTY
+        self._lock = threading.Lock()     # Loader-Thread vs. synchrones load()
+        self._loader = None
+        self._on_update = None
+
+    # ---------------------------------------------------------
+    # SNAPSHOT (UI-Thread liest nur hier)
+    # ---------------------------------------------------------
+    @property
+    def snapshot(self):
+        return self._snap
+
+    @property
+    def version(self):
+        """Zählt bei jedem neu geladenen Frame-Stand hoch (Vergleich in Widgets)."""
+        return self._snap.version
+
+    # Felder für LED-Flow
+    data = _snap_field("data")
+    file_exists = _snap_field("file_exists")
+    data_ok = _snap_field("data_ok")
+    alive_flag = _snap_field("alive_flag")
+
+    def get(self):
+        return self._snap.data
+
+    # ---------------------------------------------------------
+    # LADEN (Loader-Thread, vor dem Start auch synchron)
+    # ---------------------------------------------------------
+    def current_path(self):
+        # decoded.bin (kompakt) oder decoded.json – je nach Config
+        return os.path.join("data", os.path.basename(config.decoded_path()))
 
     def load(self):
+        """Neuen Stand laden, falls vorhanden → True, wenn ein Snapshot getauscht wurde."""
+        with self._lock:
+            return self._load_once()
+
+    def _load_once(self):
+        snap = self._snap
+
+        # memory-Transport: Frames direkt vom Decoder, keine Datei
+        if transport.is_active():
+            frames = transport.FRAMES.take()
+            if frames is None:
+                return False
+            self._publish(frames, True)
+            return True
+
+        path = self.current_path()
+        if path != self.path:
+            self.path = path
+            self._sig = None
+
         # Datei existiert?
-        self.file_exists = os.path.exists(self.path)
+        sig = file_sig(self.path)
+        if sig is None:
+            self._sig = None
+            if snap.data is None and not snap.file_exists:
+                return False
+            self._publish(None, False)
+            return True
 
-        if not self.file_exists:
-            self.data = None
-            self.data_ok = False
-            self.alive_flag = False
-            return None
+        # Decoder hat seit dem letzten Tick nicht geschrieben → Cache
+        if sig == self._sig:
+            return False
 
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                self.data = json.load(f)
+            frames = frame_codec.to_json_frames(self.path)
+            self._sig = sig
         except:
-            self.data = None
+            # halb geschriebene Datei o.ä. → nächster Durchlauf versucht es neu
+            frames = None
+            self._sig = None
+        self._publish(frames, True)
+        return True
+
+    def _publish(self, frames, file_exists):
+        frames, devices, prepared = _prepare(frames)
 
         # gültige Daten?
-        if isinstance(self.data, list):
-            self.data_ok = True
-        
-            if len(self.data) > 0:
-                d = self.data[0]
-                self.alive_flag = bool(d.get("alive", False))
-            else:
-                # leere Liste = bewusst kein Frame
-                self.alive_flag = False
+        if isinstance(frames, list):
+            data_ok = True
+            # leere Liste = bewusst kein Frame
+            alive = bool(frames[0].get("alive", False)) if frames else False
         else:
-            self.data_ok = False
-            self.alive_flag = False
+            data_ok = False
+            alive = False
 
-    def get(self):
-        return self.data
+        # Tausch per Zuweisung → Leser sehen alten ODER neuen Stand, nie halb
+        self._snap = Snapshot(self._snap.version + 1, frames, file_exists, data_ok, alive,
+                              devices, prepared)
+
+        if self._on_update is not None:
+            self._on_update()
 
     def soft_reload(self):
+        # Loader-Thread aktiv → UI-Tick liest nur den Snapshot
+        if self._loader is not None and self._loader.is_alive():
+            return False
         return self.load()
 
+    # ---------------------------------------------------------
+    # LOADER-THREAD
+    # ---------------------------------------------------------
+    def start_loader(self, on_update=None, timeout=1.0):
+        """on_update() läuft im Loader-Thread → nur einen Clock-Trigger übergeben."""
+        self._on_update = on_update
+        if self._loader is not None and self._loader.is_alive():
+            return
+        self._loader = FrameLoader(self, timeout)
+        self._loader.start()
+
+    def stop_loader(self):
+        if self._loader is not None:
+            self._loader.stop()
+            self._loader = None
+
+
+class FrameLoader(threading.Thread):
+    """
+    Wartet auf neue Frames (inotify/Polling bzw. FrameQueue) und lädt sie.
+    timeout = spätestens so oft wird trotzdem geprüft (Datei neu/gelöscht).
+    """
+
+    def __init__(self, buffer, timeout=1.0):
+        super().__init__(name="FrameLoader", daemon=True)
+        self.buffer = buffer
+        self.timeout = timeout
+        self.running = True
+
+    def run(self):
+        watcher = None
+        watched = None
+
+        while self.running:
+            try:
+                if transport.is_active():
+                    transport.FRAMES.wait(self.timeout)
+                else:
+                    path = self.buffer.current_path()
+                    if path != watched:
+                        if watcher is not None:
+                            watcher.close()
+                        watcher = FileWatcher(path)
+                        watched = path
+                    watcher.wait(self.timeout)
+
+                if self.running:
+                    self.buffer.load()
+            except Exception as e:
+                print("[DataBuffer] loader error:", e)
+                time.sleep(self.timeout)
+
+        if watcher is not None:
+            watcher.close()
+
+    def stop(self):
+        self.running = False
+
+
 # global Singleton
 BUFFER = DataBuffer()
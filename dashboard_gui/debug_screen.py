@@ -5,6 +5,7 @@ import os
 import json
 import traceback
 import config
+import frame_codec
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.label import Label
@@ -29,7 +30,7 @@ def get_real_app_paths():
     paths["data_root"] = data_root
 
     paths["raw_dump"] = os.path.join(data_root, "ble_dump.json")
-    paths["decoded"]  = os.path.join(data_root, "decoded.json")
+    paths["decoded"]  = config.decoded_path()
     paths["config"]   = os.path.join(data_root, "config.json")
     paths["profiles"] = os.path.join(data_root, "decoder_profiles")
 
@@ -50,6 +51,19 @@ def safe_read(path, max_len=2500):
         return f"[Fehler beim Lesen: {e}]"
 
 
+def safe_read_decoded(path, max_len=2500):
+    """decoded.bin über den JSON-Shim lesbar machen."""
+    if not path.endswith(".bin"):
+        return safe_read(path, max_len)
+    try:
+        txt = json.dumps(frame_codec.read_frames(path), indent=2)
+    except Exception as e:
+        return f"[Fehler beim Lesen: {e}]"
+    if len(txt) > max_len:
+        txt = txt[:max_len] + "\n… (gekürzt)"
+    return txt
+
+
 # ------------------------------------------------------------
 # DEBUG SCREEN
 # ------------------------------------------------------------
@@ -72,6 +86,16 @@ class DebugScreen(Screen):
         root.add_widget(self.header)
         GLOBAL_STATE.attach_debug(self)
 
+        # aktueller UI-Tick (adaptiv, siehe GlobalStateManager)
+        self.lbl_tick = Label(
+            text="UI-Tick: --",
+            font_size=dp(13),
+            color=(0.6, 0.8, 1, 1),
+            size_hint_y=None,
+            height=dp(24),
+        )
+        root.add_widget(self.lbl_tick)
+
         # ----------------------------------------------------
         # CONTENT
         # ----------------------------------------------------
@@ -224,18 +248,18 @@ class DebugScreen(Screen):
                 )
             
             status_line("ble_dump.json", paths.get("raw_dump"))
-            status_line("decoded.json", paths.get("decoded"))
+            status_line(os.path.basename(paths.get("decoded")), paths.get("decoded"))
             status_line("config.json", paths.get("config"))
             
             self._add_separator()
             # DECODED – SUCHE AN ALLEN ORTEN
             self._add_separator()
-            self._add_label("decoded.json", dp(18), bold=True)
+            self._add_label(os.path.basename(paths.get("decoded")), dp(18), bold=True)
             
             p = paths.get("decoded")
             if p and os.path.exists(p):
                 self._add_label(f"✓ {p}", dp(12), color=(0.3, 1, 0.3, 1))
-                self._add_label(f"[code]{safe_read(p)}[/code]", dp(11))
+                self._add_label(f"[code]{safe_read_decoded(p)}[/code]", dp(11))
             else:
                 self._add_label(f"✗ {p}", dp(12), color=(1, 0.4, 0.4, 1))
 
@@ -278,4 +302,9 @@ class DebugScreen(Screen):
         if self.manager:
             self.manager.current = "dashboard"
     def update_from_global(self, d):
-        self.header.update_from_global(d)
\ No newline at end of file
+        self.header.update_from_global(d)
+        mode, interval = GLOBAL_STATE.tick_info()
+        if interval:
+            self.lbl_tick.text = f"UI-Tick: {mode} – {interval:.1f} s ({1.0 / interval:.2f} Hz)"
+        else:
+            self.lbl_tick.text = f"UI-Tick: {mode}"
@@ -1,15 +1,52 @@
 # dashboard_gui/global_state_manager.py
 # HEARTBEAT + MULTI-DEVICE – CLEAN VERSION
 
-from kivy.clock import Clock
-from dashboard_gui.data_buffer import BUFFER
-
+import time
 
-def _extract_mac(dev):
-    """Normiert device_id auf reine MAC."""
-    if isinstance(dev, dict):
-        return dev.get("device_id")
-    return dev
+from kivy.clock import Clock
+import config
+from dashboard_gui.data_buffer import BUFFER, active_keys, extract_mac
+from dashboard_gui.state_events import STATE_EVENTS
+
+# Reihenfolge = Update-Reihenfolge pro Tick
+SCREEN_REFS = (
+    "dashboard_ref",
+    "fullscreen_ref",
+    "setup_ref",
+    "about_ref",
+    "settings_ref",
+    "vpd_scatter_ref",
+    "debug_ref",
+    "csv_viewer_ref",
+    "cam_viewer_ref",
+    "device_picker_ref",
+)
+
+
+def _is_visible(scr):
+    """
+    ScreenManager hängt nur den aktuellen Screen (bzw. beide während einer
+    Transition) ein – alle anderen haben kein parent.
+    """
+    return scr.parent is not None
+
+
+# Adaptiver Tick: so lange ohne geänderten Wert/Status → Intervall verdoppeln
+IDLE_AFTER = 10.0
+
+
+def _any_online(data):
+    """Mindestens ein Gerät mit lebendem Kanal (adv/gatt) im Snapshot?"""
+    if not isinstance(data, list):
+        return False
+    for d in data:
+        if not isinstance(d, dict):
+            continue
+        for ch in ("adv", "gatt"):
+            stream = d.get(ch)
+            if isinstance(stream, dict) and stream.get("alive"):
+                return True
+    return False
 
 
 class GlobalStateManager:
@@ -31,6 +68,11 @@ class GlobalStateManager:
         self.cam_viewer_ref = None
         self.device_picker_ref = None
 
+        # Sichtbarkeit: versteckte Screens werden nur als dirty markiert
+        # und beim nächsten on_pre_enter einmal mit dem letzten Stand versorgt
+        self._dirty = set()           # Namen aus SCREEN_REFS
+        self._last_out = None
+
         # Aktives Gerät (Index)
         self.active_index = 0
         self.active_channel = "adv"
@@ -41,9 +83,135 @@ class GlobalStateManager:
         # Heartbeat
         self._last_state = {}
 
-        # Global Tick
-        Clock.schedule_interval(self._global_update, 0.5)
+        # Global Tick – adaptiv statt festem Intervall:
+        #   live     ui_refresh_interval (Config)
+        #   idle     kein Wert/Status geändert seit IDLE_AFTER → verdoppeln bis ui_idle_interval
+        #   offline  kein Gerät lebt / gestoppt → ui_idle_interval
+        #   paused   App pausiert (on_pause) → gar kein Tick
+        # neue Daten ticken sofort, höchstens ui_max_fps mal pro Sekunde
+        self._tick_event = None
+        self._tick_due = None         # monotonic des geplanten Ticks
+        self._tick_interval = None
+        self._tick_mode = "live"
+        self._last_tick = 0.0
+        self._last_data = time.monotonic()   # letzter geänderter Wert/Status (STATE_EVENTS)
+        self._suspended = False
+        self._loader_wanted = False
+
+        # neuer Snapshot vom FrameLoader → sofort einmal ticken
+        self._frames_trigger = Clock.create_trigger(self._on_new_frames)
+        self._schedule_tick(0)
+
+    def start_frame_loader(self):
+        """Frames im Hintergrund laden (main.on_start)."""
+        self._loader_wanted = True
+        BUFFER.start_loader(on_update=self._frames_trigger)
+
+    def stop_frame_loader(self):
+        self._loader_wanted = False
+        BUFFER.stop_loader()
+
+    # ---------------------------------------------------------
+    # ADAPTIVER TICK
+    # ---------------------------------------------------------
+    def _schedule_tick(self, delay):
+        if self._tick_event is not None:
+            self._tick_event.cancel()
+        self._tick_due = time.monotonic() + delay
+        self._tick_event = Clock.schedule_once(self._tick, delay)
+
+    def _cancel_tick(self):
+        if self._tick_event is not None:
+            self._tick_event.cancel()
+        self._tick_event = None
+        self._tick_due = None
+
+    def _tick(self, dt):
+        self._tick_event = None
+        self._tick_due = None
+        self._last_tick = time.monotonic()
+        self._global_update(dt)
+        if not self._suspended:
+            self._schedule_tick(self._next_interval())
+
+    def _on_new_frames(self, *_):
+        if self._suspended or not self.running:
+            return
+        # idle/offline: der Decoder schreibt trotzdem jeden Schritt → nur echte
+        # Wert-/Statusänderungen holen den schnellen Tick zurück
+        if self._tick_mode != "live":
+            if not STATE_EVENTS.diff(BUFFER.snapshot):
+                return
+            self._last_data = time.monotonic()
+        self._tick_soon()
+
+    def _tick_soon(self):
+        """Nächsten Tick vorziehen, höchstens ui_max_fps mal pro Sekunde."""
+        now = time.monotonic()
+        due = max(now, self._last_tick + 1.0 / config.get_ui_max_fps())
+        # schon ein Tick vorher geplant → reicht
+        if self._tick_due is not None and self._tick_due <= due:
+            return
+        self._schedule_tick(due - now)
+
+    def _next_interval(self):
+        now = time.monotonic()
+        base = max(config.get_ui_refresh_interval(), 1.0 / config.get_ui_max_fps())
+        idle = max(base, config.get_ui_idle_interval())
+
+        snap = BUFFER.snapshot
+        if not self.running or not _any_online(snap.data):
+            mode, interval = "offline", idle
+        elif now - self._last_data >= IDLE_AFTER:
+            mode, interval = "idle", min(idle, max(base, (self._tick_interval or base) * 2))
+        else:
+            mode, interval = "live", base
+
+        if mode != self._tick_mode:
+            print(f"[STATE] tick {mode}: {interval:.1f} s")
+        self._tick_mode = mode
+        self._tick_interval = interval
+        return interval
+
+    def tick_info(self):
+        """Aktueller Tick für den Debug-Screen → (modus, intervall s oder None)."""
+        return self._tick_mode, self._tick_interval
 
+    def suspend(self):
+        """App pausiert / Display aus → kein Tick, kein Loader, keine Header-Uhr."""
+        if self._suspended:
+            return
+        from dashboard_gui.ui.common.header_online import HEADER_CLOCK
+        print("[STATE] SUSPEND")
+        self._suspended = True
+        self._cancel_tick()
+        self._tick_mode = "paused"
+        self._tick_interval = None
+        BUFFER.stop_loader()
+        HEADER_CLOCK.suspend()
+
+    def resume(self):
+        if not self._suspended:
+            return
+        from dashboard_gui.ui.common.header_online import HEADER_CLOCK
+        print("[STATE] RESUME")
+        self._suspended = False
+        HEADER_CLOCK.resume()
+        if self._loader_wanted:
+            BUFFER.start_loader(on_update=self._frames_trigger)
+        # sofort den aktuellen Stand zeigen, danach wieder adaptiv
+        self._last_data = time.monotonic()
+        self._schedule_tick(0)
+
+    # ---------------------------------------------------------
+    # CHANGE EVENTS (state_events) – Widgets abonnieren statt Frames zu lesen
+    # ---------------------------------------------------------
+    def subscribe(self, event, fn):
+        """value_changed / status_changed / device_added / device_removed"""
+        STATE_EVENTS.subscribe(event, fn)
+
+    def unsubscribe(self, event, fn):
+        STATE_EVENTS.unsubscribe(event, fn)
 
 
     def set_active_channel(self, channel):
@@ -123,51 +291,61 @@ class GlobalStateManager:
     # Screen Attach
     # ---------------------------------------------------------
     def attach_dashboard(self, scr):
-        self.dashboard_ref = scr
+        self._subscribe("dashboard_ref", scr)
 
     def attach_fullscreen(self, scr):
-        self.fullscreen_ref = scr
+        self._subscribe("fullscreen_ref", scr)
 
     def attach_setup(self, scr):
-        self.setup_ref = scr
+        self._subscribe("setup_ref", scr)
     def attach_about(self, scr):
-        self.about_ref = scr
+        self._subscribe("about_ref", scr)
     def attach_settings(self, scr):
-        self.settings_ref = scr
+        self._subscribe("settings_ref", scr)
     def attach_vpd_scatter(self, scr):
-        self.vpd_scatter_ref = scr
+        self._subscribe("vpd_scatter_ref", scr)
     def attach_debug(self, scr):
-        self.debug_ref = scr
+        self._subscribe("debug_ref", scr)
     def attach_csv_viewer(self, scr):
-        self.csv_viewer_ref = scr
+        self._subscribe("csv_viewer_ref", scr)
     def attach_cam_viewer(self, scr):
-        self.cam_viewer_ref = scr        
+        self._subscribe("cam_viewer_ref", scr)
     def attach_device_picker(self, scr):
-        self.device_picker_ref = scr
+        self._subscribe("device_picker_ref", scr)
+
+    # ---------------------------------------------------------
+    # Subscription – nur sichtbare Screens bekommen den Tick
+    # ---------------------------------------------------------
+    def _subscribe(self, name, scr):
+        setattr(self, name, scr)
+        self._dirty.add(name)
+        scr.bind(on_pre_enter=lambda *_: self._on_screen_enter(name))
+
+    def _screens(self):
+        for name in SCREEN_REFS:
+            scr = getattr(self, name)
+            if scr:
+                yield name, scr
+
+    def _on_screen_enter(self, name):
+        """Screen wird gleich sichtbar → LED + verpasste Updates einmal nachholen."""
+        scr = getattr(self, name)
+        if not scr:
+            return
+        scr.header.set_led(self.led_state)
+        if hasattr(scr.header, "_update_clock"):
+            scr.header._update_clock()
+        if name in self._dirty and self._last_out is not None:
+            self._dirty.discard(name)
+            scr.update_from_global(self._last_out)
     # ---------------------------------------------------------
     # LED Helpers
     # ---------------------------------------------------------
     def _push_led(self):
-        if self.dashboard_ref:
-            self.dashboard_ref.header.set_led(self.led_state)
-        if self.fullscreen_ref:
-            self.fullscreen_ref.header.set_led(self.led_state)
-        if self.setup_ref:
-            self.setup_ref.header.set_led(self.led_state)
-        if self.about_ref:
-            self.about_ref.header.set_led(self.led_state)
-        if self.settings_ref:
-            self.settings_ref.header.set_led(self.led_state)
-        if self.vpd_scatter_ref:
-            self.vpd_scatter_ref.header.set_led(self.led_state)
-        if self.debug_ref:
-            self.debug_ref.header.set_led(self.led_state)
-        if self.csv_viewer_ref:
-            self.csv_viewer_ref.header.set_led(self.led_state)            
-        if self.cam_viewer_ref:
-            self.cam_viewer_ref.header.set_led(self.led_state)            
-        if self.device_picker_ref:
-            self.device_picker_ref.header.set_led(self.led_state)
+        # versteckte Header holen sich led_state in _on_screen_enter
+        for _name, scr in self._screens():
+            if _is_visible(scr):
+                scr.header.set_led(self.led_state)
     def _led_offline(self):
         self.led_state = {"alive": False, "status": "offline"}
         self._push_led()
@@ -193,6 +371,9 @@ class GlobalStateManager:
         self.running = True
         self._led_offline()
         self._refresh_all_buttons()
+        # aus dem Offline-Backoff sofort zurück
+        self._last_data = time.monotonic()
+        self._tick_soon()
 
     def stop(self):
         print("[STATE] STOP")
@@ -205,6 +386,8 @@ class GlobalStateManager:
         print("[STATE] RESET")
         self._led_offline()
         self._last_counter = None
+        # nächster Snapshot meldet alle Werte neu
+        STATE_EVENTS.forget()
         self._refresh_all_buttons()
     
         if self.dashboard_ref:
@@ -218,10 +401,16 @@ class GlobalStateManager:
     # ---------------------------------------------------------
     def _global_update(self, dt):
         BUFFER.soft_reload()
-        data = BUFFER.get()
+        snap = BUFFER.snapshot
+        data = snap.data
     
         if not self.running:
             return
+
+        # nur bei neuem Snapshot: Unterschiede → Events an die Abonnenten.
+        # Der Decoder schreibt jeden Tick neu → "neue Daten" erst bei echten Änderungen
+        if STATE_EVENTS.diff(snap):
+            self._last_data = time.monotonic()
     
         if not data or not isinstance(data, list):
             self._led_nodata()
@@ -237,10 +426,9 @@ class GlobalStateManager:
         dev_id = d.get("device_id")
         
 
-        # MAC flatten
-        mac = _extract_mac(d.get("device_id"))
-        d["device_id"] = mac
-        d["device_id_flat"] = mac
+        # MAC flach + aktive Keys – macht der Loader beim Vorverarbeiten (Snapshot read-only)
+        prep = snap.prepared[idx] if idx < len(snap.prepared) else None
+        mac = prep.mac if prep else extract_mac(dev_id)
     
         # ---------------------------------------------------------
         # ALIVE / COUNTER / LED AUF BASIS DES AKTIVEN KANALS
@@ -297,7 +485,7 @@ class GlobalStateManager:
         # ---------------------------------------------------------
         # ACTIVE KEYS → Kanalbasis
         # ---------------------------------------------------------
-        d["_active_keys"] = self.extract_active_keys(d)
+        keys = prep.keys if prep else self.extract_active_keys(d)
     
         # ---------------------------------------------------------
         # SCREEN UPDATES (Dashboard & Fullscreen)
@@ -305,8 +493,8 @@ class GlobalStateManager:
         # ---------------------------------------------------------
         
         out = {
-            "device_id": d.get("device_id"),
-            "device_id_flat": d.get("device_id_flat"),
+            "device_id": mac,
+            "device_id_flat": mac,
             "channel": ch_name,
             ch_name: ch,
             "adv": d.get("adv"),
@@ -314,87 +502,23 @@ class GlobalStateManager:
             "bridge_alive": d.get("bridge_alive"),
             "bridge_status": d.get("bridge_status"),
             "health": d.get("health"),
-            "_active_keys": d["_active_keys"],
+            "_active_keys": keys,
+            "_version": BUFFER.version,
         }
     
-        if self.dashboard_ref:
-            self.dashboard_ref.update_from_global(out)
-        if self.fullscreen_ref:
-            self.fullscreen_ref.update_from_global(out)
-        if self.setup_ref:
-            self.setup_ref.update_from_global(out)
-        if self.about_ref:
-            self.about_ref.update_from_global(out)            
-        if self.settings_ref:
-            self.settings_ref.update_from_global(out) 
-        if self.vpd_scatter_ref:
-            self.vpd_scatter_ref.update_from_global(out)
-        if self.debug_ref:
-            self.debug_ref.update_from_global(out)            
-        if self.csv_viewer_ref:
-            self.csv_viewer_ref.update_from_global(out)
-        if self.cam_viewer_ref:
-            self.cam_viewer_ref.update_from_global(out)            
-        if self.device_picker_ref:
-            self.device_picker_ref.update_from_global(out)
+        self._last_out = out
+        for name, scr in self._screens():
+            if _is_visible(scr):
+                self._dirty.discard(name)
+                scr.update_from_global(out)
+            else:
+                self._dirty.add(name)
 
     # ---------------------------------------------------------
     # Active Keys – MULTI-CHANNEL (adv + gatt, ohne Vorrang)
     # ---------------------------------------------------------
     def extract_active_keys(self, d):
-        active = set()
-
-        # Neuer Multi-Channel-Pfad: adv / gatt
-        for ch_name in ("adv", "gatt"):
-            ch = d.get(ch_name)
-            if not isinstance(ch, dict):
-                continue
-
-            internal = ch.get("internal", {})
-            external = ch.get("external", {})
-            vpd_int = ch.get("vpd_internal", {})
-            vpd_ext = ch.get("vpd_external", {})
-
-            # interne Werte
-            if internal.get("temperature", {}).get("value") is not None:
-                active.add("temp_in")
-            if internal.get("humidity", {}).get("value") is not None:
-                active.add("hum_in")
-            if vpd_int.get("value") is not None:
-                active.add("vpd_in")
-
-            # externe Werte
-            if external.get("present"):
-                if external.get("temperature", {}).get("value") is not None:
-                    active.add("temp_ex")
-                if external.get("humidity", {}).get("value") is not None:
-                    active.add("hum_ex")
-                if vpd_ext.get("value") is not None:
-                    active.add("vpd_ex")
-
-        # Fallback für ALTEN Single-Channel-Frame (falls mal nötig)
-        if not active and "internal" in d:
-            internal = d.get("internal", {})
-            external = d.get("external", {})
-            vpd_int = d.get("vpd_internal", {})
-            vpd_ext = d.get("vpd_external", {})
-
-            if internal.get("temperature", {}).get("value") is not None:
-                active.add("temp_in")
-            if internal.get("humidity", {}).get("value") is not None:
-                active.add("hum_in")
-            if vpd_int.get("value") is not None:
-                active.add("vpd_in")
-
-            if external.get("present"):
-                if external.get("temperature", {}).get("value") is not None:
-                    active.add("temp_ex")
-                if external.get("humidity", {}).get("value") is not None:
-                    active.add("hum_ex")
-                if vpd_ext.get("value") is not None:
-                    active.add("vpd_ex")
-
-        return list(active)
+        return active_keys(d)
 
     # ---------------------------------------------------------
     # Button Sync
@@ -41,6 +41,8 @@ class SettingsScreen(Screen):
     
         cfg["refresh_interval"] = float(values["refresh_interval"])
         cfg["ui_refresh_interval"] = float(values["ui_refresh_interval"])
+        cfg["ui_max_fps"] = float(values["ui_max_fps"])
+        cfg["ui_idle_interval"] = float(values["ui_idle_interval"])
         cfg["stale_timeout"] = float(values["stale_timeout"])
     
         cfg["temperature_offset"] = float(values["temperature_offset"])
@@ -11,6 +11,7 @@ from kivy.utils import platform
 
 from dashboard_gui.ui.setup_content.setup_main_panel import SetupMainPanel
 from dashboard_gui.ui.common.header_online import HeaderBar
+from dump_snapshot import get_snapshot
 import config
 
 
@@ -97,19 +98,16 @@ class SetupScreen(Screen):
     def update_devices(self, *_):
         self.panel.clear_devices()
     
-        path = _raw_path()
-        if not os.path.exists(path):
+        snap = get_snapshot(_raw_path())
+        if snap.sig is None:
             print("[Setup] dump fehlt")
             return
     
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                arr = json.load(f)
-        except Exception:
+        if not snap.valid:
             print("[Setup] JSON Fehler")
             return
     
-        for e in arr:
+        for e in snap.entries:
             mac = e.get("address")
             raw = e.get("adv_raw") or e.get("gat_raw") or e.get("log_raw")
             name = e.get("name") or mac
@@ -0,0 +1,126 @@
+# state_events.py – Änderungs-Events aus dem Frame-Snapshot
+#
+# Statt jedem Screen pro Tick den kompletten Frame zu geben, vergleicht
+# diff() den neuen Snapshot mit dem vorigen und meldet nur, was sich
+# geändert hat:
+#
+#   value_changed(device, channel, metric, value, ts, unit)
+#       metric = Tile-Key (temp_in, hum_in, vpd_in, temp_ex, hum_ex, vpd_ex)
+#       nur für lebende Kanäle; neuer Wert ODER neuer Zeitstempel
+#       (gleicher Wert, neue Messung = neuer Verlaufspunkt)
+#   status_changed(device, channel, alive, status)
+#   device_added(device, name)
+#   device_removed(device)
+#
+# Läuft auf dem Main-Thread (GSM-Tick), Abonnenten dürfen Widgets anfassen.
+
+from timeparse import parse_ts
+from dashboard_gui.data_buffer import tile_values
+
+EVENTS = ("value_changed", "status_changed", "device_added", "device_removed")
+CHANNELS = ("adv", "gatt")
+
+
+class StateEvents:
+    def __init__(self):
+        self._subs = {name: [] for name in EVENTS}
+        self._values = {}         # (device, channel, metric) → (value, ts)
+        self._status = {}         # (device, channel) → (alive, status)
+        self._devices = {}        # device → name
+        self._version = None
+
+    # ---------------------------------------------------------
+    # ABONNIEREN
+    # ---------------------------------------------------------
+    def subscribe(self, event, fn):
+        if event not in self._subs:
+            raise ValueError(f"unknown event: {event}")
+        if fn not in self._subs[event]:
+            self._subs[event].append(fn)
+
+    def unsubscribe(self, event, fn):
+        try:
+            self._subs[event].remove(fn)
+        except (KeyError, ValueError):
+            pass
+
+    def _emit(self, event, *args):
+        for fn in self._subs[event]:
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[Events] {event} handler failed:", e)
+
+    def forget(self):
+        """Vorigen Stand vergessen → nächster diff() meldet alles neu (Reset)."""
+        self._values = {}
+        self._status = {}
+        self._devices = {}
+        self._version = None
+
+    # ---------------------------------------------------------
+    # DIFF
+    # ---------------------------------------------------------
+    def diff(self, snapshot):
+        """
+        Snapshot mit dem vorigen vergleichen und alle Events melden
+        → Anzahl value_changed + status_changed (0 = keine neuen Messdaten).
+        """
+        if snapshot.version == self._version:
+            return 0
+        self._version = snapshot.version
+
+        frames = snapshot.data if isinstance(snapshot.data, list) else []
+        prepared = snapshot.prepared
+        values = {}
+        status = {}
+        devices = {}
+
+        for i, d in enumerate(frames):
+            if not isinstance(d, dict):
+                continue
+            dev = d.get("device_id")
+            if not dev:
+                continue
+            devices[dev] = d.get("name")
+            ts = parse_ts(d.get("timestamp"))
+            prep = prepared[i].values if i < len(prepared) and prepared[i] else None
+
+            for ch in CHANNELS:
+                stream = d.get(ch)
+                if not isinstance(stream, dict):
+                    continue
+                alive = bool(stream.get("alive"))
+                status[(dev, ch)] = (alive, stream.get("status"))
+                if not alive:
+                    continue
+                vals = prep[ch] if prep and ch in prep else tile_values(stream)
+                for metric, (v, unit) in vals.items():
+                    values[(dev, ch, metric)] = (v, ts, unit)
+
+        n = 0
+        for dev, name in devices.items():
+            if dev not in self._devices:
+                self._emit("device_added", dev, name)
+        for dev in self._devices:
+            if dev not in devices:
+                self._emit("device_removed", dev)
+
+        for key, st in status.items():
+            if self._status.get(key) != st:
+                self._emit("status_changed", key[0], key[1], st[0], st[1])
+                n += 1
+
+        for key, (v, ts, unit) in values.items():
+            if self._values.get(key) != (v, ts):
+                self._emit("value_changed", key[0], key[1], key[2], v, ts, unit)
+                n += 1
+
+        self._devices = devices
+        self._status = status
+        self._values = {k: (v, ts) for k, (v, ts, _u) in values.items()}
+        return n
+
+
+# global Singleton
+STATE_EVENTS = StateEvents()
@@ -18,6 +18,40 @@ from kivy.app import App
 
 from dashboard_gui.ui.scaling_utils import dp_scaled, sp_scaled
 from dashboard_gui.ui.common.window_picker import WindowPicker
+# -------------------------------------------------------
+# Shared Clock – EIN Ticker für alle HeaderBars
+# -------------------------------------------------------
+class _HeaderClock:
+    """Aktualisiert nur Header, die gerade im Fenster hängen (sichtbarer Screen)."""
+
+    def __init__(self):
+        self._headers = []
+        self._event = None
+
+    def register(self, header):
+        self._headers.append(header)
+        if self._event is None:
+            self._event = Clock.schedule_interval(self._tick, 1)
+
+    def suspend(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def resume(self):
+        if self._event is None and self._headers:
+            self._event = Clock.schedule_interval(self._tick, 1)
+            self._tick()
+
+    def _tick(self, *_):
+        for header in self._headers:
+            if header.get_root_window() is not None:
+                header._update_clock()
+
+
+HEADER_CLOCK = _HeaderClock()
+
+
 # -------------------------------------------------------
 # IconLabel
 # -------------------------------------------------------
@@ -413,7 +447,7 @@ class HeaderBar(BoxLayout):
 
         self.lbl_clock = Label(text="--:--", font_size=sp_scaled(20),
                                size_hint=(0.10, 1))
-        Clock.schedule_interval(self._update_clock, 1)
+        HEADER_CLOCK.register(self)
 
 
         # MENU BUTTON
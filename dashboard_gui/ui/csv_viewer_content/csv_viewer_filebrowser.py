@@ -115,7 +115,7 @@ class CSVViewerFileBrowser(FloatLayout):
 
         if os.path.exists(base):
             for name in sorted(os.listdir(base)):
-                if name.endswith(".csv") or name.endswith(".json"):
+                if name.endswith((".csv", ".csv.gz", ".json", ".db")):
                     btn = Button(
                         text=name,
                         size_hint_y=None,
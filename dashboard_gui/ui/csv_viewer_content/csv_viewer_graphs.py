@@ -1,24 +1,87 @@
 # csv_viewer_graphs.py – Dark-Pro Edition
 # ------------------------------------------
 
-import csv
 import math
+import time
 
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy_garden.graph import Graph, LinePlot
 from kivy.uix.button import Button
+from kivy.uix.spinner import Spinner
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.behaviors import ButtonBehavior
 
 from dashboard_gui.ui.scaling_utils import dp_scaled, sp_scaled
+from history_writer import CsvFollower
+from dashboard_gui.ui.csv_viewer_content.csv_viewer_loader import BackgroundLoader
+from dashboard_gui.ui.csv_viewer_content import csv_viewer_series
+import analytics
+
+# Overlay: weitere Geräte in abgestufter Helligkeit derselben Spaltenfarbe
+SHADES = (1.0, 0.6, 1.35, 0.4, 1.7)
+
+
+def _shade(c, idx):
+    f = SHADES[idx % len(SHADES)]
+    return (min(1.0, c[0] * f), min(1.0, c[1] * f), min(1.0, c[2] * f), c[3])
+
+
+# Zeitachse: Einheit nach Gesamtspanne, Lücke = Bridge offline / App zu
+UNITS = ((2 * 3600, 60.0, "min"), (2 * 86400, 3600.0, "h"), (None, 86400.0, "d"))
+GAP_MIN_S = 30.0
+GAP_FACTOR = 5.0
+
+
+def _unit_for(span_s):
+    for limit, unit, name in UNITS:
+        if limit is None or span_s < limit:
+            return unit, name
+
+
+def _nice_step(span):
+    """~5 Ticks: 1/2/5 × 10^k."""
+    if span <= 0:
+        return 1.0
+    raw = span / 5.0
+    mag = 10 ** math.floor(math.log10(raw))
+    for f in (1, 2, 5, 10):
+        if raw <= f * mag:
+            return f * mag
+    return 10 * mag
+
+
+def _gap_limit(ts):
+    """Abstand, ab dem zwei Punkte NICHT mehr verbunden werden."""
+    dts = sorted(b - a for a, b in zip(ts, ts[1:]))
+    if not dts:
+        return GAP_MIN_S
+    return max(GAP_MIN_S, GAP_FACTOR * dts[len(dts) // 2])
+
+
+def _runs(ts, vals, t_ref, unit):
+    """Punktfolge an Lücken auftrennen → [[(x, y), ...], ...]"""
+    runs = []
+    cur = []
+    limit = _gap_limit(ts)
+    last = None
+    for t, v in zip(ts, vals):
+        if last is not None and t - last > limit:
+            runs.append(cur)
+            cur = []
+        cur.append(((t - t_ref) / unit, v))
+        last = t
+    if cur:
+        runs.append(cur)
+    return runs
+
 
 
 class CSVGraphView(BoxLayout):
     """
     Modernisierte Dark-Pro Version des CSV-Graphen:
     - Multi Series (T_i, H_i, T_e, H_e, rssi)
-    - Smoothing identisch zu deinen ChartTiles
+    - Smoothing wie in den ChartTiles (EMA), wahlweise Median / Savitzky–Golay
     - Glow-Linien
     - Autoscaling
     - Zoom + Drag
@@ -40,17 +103,36 @@ class CSVGraphView(BoxLayout):
         self._zoom_x = 1.0        # Zoom Zeitachse
         self._zoom_y = 1.0        # Zoom Y
         self._pan_y = 0.0         # Y-Pan
-        self._x_center = None     # Zeit-Mittelpunkt (Index)
+        self._x_center = None     # Zeit-Mittelpunkt (x-Einheiten)
+        self._at_end = True       # rechter Rand → Follow läuft mit
         self._drag_start = None  # aktiver Drag
+
+        # x = (t - _t_ref) / _x_unit  → 0 = neuester Punkt beim Laden
+        self._t_ref = None
+        self._x_unit = 60.0
+        self._x_unit_name = "min"
     
         # ---------------------------------------------------------
         # DATA
         # ---------------------------------------------------------
         self.csv_path = None
-        self.data_series = {}     # {col: [raw]}
-        self.smoothed = {}        # {col: [smoothed]}
+        self.data_series = {}     # {(device, channel, col): [raw]}
+        self.data_times = {}      # {(device, channel, col): [epoch]}
+        self.smoothed = {}        # {(device, channel, col): [smoothed]}
         self.window = 300
         self.smoothing = 0.25
+        self.filter_mode = "ema"  # analytics.FILTERS
+        self._follower = None     # Live-Follow auf das aktive Segment
+        self._loader = BackgroundLoader("CSVGraphView")
+        self._follow_loader = BackgroundLoader("CSVGraphFollow")
+        self._following = False   # Follow-Lesen läuft im Thread
+
+        # Auswahl: [(device, channel), ...] – leer = neuestes Gerät
+        self.selection = []
+        self.overlay = False
+        self.available = {}       # (device, channel) -> name
+        self._key_by_label = {}
+        self._picking = False     # Spinner-Text wird gerade programmatisch gesetzt
 
         # ---------------------------------------------------------
         # COLORS – kompatibel zu deinen ChartTiles
@@ -84,6 +166,47 @@ class CSVGraphView(BoxLayout):
         self.lbl_title.bind(size=lambda *_: self.lbl_title.texture_update())
         header.add_widget(self.lbl_title)
 
+        # Gerät/Kanal-Auswahl
+        self.sp_series = Spinner(
+            text="Gerät",
+            values=[],
+            size_hint=(None, 1),
+            width=dp_scaled(220),
+            background_normal="",
+            background_color=(0.15, 0.18, 0.28, 1),
+            color=(0.95, 0.95, 0.98, 1),
+            font_size=sp_scaled(13),
+        )
+        self.sp_series.bind(text=self._on_series_pick)
+        header.add_widget(self.sp_series)
+
+        self.btn_overlay = Button(
+            text="Overlay: aus",
+            size_hint=(None, 1),
+            width=dp_scaled(120),
+            background_normal="",
+            background_down="",
+            background_color=(0.12, 0.12, 0.18, 1),
+            color=(0.95, 0.95, 0.98, 1),
+            font_size=sp_scaled(13),
+        )
+        self.btn_overlay.bind(on_release=self._toggle_overlay)
+        header.add_widget(self.btn_overlay)
+
+        # Glättung: EMA → Median → Savitzky–Golay → roh
+        self.btn_filter = Button(
+            text="Filter: EMA",
+            size_hint=(None, 1),
+            width=dp_scaled(130),
+            background_normal="",
+            background_down="",
+            background_color=(0.12, 0.12, 0.18, 1),
+            color=(0.95, 0.95, 0.98, 1),
+            font_size=sp_scaled(13),
+        )
+        self.btn_filter.bind(on_release=self._cycle_filter)
+        header.add_widget(self.btn_filter)
+
         # Reset Zoom Button
         btn_reset = Button(
             text="Reset Zoom",
@@ -111,7 +234,7 @@ class CSVGraphView(BoxLayout):
             x_ticks_minor=0,
             y_ticks_major=0,
             y_ticks_minor=0,
-            x_grid_label=False,
+            x_grid_label=True,
             y_grid_label=False,
             draw_border=False,
             padding=dp_scaled(4),
@@ -130,22 +253,10 @@ class CSVGraphView(BoxLayout):
         self.graph.bind(on_touch_up=self._on_touch_up)
 
 
-        # PLots
+        # Plots – pro (device, channel, col, lauf), werden bei Bedarf angelegt
         self.plots_main = {}
         self.plots_glow = {}
 
-        for col, c in self.colors.items():
-            # Hauptlinie
-            p_main = LinePlot(color=c, line_width=2.2)
-            self.graph.add_plot(p_main)
-            self.plots_main[col] = p_main
-
-            # Glow-Linie
-            glow = [c[0], c[1], c[2], 0.25]
-            p_glow = LinePlot(color=glow, line_width=5.5)
-            self.graph.add_plot(p_glow)
-            self.plots_glow[col] = p_glow
-
         self.add_widget(self.graph)
 
         # ---------------------------------------------------------
@@ -178,58 +289,215 @@ class CSVGraphView(BoxLayout):
     # PUBLIC API
     # ---------------------------------------------------------
     def set_csv_path(self, p):
+        """Laden läuft im Hintergrund; ein neuer Pfad bricht den alten Job ab."""
+        if p != self.csv_path:
+            self.selection = []
+            self.available = {}
         self.csv_path = p
-        self._read_csv()
+        self._reload()
+
+    def cancel_load(self):
+        """Laufendes Laden verwerfen (Dateiwechsel / Tab verlassen)."""
+        self._loader.cancel()
+        self._cancel_follow()
+
+    def _cancel_follow(self):
+        self._follow_loader.cancel()
+        self._following = False
+
+    def _reload(self):
+        p = self.csv_path
+        self._follower = None
+        self._cancel_follow()
+        self.data_series = {}
+        self.data_times = {}
+        self._smooth()
+        self._t_ref = None
+        self._x_center = None
+        self._at_end = True
+        self._redraw()
+
+        if not p:
+            return
+
+        keys = list(self.selection)
+        self.lbl_stats.text = "Lade …"
+        self._loader.start(
+            lambda job: self._load(p, keys, job),
+            on_done=self._on_loaded,
+            on_progress=self._on_progress,
+            on_error=self._on_error,
+        )
+
+    def _on_progress(self, fraction, partial):
+        if partial:
+            self._apply(partial)
+        self.lbl_stats.text = f"Lade … {int(fraction * 100)} %"
+
+    def _on_loaded(self, result):
+        res, follower = result
+        self._apply(res)
+        self._follower = follower
+
+    def _on_error(self, e):
+        self.lbl_stats.text = f"Fehler beim Lesen: {e}"
+
+    def _apply(self, res):
+        self.selection = list(res.keys)
+        self.available.update(res.available)
+        self._update_selector()
+
+        self.data_series = res.series
+        self.data_times = res.times
+        self._smooth()
+        self._set_time_ref()
         # Startansicht: rechts (neueste Daten)
-        max_len = max((len(v) for v in self.smoothed.values()), default=0)
-        self._x_center = max_len
+        self._x_center = None
+        self._at_end = True
         self._redraw()
 
+    def _set_time_ref(self):
+        """Bezugszeit + Einheit aus den geladenen Daten (bleibt beim Follow fest)."""
+        first = [ts[0] for ts in self.data_times.values() if ts]
+        last = [ts[-1] for ts in self.data_times.values() if ts]
+        if not last:
+            self._t_ref = None
+            return
+        self._t_ref = max(last)
+        self._x_unit, self._x_unit_name = _unit_for(self._t_ref - min(first))
+
     # ---------------------------------------------------------
-    # CSV LESEN + SMOOTHING
+    # GERÄT / KANAL AUSWAHL
     # ---------------------------------------------------------
-    def _read_csv(self):
-        self.data_series = {k: [] for k in self.colors.keys()}
+    def _label(self, key):
+        dev, ch = key
+        name = self.available.get(key) or dev[:8]
+        mark = "● " if key in self.selection else ""
+        return f"{mark}{name} · {ch}"
+
+    def _update_selector(self):
+        keys = sorted(self.available, key=lambda k: (self.available.get(k) or k[0], k[1]))
+        self._key_by_label = {self._label(k): k for k in keys}
+        self.sp_series.values = list(self._key_by_label)
+
+        if not self.selection:
+            text = "Gerät"
+        elif len(self.selection) == 1:
+            text = self._label(self.selection[0])[2:]
+        else:
+            text = f"{len(self.selection)} Serien"
+        self._picking = True
+        self.sp_series.text = text
+        self._picking = False
+
+    def _on_series_pick(self, _sp, text):
+        if self._picking:
+            return
+        key = self._key_by_label.get(text)
+        if key is None:
+            return
+
+        if not self.overlay:
+            sel = [key]
+        elif key in self.selection:
+            sel = [k for k in self.selection if k != key] or [key]
+        else:
+            sel = self.selection + [key]
+
+        if sel != self.selection:
+            self.selection = sel
+            self._reload()
+        else:
+            self._update_selector()
+
+    def _toggle_overlay(self, *_):
+        self.overlay = not self.overlay
+        self.btn_overlay.text = "Overlay: an" if self.overlay else "Overlay: aus"
+        self.btn_overlay.background_color = (
+            (0.20, 0.30, 0.70, 1) if self.overlay else (0.12, 0.12, 0.18, 1)
+        )
+        # zurück auf ein Gerät
+        if not self.overlay and len(self.selection) > 1:
+            self.selection = self.selection[:1]
+            self._reload()
 
-        if not self.csv_path:
+    # ---------------------------------------------------------
+    # CSV LESEN (Worker-Thread – kein Zugriff auf Widgets!)
+    # ---------------------------------------------------------
+    def _load(self, path, keys, job):
+        """→ (SeriesResult, follower); meldet pro Segment einen Zwischenstand."""
+        res = csv_viewer_series.load(path, keys, self.window, job)
+        job.check()
+        follower = CsvFollower(path) if path.endswith(".csv") else None
+        return res, follower
+
+    @staticmethod
+    def _read_new(follower, keys):
+        """Worker: angehängte Zeilen lesen, nur die Auswahl parsen → SeriesResult | None"""
+        rows = follower.read_new()
+        if not rows:
+            return None
+        res = csv_viewer_series.SeriesResult(keys)
+        for row in rows:
+            res.add_row(row)
+        return res
+
+    def follow(self):
+        """Nur die seit dem letzten Aufruf angehängten Zeilen übernehmen (Lesen im Thread)."""
+        if self._follower is None or self._following:
             return
+        follower, keys = self._follower, list(self.selection)
+        self._following = True
+        self._follow_loader.start(
+            lambda job: self._read_new(follower, keys),
+            on_done=self._on_follow,
+            on_error=lambda e: self._cancel_follow(),
+        )
 
-        try:
-            with open(self.csv_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    for col in self.colors.keys():
-                        raw_val = row.get(col)
-                        if not raw_val:
-                            continue
-                        try:
-                            v = float(raw_val)
-                            self.data_series[col].append(v)
-                        except:
-                            pass
-        except Exception as e:
-            print("[CSVGraphView] Error:", e)
+    def _on_follow(self, part):
+        self._following = False
+        if part is None:
             return
 
-        # Auf Fenstergröße kürzen
-        for col in self.data_series:
-            arr = self.data_series[col]
-            if len(arr) > self.window:
-                self.data_series[col] = arr[-self.window:]
-
-        # Smoothe Serien erzeugen
-        self.smoothed = {k: [] for k in self.colors}
-        for col, arr in self.data_series.items():
-            last = None
-            out = []
-            for v in arr:
-                if last is None:
-                    sm = v
-                else:
-                    sm = last * (1 - self.smoothing) + v * self.smoothing
-                out.append(sm)
-                last = sm
-            self.smoothed[col] = out
+        res = csv_viewer_series.SeriesResult(self.selection)
+        res.available = part.available
+        res.series = self.data_series
+        res.times = self.data_times
+        for k, vals in part.series.items():
+            res.series.setdefault(k, []).extend(vals)
+            res.times.setdefault(k, []).extend(part.times[k])
+        res.trim(self.window)
+
+        # neue Geräte/Namen → Selektor
+        new = {k: n for k, n in res.available.items()
+               if k not in self.available or (n and not self.available[k])}
+        if new:
+            self.available.update(new)
+            self._update_selector()
+
+        self.data_series = res.series
+        self.data_times = res.times
+        self._smooth()
+        if self._t_ref is None:
+            self._set_time_ref()
+
+        # am rechten Rand → _redraw läuft mit
+        self._redraw()
+
+    def _smooth(self):
+        # Smoothe Serien erzeugen (vektorisiert, analytics)
+        self.smoothed = {
+            key: analytics.to_list(analytics.smooth(arr, self.filter_mode, alpha=self.smoothing))
+            for key, arr in self.data_series.items()
+        }
+
+    def _cycle_filter(self, *_):
+        i = analytics.FILTERS.index(self.filter_mode)
+        self.filter_mode = analytics.FILTERS[(i + 1) % len(analytics.FILTERS)]
+        names = {"ema": "EMA", "median": "Median", "savgol": "S-G", "raw": "roh"}
+        self.btn_filter.text = f"Filter: {names[self.filter_mode]}"
+        self._smooth()
+        self._redraw()
 
     # ---------------------------------------------------------
     # GRAPH RESET
@@ -242,8 +510,8 @@ class CSVGraphView(BoxLayout):
         self._pan_y = 0.0
         self._drag_start = None
     
-        max_len = max((len(v) for v in self.smoothed.values()), default=0)
-        self._x_center = max_len
+        self._x_center = None
+        self._at_end = True
     
         self._redraw()
     # ---------------------------------------------------------
@@ -251,20 +519,16 @@ class CSVGraphView(BoxLayout):
     # ---------------------------------------------------------
     def _redraw(self):
 
-        all_vals = []
-        for arr in self.smoothed.values():
-            all_vals.extend(arr)
+        stats = [st for st in (analytics.summary(a, percentiles=()) for a in self.smoothed.values()) if st]
 
-        if not all_vals:
-            for col in self.colors:
-                self.plots_main[col].points = []
-                self.plots_glow[col].points = []
+        if not stats:
+            self._sync_plots()
             self.graph.ymin = 0
             self.graph.ymax = 1
             return
 
-        mn = min(all_vals)
-        mx = max(all_vals)
+        mn = min(st["min"] for st in stats)
+        mx = max(st["max"] for st in stats)
         
         if math.isclose(mn, mx):
             mn -= 0.5
@@ -287,36 +551,108 @@ class CSVGraphView(BoxLayout):
         self.graph.ymin = base_mid_y - span_y / 2 + self._pan_y
         self.graph.ymax = base_mid_y + span_y / 2 + self._pan_y
         
-        # X (Zeit) – NUR über _x_center
-        max_len = max(len(arr) for arr in self.smoothed.values())
-        if max_len <= 1:
-            self.graph.xmin = 0
-            self.graph.xmax = 1
+        # X (Zeit) – NUR über _x_center, in Einheiten ab _t_ref
+        lo, hi = self._x_bounds()
+        full = hi - lo
+        if full <= 0:
+            self.graph.xmin = lo - 0.5
+            self.graph.xmax = hi + 0.5
+            self._x_center = hi
         else:
-            # falls noch nicht gesetzt (z.B. wenn _redraw vor set_csv_path läuft)
-            if self._x_center is None:
-                self._x_center = max_len
+            span_x = full / self._zoom_x
+            # Minimum Fenster (10 s), damit es nicht kollabiert
+            span_x = max(10.0 / self._x_unit, span_x)
+            half = span_x / 2
 
-            span_x = max_len / self._zoom_x
-            span_x = max(5.0, span_x)  # Minimum Fenster, damit es nicht kollabiert
+            # falls noch nicht gesetzt oder rechter Rand → neueste Daten
+            if self._x_center is None or self._at_end:
+                self._x_center = hi
 
             # clamp center, damit du nicht "aus dem Chart" scrollst
-            half = span_x / 2
-            self._x_center = max(half, min(max_len - half, self._x_center))
+            if span_x >= full:
+                self._x_center = (lo + hi) / 2
+            else:
+                self._x_center = max(lo + half, min(hi - half, self._x_center))
 
             self.graph.xmin = self._x_center - half
             self.graph.xmax = self._x_center + half
 
+        step = _nice_step(self.graph.xmax - self.graph.xmin)
+        self.graph.x_ticks_major = step
+        self.graph.xlabel = f"{self._x_unit_name} • 0 = {self._fmt_time(self._t_ref)}"
 
-        # Punkte setzen
-        for col, arr in self.smoothed.items():
-            pts = [(i, v) for i, v in enumerate(arr)]
-            self.plots_main[col].points = pts
-            self.plots_glow[col].points = pts
+        # Punkte setzen – pro Lücke ein eigener Lauf
+        runs = {}
+        for key, arr in self.smoothed.items():
+            runs[key] = _runs(self.data_times.get(key, ()), arr, self._t_ref, self._x_unit)
+        self._sync_plots(runs)
+        for pk, pts in self._plot_points(runs):
+            self.plots_main[pk].points = pts
+            self.plots_glow[pk].points = pts
 
         # Footer
-        used_cols = [col for col, arr in self.smoothed.items() if arr]
-        self.lbl_stats.text = f"{max_len} Punkte • {', '.join(used_cols)}"
+        n_points = max(len(arr) for arr in self.smoothed.values())
+        n_gaps = sum(max(0, len(r) - 1) for r in runs.values())
+        used_cols = [c for c in self.colors if any(k[2] == c for k, a in self.smoothed.items() if a)]
+        t0 = self._t_ref + lo * self._x_unit
+        t1 = self._t_ref + hi * self._x_unit
+        text = (
+            f"{self._fmt_time(t0)} – {self._fmt_time(t1)} • "
+            f"{n_points} Punkte • {', '.join(used_cols)}"
+        )
+        if n_gaps:
+            text += f" • {n_gaps} Lücken"
+        if len(self.selection) > 1:
+            text += f" • {len(self.selection)} Serien"
+        self.lbl_stats.text = text
+
+    def _x_bounds(self):
+        """(links, rechts) aller Serien in x-Einheiten."""
+        if self._t_ref is None:
+            return 0.0, 0.0
+        first = [ts[0] for ts in self.data_times.values() if ts]
+        last = [ts[-1] for ts in self.data_times.values() if ts]
+        if not last:
+            return 0.0, 0.0
+        u = self._x_unit
+        return (min(first) - self._t_ref) / u, (max(last) - self._t_ref) / u
+
+    @staticmethod
+    def _fmt_time(t):
+        if t is None:
+            return "–"
+        return time.strftime("%d.%m. %H:%M:%S", time.localtime(t))
+
+    @staticmethod
+    def _plot_points(runs):
+        for key, parts in runs.items():
+            for i, pts in enumerate(parts):
+                yield key + (i,), pts
+
+    def _sync_plots(self, runs=None):
+        """LinePlots für die aktuellen Läufe anlegen, überzählige entfernen."""
+        wanted = {pk for pk, _ in self._plot_points(runs or {})}
+        for pk in [k for k in self.plots_main if k not in wanted]:
+            self.graph.remove_plot(self.plots_main.pop(pk))
+            self.graph.remove_plot(self.plots_glow.pop(pk))
+
+        for pk in sorted(wanted):
+            if pk in self.plots_main:
+                continue
+            dev, ch, col, _run = pk
+            idx = self.selection.index((dev, ch)) if (dev, ch) in self.selection else 0
+            c = _shade(self.colors[col], idx)
+
+            # Hauptlinie
+            p_main = LinePlot(color=c, line_width=2.2)
+            self.graph.add_plot(p_main)
+            self.plots_main[pk] = p_main
+
+            # Glow-Linie
+            glow = [c[0], c[1], c[2], 0.25]
+            p_glow = LinePlot(color=glow, line_width=5.5)
+            self.graph.add_plot(p_glow)
+            self.plots_glow[pk] = p_glow
 
     # ---------------------------------------------------------
     # DRAG / ZOOM Handling
@@ -361,6 +697,9 @@ class CSVGraphView(BoxLayout):
     
         self._x_center -= (dx_px / gw) * xspan
         self._pan_y -= (dy_px / gh) * yspan
+        # nach rechts an den Rand gezogen → wieder mitlaufen
+        _lo, hi = self._x_bounds()
+        self._at_end = self._x_center + xspan / 2 >= hi
     
         self._drag_start = touch.pos[:]
         self._redraw()
@@ -0,0 +1,81 @@
+# csv_viewer_loader.py – Laden im Hintergrund (Graph + Tabelle)
+# ------------------------------------------------------------
+# Worker-Thread parst, Kivy-Main-Thread zeichnet.
+#   - start() bricht einen laufenden Job ab (Generation hochzählen)
+#   - job.progress() / Ergebnis / Fehler → Clock.schedule_once
+#   - Callbacks eines abgebrochenen Jobs werden verworfen
+# ------------------------------------------------------------
+
+import threading
+
+from kivy.clock import Clock
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class LoadJob:
+    def __init__(self, loader, gen, on_progress):
+        self._loader = loader
+        self._gen = gen
+        self._on_progress = on_progress
+
+    @property
+    def cancelled(self):
+        return self._gen != self._loader.generation
+
+    def check(self):
+        """Im Worker regelmäßig aufrufen – wirft LoadCancelled."""
+        if self.cancelled:
+            raise LoadCancelled()
+
+    def progress(self, fraction, partial=None):
+        """Zwischenstand an die UI (fraction 0..1, partial = bisheriges Ergebnis)."""
+        self.check()
+        if self._on_progress is not None:
+            self._loader._post(self._gen, self._on_progress, fraction, partial)
+
+
+class BackgroundLoader:
+    def __init__(self, name="CSVLoader"):
+        self.name = name
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def start(self, work, on_done, on_progress=None, on_error=None):
+        """
+        work(job) läuft im Thread und liefert das Ergebnis.
+        on_done(result) / on_progress(fraction, partial) / on_error(exc)
+        laufen auf dem Main-Thread.
+        """
+        with self._lock:
+            self.generation += 1
+            gen = self.generation
+
+        job = LoadJob(self, gen, on_progress)
+
+        def run():
+            try:
+                result = work(job)
+            except LoadCancelled:
+                return
+            except Exception as e:
+                print(f"[{self.name}] load failed:", e)
+                if on_error is not None:
+                    self._post(gen, on_error, e)
+                return
+            self._post(gen, on_done, result)
+
+        threading.Thread(target=run, name=self.name, daemon=True).start()
+        return job
+
+    def cancel(self):
+        with self._lock:
+            self.generation += 1
+
+    def _post(self, gen, fn, *args):
+        def deliver(_dt):
+            if gen == self.generation:
+                fn(*args)
+        Clock.schedule_once(deliver, 0)
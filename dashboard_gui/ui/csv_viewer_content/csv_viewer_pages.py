@@ -0,0 +1,347 @@
+# csv_viewer_pages.py – seitenweiser Zugriff auf log.csv (+ Segmente)
+# ------------------------------------------------------------
+# Die Tabelle hält nie die ganze Datei im Speicher:
+#   - Zeilennummer → Byte-Offset über log.csv.idx (csv_index)
+#   - gzip-Segmente: nur sequentiell; Zeilenzahl aus dem .rows-Sidecar,
+#     Blättern vorwärts setzt den offenen Lesezeiger fort
+#   - Filter / Sortierung: ein Scan, danach nur Locator-Arrays
+#     (Segment + Offset bzw. Zeilennummer) – 10 Bytes pro Treffer
+# Alles hier läuft im Worker-Thread (csv_viewer_loader).
+# ------------------------------------------------------------
+
+import io
+import csv
+import bisect
+import itertools
+from array import array
+
+from csv_index import CsvIndex
+from history_writer import history_files, open_text, segment_rows
+
+PAGE_ROWS = 200
+
+
+def _parse(line):
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", "replace")
+    return next(csv.reader(io.StringIO(line, newline="")), [])
+
+
+class _Segment:
+    def __init__(self, path, job=None):
+        self.path = path
+        self.gz = path.endswith(".gz")
+        self.index = None
+        self.block_rows = []      # kumulierte Zeilen je Indexblock
+        self._cursor = None       # gz: [nächste Zeile, Datei, reader]
+
+        if self.gz:
+            with open_text(path) as f:
+                reader = csv.reader(f)
+                self.header = next(reader, [])
+                n = segment_rows(path)
+                if n is None:
+                    # Archiv aus einer Version ohne .rows → einmal zählen
+                    n = 0
+                    for n, _ in enumerate(reader, 1):
+                        if job is not None and n % 20000 == 0:
+                            job.check()
+            self.rows = n
+            return
+
+        self.index = CsvIndex(path).update()
+        self.header = _parse(self.index.header)
+        total = 0
+        for b in self.index.blocks:
+            total += b[2]
+            self.block_rows.append(total)
+        self.rows = total + sum(1 for _ in self._lines_from(self.index.indexed_end))
+
+    def _lines_from(self, offset):
+        """(offset, line) ab offset – nur vollständige Zeilen."""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                yield offset, line
+                offset += len(line)
+
+    # --------------------------------------------------------
+    def _take_cursor(self, start):
+        """gz: Lesezeiger vor Zeile start – der letzte wird weiterverwendet, solange er nicht dahinter steht."""
+        cur, self._cursor = self._cursor, None
+        if cur is not None and cur[0] > start:
+            cur[1].close()
+            cur = None
+        if cur is None:
+            f = open_text(self.path)
+            reader = csv.reader(f)
+            next(reader, None)
+            cur = [0, f, reader]
+        return cur
+
+    def _put_cursor(self, cur):
+        old, self._cursor = self._cursor, cur
+        if old is not None:
+            old[1].close()
+
+    def iter_located(self, start=0):
+        """(pos, values) ab Zeile start; pos = Byte-Offset bzw. Zeilennummer (gz)."""
+        if self.gz:
+            cur = self._take_cursor(start)
+            try:
+                for values in cur[2]:
+                    i = cur[0]
+                    cur[0] += 1
+                    if i >= start:
+                        yield i, values
+            finally:
+                self._put_cursor(cur)
+            return
+
+        b = bisect.bisect_right(self.block_rows, start)
+        if b < len(self.index.blocks):
+            offset = self.index.blocks[b][0]
+            skip = start - (self.block_rows[b - 1] if b else 0)
+        else:
+            offset = self.index.indexed_end
+            skip = start - (self.block_rows[-1] if self.block_rows else 0)
+
+        for pos, line in itertools.islice(self._lines_from(offset), skip, None):
+            yield pos, _parse(line)
+
+    def fetch(self, positions):
+        """Zeilen zu Locatoren (Reihenfolge bleibt erhalten)."""
+        if not self.gz:
+            out = []
+            with open(self.path, "rb") as f:
+                for pos in positions:
+                    f.seek(pos)
+                    out.append(_parse(f.readline()))
+            return out
+
+        wanted = set(positions)
+        if not wanted:
+            return []
+        found = {}
+        last = max(wanted)
+        for i, values in self.iter_located(min(wanted)):
+            if i in wanted:
+                found[i] = values
+            if i >= last:
+                break
+        return [found.get(p, []) for p in positions]
+
+
+class TableSource:
+    """Alle Segmente hinter path als EINE Tabelle mit Seitenzugriff."""
+
+    def __init__(self, path, job=None):
+        self.path = path
+        self.segments = []
+        for p in history_files(path):
+            if job is not None:
+                job.check()
+            self.segments.append(_Segment(p, job))
+
+        self.header = self.segments[-1].header if self.segments else []
+        self._starts = []
+        total = 0
+        for seg in self.segments:
+            self._starts.append(total)
+            total += seg.rows
+        self.total = total
+
+        # Ansicht (Filter/Sortierung) → (Segmente, Locatoren), None = alle Zeilen
+        self._view = None
+        self.filter_text = ""
+        self.sort_col = None
+        self.sort_desc = False
+
+    # --------------------------------------------------------
+    @property
+    def count(self):
+        return self.total if self._view is None else len(self._view[1])
+
+    @property
+    def pages(self):
+        return max(1, (self.count + PAGE_ROWS - 1) // PAGE_ROWS)
+
+    def page(self, n):
+        """Seite n (0-basiert) → Liste von Zeilen (Wertelisten)."""
+        view = self._view
+        start = n * PAGE_ROWS
+        stop = min(self.total if view is None else len(view[1]), start + PAGE_ROWS)
+        if start >= stop:
+            return []
+
+        if view is None:
+            return self._range(start, stop - start)
+
+        # Locatoren je Segment sammeln, Reihenfolge der Seite beibehalten
+        seg_ids, pos = view
+        by_seg = {}
+        for k in range(start, stop):
+            by_seg.setdefault(seg_ids[k], []).append((k, pos[k]))
+        rows = {}
+        for s, items in by_seg.items():
+            values = self.segments[s].fetch([p for _, p in items])
+            for (k, _), v in zip(items, values):
+                rows[k] = v
+        return [rows[k] for k in range(start, stop)]
+
+    def _range(self, start, n):
+        out = []
+        s = bisect.bisect_right(self._starts, start) - 1
+        local = start - self._starts[s]
+        while len(out) < n and s < len(self.segments):
+            for _, values in itertools.islice(self.segments[s].iter_located(local), n - len(out)):
+                out.append(values)
+            s += 1
+            local = 0
+        return out
+
+    # --------------------------------------------------------
+    # FILTER / SORTIERUNG (ein Scan über alle Segmente)
+    # --------------------------------------------------------
+    def apply(self, filter_text="", sort_col=None, sort_desc=False, job=None):
+        """Neue Ansicht berechnen; erst am Ende übernommen (abbrechbar)."""
+        filter_text = (filter_text or "").strip()
+        sort_col = sort_col if sort_col in self.header else None
+        sort_desc = bool(sort_desc)
+
+        view = None
+        if filter_text or sort_col is not None:
+            view = self._scan(filter_text, sort_col, sort_desc, job)
+
+        self._view = view
+        self.filter_text, self.sort_col, self.sort_desc = filter_text, sort_col, sort_desc
+
+    def _scan(self, filter_text, sort_col, sort_desc, job):
+        match = self._matcher(filter_text)
+        col = self.header.index(sort_col) if sort_col else None
+
+        seg_ids = array("H")
+        pos = array("Q")
+        keys = [] if col is not None else None
+
+        for s, seg in enumerate(self.segments):
+            for k, (p, values) in enumerate(seg.iter_located()):
+                if job is not None and k % 20000 == 0:
+                    job.check()
+                if not match(values):
+                    continue
+                seg_ids.append(s)
+                pos.append(p)
+                if keys is not None:
+                    keys.append(_sort_key(values[col] if col < len(values) else ""))
+
+        if keys is not None:
+            # leere Zellen immer ans Ende, egal welche Richtung
+            filled = [i for i, k in enumerate(keys) if k is not None]
+            order = sorted(filled, key=keys.__getitem__, reverse=sort_desc)
+            order += [i for i, k in enumerate(keys) if k is None]
+            seg_ids = array("H", (seg_ids[i] for i in order))
+            pos = array("Q", (pos[i] for i in order))
+
+        return seg_ids, pos
+
+    def _matcher(self, text):
+        """"spalte=wert" → exakter Spaltenvergleich, sonst Teilstring in irgendeiner Spalte."""
+        if not text:
+            return lambda values: True
+
+        if "=" in text:
+            name, _, want = (t.strip() for t in text.partition("="))
+            if name in self.header:
+                i = self.header.index(name)
+                return lambda values: i < len(values) and values[i] == want
+
+        needle = text.lower()
+        return lambda values: any(needle in v.lower() for v in values)
+
+
+def _sort_key(v):
+    if v == "":
+        return None
+    try:
+        return (0, float(v), "")
+    except ValueError:
+        return (1, 0.0, v)
+
+
+# ------------------------------------------------------------
+# SQLITE (history.db) – gleiche Schnittstelle, Seiten per LIMIT/OFFSET
+# ------------------------------------------------------------
+class DbSource:
+    def __init__(self, path, job=None):
+        import history_sqlite
+        self._hs = history_sqlite
+        self.path = path
+        self.header = list(history_sqlite.CSV_HEADER)
+        self.filter_text = ""
+        self.sort_col = None
+        self.sort_desc = False
+        self._where = ("", [])
+        self.total = self._count("", [])
+        self.count = self.total
+
+    @property
+    def pages(self):
+        return max(1, (self.count + PAGE_ROWS - 1) // PAGE_ROWS)
+
+    def _con(self):
+        return self._hs._open_ro(self.path)
+
+    def _count(self, where, args):
+        con = self._con()
+        try:
+            return con.execute("SELECT COUNT(*) FROM history" + where, args).fetchone()[0]
+        finally:
+            con.close()
+
+    def apply(self, filter_text="", sort_col=None, sort_desc=False, job=None):
+        filter_text = (filter_text or "").strip()
+        sort_col = sort_col if sort_col in self.header else None
+
+        where, args = "", []
+        if filter_text:
+            name, sep, want = (t.strip() for t in filter_text.partition("="))
+            if sep and name == "alive":
+                # INTEGER 0/1 in der DB, "True"/"False" in der CSV → gleiche Treffer
+                flag = self._hs._to_bool(want)
+                where, args = (" WHERE alive IS NULL", []) if flag is None else (" WHERE alive = ?", [flag])
+            elif sep and name in self.header:
+                where, args = f" WHERE {name} = ?", [want]
+            else:
+                cols = " || ',' || ".join(f"IFNULL({c}, '')" for c in self.header)
+                where, args = f" WHERE instr(lower({cols}), ?) > 0", [filter_text.lower()]
+
+        count = self._count(where, args)
+        self._where = (where, args)
+        self.count = count
+        self.filter_text, self.sort_col, self.sort_desc = filter_text, sort_col, bool(sort_desc)
+
+    def page(self, n):
+        where, args = self._where
+        order = "ts"
+        if self.sort_col:
+            # leere Zellen ans Ende (wie bei CSV)
+            c = self.sort_col
+            order = f"{c} IS NULL, {c} {'DESC' if self.sort_desc else 'ASC'}, ts"
+        sql = "SELECT {} FROM history{} ORDER BY {} LIMIT ? OFFSET ?".format(
+            ", ".join(self.header), where, order
+        )
+        con = self._con()
+        try:
+            rows = con.execute(sql, args + [PAGE_ROWS, n * PAGE_ROWS]).fetchall()
+        finally:
+            con.close()
+        return [list(self._hs.as_csv_row(dict(r)).values()) for r in rows]
+
+
+def open_source(path, job=None):
+    if path.endswith(".db"):
+        return DbSource(path, job)
+    return TableSource(path, job)
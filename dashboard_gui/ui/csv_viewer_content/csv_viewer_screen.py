@@ -127,6 +127,8 @@ class CSVViewerScreen(Screen):
 
     def _file_selected(self, path):
         self.current_csv = path
+        self.table.cancel_load()
+        self.graph.cancel_load()
         if self.active_tab == "Table":
             self.table.set_csv_path(path)
         elif self.active_tab == "Graph":
@@ -138,6 +140,8 @@ class CSVViewerScreen(Screen):
     def _switch_tab(self, name):
         self.active_tab = name
         self.area.clear_widgets()
+        self.table.cancel_load()
+        self.graph.cancel_load()
 
         if name == "Table":
             self.btn_tab_table.background_color = (0.20, 0.30, 0.70, 1)
@@ -164,3 +168,7 @@ class CSVViewerScreen(Screen):
     # ================================================================
     def update_from_global(self, d):
         self.header.update_from_global(d)
+
+        # Live-Follow: nur angehängte Bytes lesen
+        if self.active_tab == "Graph" and self.current_csv:
+            self.graph.follow()
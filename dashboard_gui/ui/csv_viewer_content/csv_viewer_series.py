@@ -0,0 +1,276 @@
+# csv_viewer_series.py – Serien pro (Gerät, Kanal) für den CSV-Graphen
+# ------------------------------------------------------------
+# Läuft im Worker-Thread (csv_viewer_loader), kein Zugriff auf Widgets.
+#
+#   Ergebnis:  {(device, channel, col): [werte]}  – NUR für die Auswahl
+#              {(device, channel, col): [epoch]}  – Zeit je Punkt (x-Achse)
+#   Nebenbei:  alle gesehenen (device, channel) + Name für den Selektor
+#
+# Gefiltert wird beim Lesen: Zeilen anderer Geräte/Kanäle werden nur
+# für die Geräteliste angeschaut, nie in Float-Listen geparst.
+# ------------------------------------------------------------
+
+import os
+import csv
+import itertools
+import collections
+
+import config
+import history_store
+from csv_index import open_index, read_rows
+from history_writer import history_files, open_text, tail_file_rows
+from timeparse import parse_ts
+
+
+COLUMNS = ("T_i", "H_i", "T_e", "H_e", "rssi")
+MAX_SCAN_ROWS = 200000    # so weit sucht der Graph höchstens zurück
+
+
+def row_key(row):
+    return (row.get("device_id") or "", row.get("channel") or "")
+
+
+class SeriesResult:
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self._wanted = set(self.keys)
+        self.series = {}          # (device, channel, col) -> [float]
+        self.times = {}           # (device, channel, col) -> [epoch]
+        self.available = {}       # (device, channel) -> name
+
+    def see(self, row):
+        key = row_key(row)
+        if key not in self.available or not self.available[key]:
+            self.available[key] = row.get("name") or ""
+        return key
+
+    def add_row(self, row, series=None, times=None):
+        """Zeile übernehmen, falls ihr Schlüssel ausgewählt ist."""
+        key = self.see(row)
+        if key not in self._wanted:
+            return False
+        t = parse_ts(row.get("timestamp"))
+        if t is None:
+            return False
+        series = self.series if series is None else series
+        times = self.times if times is None else times
+        for col in COLUMNS:
+            raw = row.get(col)
+            if not raw:
+                continue
+            try:
+                v = float(raw)
+            except ValueError:
+                continue
+            series.setdefault(key + (col,), []).append(v)
+            times.setdefault(key + (col,), []).append(t)
+        return True
+
+    def trim(self, window):
+        for k in self.series:
+            ts, vals = self.times[k], self.series[k]
+            # Offline-Frames tragen alte Zeitstempel → notfalls sortieren
+            if any(b < a for a, b in zip(ts, ts[1:])):
+                pairs = sorted(zip(ts, vals), key=lambda p: p[0])
+                ts, vals = [p[0] for p in pairs], [p[1] for p in pairs]
+            self.times[k], self.series[k] = ts[-window:], vals[-window:]
+        return self
+
+    def snapshot(self, window):
+        """Kopie für einen Zwischenstand an die UI."""
+        copy = SeriesResult(self.keys)
+        copy.available = dict(self.available)
+        copy.series = {k: list(v) for k, v in self.series.items()}
+        copy.times = {k: list(v) for k, v in self.times.items()}
+        return copy.trim(window)
+
+
+# ------------------------------------------------------------
+# STANDARD-AUSWAHL: neueste Zeile mit Messwerten
+# ------------------------------------------------------------
+def _live_log(path):
+    return os.path.abspath(path) == os.path.abspath(os.path.join(config.DATA, "log.csv"))
+
+
+def _pick(rows):
+    """Neueste Zeile mit Messwert bevorzugen (gatt-Zeilen haben oft nur rssi)."""
+    for row in reversed(rows):
+        if row.get("T_i"):
+            return row_key(row)
+    return row_key(rows[-1]) if rows else None
+
+
+def latest_key(path, probe=50):
+    if path.endswith(".db"):
+        import history_sqlite
+        return _pick([history_sqlite.as_csv_row(r) for r in history_sqlite.tail(path, probe)])
+
+    for seg in reversed(history_files(path)):
+        if seg.endswith(".gz"):
+            rows = []
+            with open_text(seg) as f:
+                for row in csv.DictReader(f):
+                    rows.append(row)
+                    if len(rows) > 2 * probe:
+                        del rows[:probe]
+        else:
+            rows = tail_file_rows(seg, probe)
+        if rows:
+            return _pick(rows)
+    return None
+
+
+# ------------------------------------------------------------
+# QUELLEN
+# ------------------------------------------------------------
+def load(path, keys, window, job):
+    """keys leer → neueste Zeile bestimmt das Gerät. → SeriesResult"""
+    if not keys:
+        k = latest_key(path)
+        keys = [k] if k else []
+
+    res = None
+    if _live_log(path):
+        # aktives log.csv → History-Store statt CSV parsen
+        res = _load_store(keys, window)
+    if res is None and path.endswith(".db"):
+        res = _load_db(path, keys, window)
+    if res is None:
+        res = _load_csv(path, keys, window, job)
+    return res.trim(window)
+
+
+def _load_store(keys, window):
+    try:
+        store = history_store.get_store()
+        res = SeriesResult(keys)
+        for dev, ch, metric in store.series():
+            res.available.setdefault((dev, ch), "")
+            if (dev, ch) not in keys or metric not in COLUMNS:
+                continue
+            ts, vals = store.tail(dev, ch, metric, window)
+            if len(vals):
+                res.series[(dev, ch, metric)] = [
+                    float(v) for v in history_store.display_values(metric, vals)
+                ]
+                res.times[(dev, ch, metric)] = [float(t) for t in ts]
+    except Exception as e:
+        print("[CSVGraphView] history store failed → CSV:", e)
+        return None
+
+    if not res.series:
+        return None
+    return res
+
+
+def _load_db(path, keys, window):
+    import history_sqlite
+    res = SeriesResult(keys)
+
+    for dev, ch, name in history_sqlite.channels(path):
+        res.available[(dev, ch)] = name or ""
+
+    for dev, ch in keys:
+        for row in history_sqlite.query(path, dev, ch, limit=window):
+            res.add_row(history_sqlite.as_csv_row(row))
+    return res
+
+
+def _filled(series, keys, window):
+    """
+    Jede ausgewählte Serie mit Daten hat ein volles Fenster?
+    Maßgeblich ist die dichteste Spalte – dünne Spalten (T_e, rssi) zeigen,
+    was im selben Zeitraum liegt, und erzwingen keinen Scan bis MAX_SCAN_ROWS.
+    """
+    found = False
+    for key in keys:
+        n = max(len(series.get(key + (col,), ())) for col in COLUMNS)
+        if n == 0:
+            continue
+        if n < window:
+            return False
+        found = True
+    return found
+
+
+def _segment_part(seg, res, keys, window, job, budget=MAX_SCAN_ROWS):
+    """
+    Ein Segment → (series, times, gelesene Zeilen), je Schlüssel aufs Fenster gekürzt.
+    Höchstens budget Zeilen werden geparst:
+    gzip → sequentiell, nur die letzten budget Zeilen (roh) behalten;
+    unkomprimiert → über den Zeitindex abschnittsweise vom Dateiende zurück,
+    bis das Fenster der Auswahl voll oder das Budget verbraucht ist.
+    """
+    if seg.endswith(".gz"):
+        part, part_t = {}, {}
+        lines = collections.deque(maxlen=budget)
+        with open_text(seg) as f:
+            header = f.readline()
+            for chunk in iter(lambda: list(itertools.islice(f, 20000)), []):
+                job.check()
+                lines.extend(chunk)
+        reader = csv.DictReader(itertools.chain((header,), lines))
+        for n, row in enumerate(reader, 1):
+            if n % 5000 == 0:
+                job.check()
+            res.add_row(row, part, part_t)
+        return _window(part, window), _window(part_t, window), len(lines)
+
+    idx = open_index(seg)
+    step = max(window * 4, idx.block_rows)
+    chunks = []
+    want, end, scanned = 0, None, 0
+    while scanned < budget:
+        want += step
+        start = idx.tail_start(want)
+        if end is not None and start >= end:
+            break
+        job.check()
+        part, part_t = {}, {}
+        rows = read_rows(idx, start, end)
+        for row in rows:
+            res.add_row(row, part, part_t)
+        chunks.append((part, part_t))
+        scanned += len(rows)
+        end = start
+        if start <= idx.header_end or _filled(_merge([c[0] for c in chunks]), keys, window):
+            break
+
+    series = _merge([c[0] for c in chunks])
+    times = _merge([c[1] for c in chunks])
+    return _window(series, window), _window(times, window), scanned
+
+
+def _window(part, window):
+    return {k: v[-window:] for k, v in part.items()}
+
+
+def _load_csv(path, keys, window, job):
+    # rotierte/gzip-Segmente: neueste zuerst, nur so viele wie das Fenster braucht
+    res = SeriesResult(keys)
+    chunks = []
+    files = list(reversed(history_files(path)))
+    scanned = 0
+
+    for n_done, seg in enumerate(files, 1):
+        part, part_t, n = _segment_part(seg, res, keys, window, job, MAX_SCAN_ROWS - scanned)
+        chunks.append((part, part_t))
+        scanned += n
+
+        res.series = _merge([c[0] for c in chunks])
+        res.times = _merge([c[1] for c in chunks])
+        # dünn besetzte Auswahl → nicht den ganzen Verlauf durchsuchen
+        if _filled(res.series, keys, window) or scanned >= MAX_SCAN_ROWS:
+            break
+        # Zwischenstand (neueste Segmente zuerst da)
+        job.progress(n_done / len(files), res.snapshot(window))
+
+    return res
+
+
+def _merge(chunks):
+    out = {}
+    for part in reversed(chunks):
+        for k, arr in part.items():
+            out.setdefault(k, []).extend(arr)
+    return out
@@ -1,10 +1,43 @@
-# csv_viewer_table.py — SIMPLE CLEAN TERMINAL VIEWER
+# csv_viewer_table.py — PAGED TABLE (RecycleView)
+#
+# Nur die sichtbaren Zellen sind Widgets, nur EINE Seite liegt im Speicher.
+# Seiten kommen über csv_viewer_pages (Index/Offsets) aus dem Worker-Thread.
+#   - Spaltenkopf tippen → sortieren (auf → ab → aus)
+#   - Filter: "spalte=wert" oder freier Text
+#   - am Ende/Anfang scrollen → nächste/vorige Seite
 import os
-import csv
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.scrollview import ScrollView
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
-from dashboard_gui.ui.scaling_utils import dp_scaled
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recyclegridlayout import RecycleGridLayout
+from dashboard_gui.ui.scaling_utils import dp_scaled, sp_scaled
+from dashboard_gui.ui.csv_viewer_content.csv_viewer_loader import BackgroundLoader
+from dashboard_gui.ui.csv_viewer_content.csv_viewer_pages import open_source
+
+
+ROW_H = 24
+CELL_COLOR = (0.95, 0.95, 0.95, 1)
+HEAD_COLOR = (0.14, 0.16, 0.24, 1)
+HEAD_ACTIVE = (0.20, 0.30, 0.70, 1)
+
+
+def _btn(text, width=None, **kw):
+    b = Button(
+        text=text,
+        background_normal="",
+        background_down="",
+        background_color=(0.15, 0.18, 0.28, 1),
+        color=(0.95, 0.95, 0.98, 1),
+        font_size=sp_scaled(13),
+        **kw,
+    )
+    if width is not None:
+        b.size_hint_x = None
+        b.width = dp_scaled(width)
+    return b
 
 
 class CSVTableView(BoxLayout):
@@ -12,22 +45,64 @@ class CSVTableView(BoxLayout):
     def __init__(self, **kw):
         super().__init__(**kw)
         self.orientation = "vertical"
+        self.spacing = dp_scaled(4)
 
-        scroll = ScrollView(size_hint=(1, 1))
-        self.add_widget(scroll)
-
-        self.text_area = TextInput(
-            readonly=True,
-            size_hint=(1, None),
-            height=dp_scaled(4000),
-            font_size=14,
-            background_color=(0.07, 0.07, 0.1, 1),
+        # ---------------- Filter ----------------
+        bar = BoxLayout(size_hint_y=None, height=dp_scaled(34), spacing=dp_scaled(6))
+        self.filter_input = TextInput(
+            hint_text="Filter: device_id=… oder Text",
+            multiline=False,
+            font_size=sp_scaled(13),
+            background_color=(0.10, 0.10, 0.14, 1),
             foreground_color=(0.95, 0.95, 0.95, 1),
-            cursor_blink=False,
         )
-        scroll.add_widget(self.text_area)
+        self.filter_input.bind(on_text_validate=self._refilter)
+        bar.add_widget(self.filter_input)
+        btn_clear = _btn("✕", width=44)
+        btn_clear.bind(on_release=self._clear_filter)
+        bar.add_widget(btn_clear)
+        self.add_widget(bar)
+
+        # ---------------- Spaltenköpfe ----------------
+        self.head = GridLayout(rows=1, size_hint_y=None, height=dp_scaled(ROW_H + 6))
+        self._head_btns = {}
+        self.add_widget(self.head)
+
+        # ---------------- Zellen ----------------
+        self.rv = RecycleView(size_hint=(1, 1), do_scroll_x=False)
+        self.rv.viewclass = "Label"
+        self.grid = RecycleGridLayout(
+            cols=1,
+            default_size=(None, dp_scaled(ROW_H)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+        )
+        self.grid.bind(minimum_height=self.grid.setter("height"))
+        self.rv.add_widget(self.grid)
+        self.rv.bind(scroll_y=self._on_scroll)
+        self.add_widget(self.rv)
+
+        # ---------------- Seiten ----------------
+        pager = BoxLayout(size_hint_y=None, height=dp_scaled(34), spacing=dp_scaled(6))
+        for text, step in (("⏮", "first"), ("◀", -1)):
+            b = _btn(text, width=50)
+            b.bind(on_release=lambda _b, s=step: self._goto(s))
+            pager.add_widget(b)
+        self.lbl_page = Label(text="", font_size=sp_scaled(13), color=(0.85, 0.85, 0.92, 1))
+        pager.add_widget(self.lbl_page)
+        for text, step in (("▶", 1), ("⏭", "last")):
+            b = _btn(text, width=50)
+            b.bind(on_release=lambda _b, s=step: self._goto(s))
+            pager.add_widget(b)
+        self.add_widget(pager)
 
         self.csv_path = None
+        self.source = None
+        self.page_no = 0
+        self._busy = False
+        self._scroll_to = 0.0
+        self._jumping = False
+        self._loader = BackgroundLoader("CSVTableView")
 
 
     # ----------------------------------------------------
@@ -38,49 +113,165 @@ class CSVTableView(BoxLayout):
         self._reload()
 
 
+    def cancel_load(self):
+        """Laufendes Laden verwerfen (Dateiwechsel / Tab verlassen)."""
+        self._loader.cancel()
+        self._busy = False
+
+
     # ----------------------------------------------------
-    # CSV → einfacher eingerückter Text
+    # QUELLE ÖFFNEN (Worker) → letzte Seite zeigen
     # ----------------------------------------------------
     def _reload(self):
+        self.source = None
+        self.rv.data = []
+        self.head.clear_widgets()
+
         if not self.csv_path or not os.path.exists(self.csv_path):
-            self.text_area.text = f"File not found:\n{self.csv_path}"
+            self._loader.cancel()
+            self.lbl_page.text = f"File not found: {self.csv_path}"
             return
 
-        try:
-            with open(self.csv_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
+        path = self.csv_path
+        filt = self.filter_input.text
+        self.lbl_page.text = f"Lade {os.path.basename(path)} …"
+
+        def work(job):
+            src = open_source(path, job)
+            if filt.strip():
+                src.apply(filt, job=job)
+            last = src.pages - 1
+            return src, last, src.page(last)
+
+        self._start(work)
+
+    def _start(self, work, scroll_to=0.0):
+        """scroll_to: 1.0 = Seitenanfang, 0.0 = Seitenende (neueste Zeilen)."""
+        self._busy = True
+        self._scroll_to = scroll_to
+        self._loader.start(work, on_done=self._show, on_error=self._on_error)
 
-        except Exception as e:
-            self.text_area.text = f"Fehler beim Lesen:\n{e}"
+    def _on_error(self, e):
+        self._busy = False
+        self.lbl_page.text = f"Fehler beim Lesen: {e}"
+
+
+    # ----------------------------------------------------
+    # ANSICHT / SEITEN
+    # ----------------------------------------------------
+    def _apply_view(self, sort_col=None, sort_desc=False):
+        src = self.source
+        if src is None:
             return
+        filt = self.filter_input.text
+        self.lbl_page.text = "Filtere …"
 
-        if not rows:
-            self.text_area.text = "CSV ist leer."
+        def work(job):
+            src.apply(filt, sort_col, sort_desc, job=job)
+            # sortiert → von vorne, sonst neueste Zeilen
+            n = 0 if src.sort_col else src.pages - 1
+            return src, n, src.page(n)
+
+        self._start(work, 1.0 if sort_col else 0.0)
+
+    def _refilter(self, *_):
+        # Sortierung bleibt
+        src = self.source
+        if src is not None:
+            self._apply_view(src.sort_col, src.sort_desc)
+
+    def _clear_filter(self, *_):
+        self.filter_input.text = ""
+        self._refilter()
+
+    def _sort(self, col):
+        src = self.source
+        if src is None:
+            return
+        # auf → ab → aus
+        if src.sort_col != col:
+            self._apply_view(col, False)
+        elif not src.sort_desc:
+            self._apply_view(col, True)
+        else:
+            self._apply_view()
+
+    def _goto(self, step):
+        src = self.source
+        if src is None or self._busy:
+            return
+        if step == "first":
+            n = 0
+        elif step == "last":
+            n = src.pages - 1
+        else:
+            n = self.page_no + step
+        n = max(0, min(src.pages - 1, n))
+        if n == self.page_no:
+            return
+
+        # vorwärts → oben weiterlesen, rückwärts → unten
+        self._start(lambda job: (src, n, src.page(n)), 1.0 if n > self.page_no else 0.0)
+
+    def _on_scroll(self, _rv, y):
+        # Rand erreicht → Nachbarseite nachladen
+        if self._jumping or self._busy or self.source is None or not self.rv.data:
             return
+        if y <= 0.0 and self.page_no < self.source.pages - 1:
+            self._goto(1)
+        elif y >= 1.0 and self.page_no > 0 and self.rv.height < self.grid.height:
+            self._goto(-1)
 
-        # Spaltennamen
-        headers = list(rows[0].keys())
 
-        # Output buffer
-        lines = []
+    # ----------------------------------------------------
+    # AUSGABE (Main-Thread)
+    # ----------------------------------------------------
+    def _show(self, result):
+        src, n, rows = result
+        new_source = src is not self.source
+        self.source = src
+        self.page_no = n
+        self._busy = False
 
-        # Kopfzeile
-        header_line = " | ".join(headers)
-        lines.append(header_line)
-        lines.append("-" * len(header_line))
+        headers = src.header
+        if new_source or len(self.head.children) != len(headers):
+            self._build_head(headers)
+        self._mark_sort()
+
+        if not src.count:
+            self.rv.data = []
+            self.lbl_page.text = "Keine Zeilen." if src.filter_text else "CSV ist leer."
+            return
 
-        # Zeilen
+        self.grid.cols = len(headers)
+        fs = sp_scaled(11)
+        data = []
         for row in rows:
-            parts = []
-            for h in headers:
-                # Wert holen, None → ""
-                v = row.get(h, "") or ""
-                parts.append(v)
-
-            # Spalten durch Abstände trennen (einfach, sauber)
-            line = " | ".join(parts)
-            lines.append(line)
-
-        # Ausgabe
-        self.text_area.text = "\n".join(lines)
+            for i in range(len(headers)):
+                v = row[i] if i < len(row) else ""
+                data.append({"text": v, "font_size": fs, "color": CELL_COLOR})
+        self.rv.data = data
+
+        self._jumping = True
+        self.rv.scroll_y = self._scroll_to
+        self._jumping = False
+
+        self.lbl_page.text = f"Seite {n + 1} / {src.pages} • {src.count} Zeilen"
+
+    def _build_head(self, headers):
+        self.head.clear_widgets()
+        self.head.cols = len(headers)
+        self._head_btns.clear()
+        for h in headers:
+            b = _btn(h)
+            b.font_size = sp_scaled(11)
+            b.bind(on_release=lambda _b, c=h: self._sort(c))
+            self.head.add_widget(b)
+            self._head_btns[h] = b
+
+    def _mark_sort(self):
+        src = self.source
+        for h, b in self._head_btns.items():
+            active = src is not None and src.sort_col == h
+            b.text = h + ((" ▼" if src.sort_desc else " ▲") if active else "")
+            b.background_color = HEAD_ACTIVE if active else HEAD_COLOR
@@ -7,6 +7,7 @@ from kivy.graphics import Rectangle, Color
 
 from dashboard_gui.ui.scaling_utils import dp_scaled, sp_scaled
 from dashboard_gui.global_state_manager import GLOBAL_STATE
+import analytics
 
 
 class ChartTile(ButtonBehavior, BoxLayout):
@@ -183,15 +184,26 @@ class ChartTile(ButtonBehavior, BoxLayout):
             self.lbl_value.text = f"{display_value:.2f} {self.unit}"
             self._render_buffer(buf)
 
-      
+
+    def show(self, buf_key):
+        """Vorhandenen Verlauf zeichnen, ohne einen Wert anzuhängen (Gerätewechsel / Sichtbar)."""
+        buf = self.buffers.get(buf_key)
+        if not buf:
+            return
+        self.lbl_value.text = f"{buf[-1]:.2f} {self.unit}"
+        self._render_buffer(buf)
+
     def _render_buffer(self, buf):
         pts = [(i, val) for i, val in enumerate(buf)]
         self.plot.points = pts
         self.plot_glow.points = pts
-    
-        if len(buf) > 1:
-            mn = min(buf)
-            mx = max(buf)
+
+        # min/max/avg in einem Durchlauf (analytics)
+        stats = analytics.summary(buf, percentiles=()) if len(buf) > 1 else None
+
+        if stats:
+            mn = stats["min"]
+            mx = stats["max"]
             if mn == mx:
                 mn -= 0.5
                 mx += 0.5
@@ -202,12 +214,9 @@ class ChartTile(ButtonBehavior, BoxLayout):
         self.graph.xmax = max(self.window, len(buf))
     
         # Footer
-        if len(buf) > 1:
-            avg_v = sum(buf) / len(buf)
-            mn = min(buf)
-            mx = max(buf)
-            self.lbl_avg.text = f"avg: {avg_v:.2f}"
-            self.lbl_minmax.text = f"min: {mn:.2f}  max: {mx:.2f}"
+        if stats:
+            self.lbl_avg.text = f"avg: {stats['mean']:.2f}"
+            self.lbl_minmax.text = f"min: {stats['min']:.2f}  max: {stats['max']:.2f}"
         else:
             self.lbl_avg.text = "avg: --"
             self.lbl_minmax.text = ""
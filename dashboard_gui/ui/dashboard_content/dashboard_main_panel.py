@@ -3,6 +3,7 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.graphics import Rectangle, Color
 from dashboard_gui.ui.dashboard_content.chart_tile import ChartTile
 from dashboard_gui.ui.scaling_utils import dp_scaled
+from dashboard_gui.data_buffer import BUFFER, tile_values
 
 
 class DashboardMainPanel(GridLayout):
@@ -81,119 +82,66 @@ class DashboardMainPanel(GridLayout):
         for tile in self.tile_map.values():
             self.add_widget(tile)
 
+        # angezeigt: (device, channel, keys); _stale = Tiles neu zeichnen
+        self._shown = None
+        self._stale = False
+        from dashboard_gui.global_state_manager import GLOBAL_STATE
+        GLOBAL_STATE.subscribe("value_changed", self._on_value)
+
     # ============================================================
-    # UPDATE – PURE MODE (decoded = Quelle, 1:1 übernehmen)
+    # UPDATE – EVENTS (state_events) statt Frame-Walk pro Tick
     # ============================================================
-    def update_from_data(self, d):
-        if not isinstance(d, dict):
-            return
-    
-        from dashboard_gui.data_buffer import BUFFER
+    def _active_device_id(self):
         from dashboard_gui.global_state_manager import GLOBAL_STATE
-    
         data = BUFFER.get()
-        if not data:
+        idx = GLOBAL_STATE.active_index
+        if isinstance(data, list) and idx < len(data):
+            return data[idx].get("device_id")
+        return None
+
+    def _on_value(self, device, channel, metric, value, ts, unit):
+        """Neuer Messwert (alle Geräte) → Tile-Verlauf; gezeichnet nur aktiv + sichtbar."""
+        from dashboard_gui.global_state_manager import GLOBAL_STATE
+        if channel != GLOBAL_STATE.get_active_channel():
             return
-        
-        active_channel = GLOBAL_STATE.get_active_channel()
-        
-        active_idx = GLOBAL_STATE.active_index
-        active_device_id = (
-            data[active_idx].get("device_id")
-            if active_idx < len(data) else None
-        )
-    
-        active_channel = GLOBAL_STATE.get_active_channel()
-    
-        # Sichtbarkeit NUR fürs aktive Gerät
-        self._apply_tile_visibility([])
-    
-        active_idx = GLOBAL_STATE.active_index
-        if active_idx < len(data):
-            frame = data[active_idx]
-            stream = frame.get(active_channel, {})
-            internal = stream.get("internal", {})
-            external = stream.get("external", {})
-            vpd_int = stream.get("vpd_internal", {})
-            vpd_ext = stream.get("vpd_external", {})
-    
-            active = []
-            if internal.get("temperature", {}).get("value") is not None:
-                active.append("temp_in")
-            if internal.get("humidity", {}).get("value") is not None:
-                active.append("hum_in")
-            if vpd_int.get("value") is not None:
-                active.append("vpd_in")
-            if external.get("present"):
-                if external.get("temperature", {}).get("value") is not None:
-                    active.append("temp_ex")
-                if external.get("humidity", {}).get("value") is not None:
-                    active.append("hum_ex")
-                if vpd_ext.get("value") is not None:
-                    active.append("vpd_ex")
-    
-            self._apply_tile_visibility(active)
-    
-        # 🔥 BUFFER FÜR ALLE GERÄTE
-        for frame in data:
-            device_id = frame.get("device_id")
-            if not device_id:
-                continue
-    
-            stream = frame.get(active_channel)
-            if not stream or not stream.get("alive"):
-                continue
-    
-            prefix = f"{device_id}_{active_channel}"
-    
-            internal = stream.get("internal", {})
-            external = stream.get("external", {})
-            vpd_int = stream.get("vpd_internal", {})
-            vpd_ext = stream.get("vpd_external", {})
-    
-            if internal.get("temperature", {}).get("value") is not None:
-                self.tile_temp_in.unit = internal["temperature"].get("unit", self.tile_temp_in.unit)
-                self.tile_temp_in.update(
-                    internal["temperature"]["value"],
-                    f"{prefix}_temp_in",
-                    render=(device_id == active_device_id)
-                )
-            
-            if internal.get("humidity", {}).get("value") is not None:
-                self.tile_hum_in.update(
-                    internal["humidity"]["value"],
-                    f"{prefix}_hum_in",
-                    render=(device_id == active_device_id)
-                )
-            
-            if vpd_int.get("value") is not None:
-                self.tile_vpd_in.update(
-                    vpd_int["value"],
-                    f"{prefix}_vpd_in",
-                    render=(device_id == active_device_id)
-                )
-            
-            if external.get("present") and external.get("temperature", {}).get("value") is not None:
-                self.tile_temp_ex.unit = external["temperature"].get("unit", self.tile_temp_ex.unit)
-                self.tile_temp_ex.update(
-                    external["temperature"]["value"],
-                    f"{prefix}_temp_ex",
-                    render=(device_id == active_device_id)
-                )
-            
-                if external.get("humidity", {}).get("value") is not None:
-                    self.tile_hum_ex.update(
-                        external["humidity"]["value"],
-                        f"{prefix}_hum_ex",
-                        render=(device_id == active_device_id)
-                    )
-            
-                if vpd_ext.get("value") is not None:
-                    self.tile_vpd_ex.update(
-                        vpd_ext["value"],
-                        f"{prefix}_vpd_ex",
-                        render=(device_id == active_device_id)
-                    )
+        tile = self.tile_map.get(metric)
+        if tile is None:
+            return
+
+        if metric in ("temp_in", "temp_ex") and unit:
+            tile.unit = unit
+
+        active = device == self._active_device_id()
+        render = active and self.get_root_window() is not None
+        tile.update(value, f"{device}_{channel}_{metric}", render=render)
+        if active and not render:
+            # versteckt weitergeschrieben → beim nächsten Sichtbar-Werden zeichnen
+            self._stale = True
+
+    def invalidate(self):
+        self._shown = None
+
+    def update_from_data(self, d):
+        """Sichtbarer Tick: Tile-Auswahl nur bei Geräte-/Kanal-/Key-Wechsel neu."""
+        from dashboard_gui.global_state_manager import GLOBAL_STATE
+        if not isinstance(d, dict):
+            return
+
+        device_id = d.get("device_id")
+        channel = d.get("channel") or GLOBAL_STATE.get_active_channel()
+        keys = list(tile_values(d.get(channel)))
+
+        shown = (device_id, channel, tuple(keys))
+        if shown != self._shown:
+            self._apply_tile_visibility(keys)
+            self._shown = shown
+            self._stale = True
+
+        if self._stale:
+            prefix = f"{device_id}_{channel}"
+            for key in keys:
+                self.tile_map[key].show(f"{prefix}_{key}")
+            self._stale = False
 
     def _update_bg(self, *args):
         self.bg_rect.pos = self.pos
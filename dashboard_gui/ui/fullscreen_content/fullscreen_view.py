@@ -11,8 +11,15 @@ from dashboard_gui.ui.common.header_online import HeaderBar
 from dashboard_gui.ui.common.control_buttons import ControlButtons
 from dashboard_gui.global_state_manager import GLOBAL_STATE
 from dashboard_gui.ui.scaling_utils import dp_scaled, sp_scaled
+from dashboard_gui.ui.csv_viewer_content.csv_viewer_loader import BackgroundLoader
+import history_store
+import analytics
 
 FULLSCREEN_MAX = 1200
+
+# Zeitbereiche (Sekunden) – None = Live (Tile-Buffer / letzte Samples)
+RANGES = [("Live", None), ("24h", 86400), ("7d", 7 * 86400), ("30d", 30 * 86400)]
+
 class FullScreenView(Screen):
 
     def __init__(self, **kw):
@@ -26,6 +33,14 @@ class FullScreenView(Screen):
         self._view_size = 60     # sichtbare Samples (Start wie Tile)
         self._last_tap_time = 0
         self._last_tap_pos = None
+        self._range_idx = 0        # Index in RANGES
+        # neu laden nur bei passendem value_changed oder Wechsel von Gerät/Kanal/Bereich
+        self._data_dirty = True
+        self._loaded_key = None
+        # History-Store-Abfragen im Worker (Store kann gerade flushen)
+        self._loader = BackgroundLoader("FullscreenLoader")
+        self._buf = []               # angezeigte Werte (Pan/Zoom rendern nur neu)
+        self._hist = (None, [])      # (Serie, History-Tail) der letzten Abfrage
 
 
         root = BoxLayout(orientation="vertical", spacing=dp_scaled(8), padding=dp_scaled(8))
@@ -140,8 +155,20 @@ class FullScreenView(Screen):
             on_release=lambda *_: self._switch(+1)
         )
         
+        self.btn_range = Button(
+            text=RANGES[0][0],
+            font_size=sp_scaled(14),
+            background_normal="",
+            background_color=(0, 0, 0, 0.28),
+            size_hint=(None, None),
+            size=(btn_size * 1.6, btn_size * 0.8),
+            pos_hint={"right": 0.98, "top": 0.98},
+            on_release=lambda *_: self._cycle_range()
+        )
+
         overlay.add_widget(self.btn_left)
         overlay.add_widget(self.btn_right)
+        overlay.add_widget(self.btn_range)
         
         # CONTROL BUTTONS
         self.controls = ControlButtons(
@@ -152,6 +179,7 @@ class FullScreenView(Screen):
         root.add_widget(self.controls)
         
         GLOBAL_STATE.attach_fullscreen(self)
+        GLOBAL_STATE.subscribe("value_changed", self._on_value)
     # ----------------------------------------------------------
     # COLOR MAP (Double Mapping)
     # ----------------------------------------------------------
@@ -219,6 +247,7 @@ class FullScreenView(Screen):
         self.plot_glow = LinePlot(color=glow_color, line_width=5)
         self.graph.add_plot(self.plot_glow)
 
+        self._buf = []
         self._load_tile()
 
     # ----------------------------------------------------------
@@ -266,13 +295,87 @@ class FullScreenView(Screen):
                     self._active_unit = u
         except:
             pass
+        metric = history_store.TILE_METRICS.get(self.tile_id)
+
+        # Langzeit-Bereich → Rollups aus dem History-Store (Worker)
+        span = RANGES[self._range_idx][1]
+        if span:
+            pixels = max(50, int(self.graph.width))
+            self._loader.start(
+                lambda job: self._range_buffer(device_id, active_channel, metric, span, pixels),
+                self._show_buf,
+            )
+            return
+
+        # Live: Tile-Buffer sofort, längere Historie kommt aus dem Worker nach
+        series = (device_id, active_channel, self.tile_id)
+        alpha = getattr(self.tile_ref, "smoothing", 1.0)
+        self._show_buf(self._live_buf(buf_key, series))
+
+        def done(hist):
+            self._hist = (series, hist)
+            self._show_buf(self._live_buf(buf_key, series))
+
+        self._loader.start(
+            lambda job: self._history_buffer(device_id, active_channel, metric, alpha),
+            done,
+        )
+
+    def _live_buf(self, buf_key, series):
         buf = self.tile_ref.buffers.get(buf_key, [])
 
-        # Fullscreen darf mehr Historie sehen
+        # Fullscreen darf mehr Historie sehen → History-Store (überlebt Neustarts)
+        if self._hist[0] == series and len(self._hist[1]) > len(buf):
+            buf = self._hist[1]
+
         if len(buf) > FULLSCREEN_MAX:
             buf = buf[-FULLSCREEN_MAX:]
-        self._update_graph(buf)
-        self._update_panel(buf)
+        return buf
+
+    def _show_buf(self, buf):
+        self._buf = buf
+        self._render()
+
+    def _render(self):
+        self._update_graph(self._buf)
+        self._update_panel(self._buf)
+
+    # Worker-Thread: kein Zugriff auf Widgets
+    @staticmethod
+    def _history_buffer(device_id, channel, metric, alpha):
+        if not metric:
+            return []
+        try:
+            _, vals = history_store.get_store().tail(device_id, channel, metric, FULLSCREEN_MAX)
+        except Exception as e:
+            print("[Fullscreen] history failed:", e)
+            return []
+        vals = history_store.display_values(metric, vals)
+
+        # gleiche Glättung wie im Tile (vektorisiert)
+        return analytics.to_list(analytics.ema(vals, alpha))
+
+    @staticmethod
+    def _range_buffer(device_id, channel, metric, span, pixels):
+        if not metric:
+            return []
+        now = time.time()
+        try:
+            res = history_store.get_store().query_auto(
+                device_id, channel, metric, now - span, now, pixels
+            )
+        except Exception as e:
+            print("[Fullscreen] rollup query failed:", e)
+            return []
+        return [float(v) for v in history_store.display_values(metric, res["mean"])]
+
+    def _cycle_range(self):
+        self._range_idx = (self._range_idx + 1) % len(RANGES)
+        self.btn_range.text = RANGES[self._range_idx][0]
+        # Live: wieder im Tile-Maßstab starten
+        self._zoom = 1.0
+        self._view_offset = 0
+        self._load_tile()
 
     def _update_graph(self, buf):
         if not buf:
@@ -282,8 +385,9 @@ class FullScreenView(Screen):
     
         total = len(buf)
     
-        # Viewport-Größe abhängig vom Zoom
-        view_size = int(self._view_size / self._zoom)
+        # Viewport-Größe abhängig vom Zoom (Langzeit-Bereich: ganzer Bereich)
+        base = total if RANGES[self._range_idx][1] else self._view_size
+        view_size = int(base / self._zoom)
         view_size = max(10, min(view_size, total))
     
         # Offset clampen (nicht über Vergangenheit hinaus)
@@ -334,10 +438,16 @@ class FullScreenView(Screen):
         else:
             self.lbl_trend.text = "\uf061"
 
-        avg_v = sum(buf) / len(buf)
-        mn, mx = min(buf), max(buf)
-        self.lbl_avg.text = f"avg: {avg_v:.2f}"
-        self.lbl_minmax.text = f"min: {mn:.2f}   max: {mx:.2f}"
+        stats = analytics.summary(buf)
+        if stats is None:
+            self.lbl_avg.text = "avg: --"
+            self.lbl_minmax.text = ""
+            return
+        self.lbl_avg.text = f"avg: {stats['mean']:.2f}   med: {stats['p50']:.2f}"
+        self.lbl_minmax.text = (
+            f"min: {stats['min']:.2f}   max: {stats['max']:.2f}   "
+            f"p5–p95: {stats['p5']:.2f}–{stats['p95']:.2f}"
+        )
 
     # ----------------------------------------------------------
     # SWIPE
@@ -371,30 +481,43 @@ class FullScreenView(Screen):
         if abs(touch.dy) > abs(touch.dx):
             self._zoom *= 1.0 + (touch.dy / 600.0)
             self._zoom = max(0.5, min(self._zoom, 5.0))
-            self._load_tile()
+            self._render()
             return True
     
         # Horizontal = Zeit scrubben
         if abs(touch.dx) > abs(touch.dy):
             self._view_offset += int(touch.dx / 10)
             self._view_offset = max(0, self._view_offset)
-            self._load_tile()
+            self._render()
             return True
     
         return super().on_touch_move(touch)
     def _reset_view(self):
         self._zoom = 1.0
         self._view_offset = 0
-        self._load_tile()
+        self._render()
     # ----------------------------------------------------------
     # LIVE UPDATE
     # ----------------------------------------------------------
+    def _on_value(self, device, channel, metric, value, ts, unit):
+        # nur das angezeigte Gerät + Kanal – andere Geräte lösen keinen Reload aus
+        shown = self._loaded_key
+        if shown is not None and metric == self.tile_id and (device, channel) == shown[:2]:
+            self._data_dirty = True
+
     def update_from_global(self, d):
         self.header.update_from_global(d)
-        # Graph + Werte aktualisieren
-        self._load_tile()
+        # Graph + Werte nur bei neuen Daten / anderem Gerät, Kanal oder Bereich
+        key = (d.get("device_id"), d.get("channel"), self.tile_id, self._range_idx)
+        if self._data_dirty or key != self._loaded_key:
+            self._data_dirty = False
+            self._loaded_key = key
+            self._load_tile()
 
     def reset_from_global(self):
+        self._loader.cancel()
+        self._buf = []
+        self._hist = (None, [])
         self.plot.points = []
         self.plot_glow.points = []
         self.graph.ymin = 0
@@ -404,6 +527,7 @@ class FullScreenView(Screen):
         self.lbl_avg.text = "avg: --"
         self.lbl_minmax.text = ""
         self._zoom = 1.0
+        self._data_dirty = True
         print("[FULLSCREEN] reset_from_global executed")
 
     def _update_bg(self, *_):
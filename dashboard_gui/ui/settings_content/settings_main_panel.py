@@ -86,6 +86,8 @@ class SettingsMainPanel(BoxLayout):
         # sliders
         add_slider("Refresh Interval", "refresh_interval", 0.5, 10, 0.5)
         add_slider("UI Refresh", "ui_refresh_interval", 0.1, 5, 0.1)
+        add_slider("UI Max FPS", "ui_max_fps", 1, 30, 1)
+        add_slider("UI Idle", "ui_idle_interval", 1, 30, 1)
         add_slider("Stale Timeout", "stale_timeout", 5, 60, 1)
         add_slider("Temp Offset", "temperature_offset", -10, 10, 0.1)
         add_slider("Humidity Offset", "humidity_offset", -20, 20, 1)
@@ -179,6 +181,8 @@ class SettingsMainPanel(BoxLayout):
         defaults = {
             "refresh_interval": 2.0,
             "ui_refresh_interval": 1.0,
+            "ui_max_fps": 10.0,
+            "ui_idle_interval": 5.0,
             "stale_timeout": 15.0,
             "temperature_offset": 0.0,
             "humidity_offset": 0.0,
@@ -15,7 +15,10 @@ from kivy.uix.label import Label
 from kivy.graphics import Color, RoundedRectangle
 import math
 import time
+import history_store
 
+# Tile-Keys, aus denen Punkte + Wertebox entstehen
+SCATTER_METRICS = ("vpd_in", "vpd_ex", "hum_in", "hum_ex", "temp_in", "temp_ex")
 
 class VPDScatterScreen(Screen):
 
@@ -66,6 +69,10 @@ class VPDScatterScreen(Screen):
         self.header.update_back_button("vpd_scatter")
 
         self.gsm.attach_vpd_scatter(self)
+        # Punkte nur neu setzen bei passendem value_changed oder Gerät/Kanal-Wechsel
+        self._data_dirty = True
+        self._loaded_key = None
+        self.gsm.subscribe("value_changed", self._on_value)
         self._reset_active = False
 
         # -------------------------------------------------
@@ -246,6 +253,13 @@ class VPDScatterScreen(Screen):
     # -------------------------------------------------
     # DATA LOAD (IDENTISCH ZU FULLSCREEN)
     # -------------------------------------------------
+    def _latest(self, device_id, channel, metric):
+        try:
+            last = history_store.get_store().latest(device_id, channel, metric)
+        except Exception:
+            return []
+        return [last[1]] if last else []
+
     def _load_points(self):
         from dashboard_gui.data_buffer import BUFFER
         import config
@@ -290,6 +304,12 @@ class VPDScatterScreen(Screen):
         vpd_ex = tile_vpd_ex.buffers.get(f"{prefix}_vpd_ex", [])
         h_in   = tile_h_in.buffers.get(f"{prefix}_hum_in", []) if tile_h_in else []
         h_ex   = tile_h_ex.buffers.get(f"{prefix}_hum_ex", []) if tile_h_ex else []
+
+        # Tiles noch leer (Start / Gerät gerade gewechselt) → letzter Stand aus dem History-Store
+        vpd_in = vpd_in or self._latest(device_id, ch, "vpd_i")
+        vpd_ex = vpd_ex or self._latest(device_id, ch, "vpd_e")
+        h_in   = h_in or self._latest(device_id, ch, "H_i")
+        h_ex   = h_ex or self._latest(device_id, ch, "H_e")
         # -------------------------
         # IN (Scatter)
         # -------------------------
@@ -372,10 +392,22 @@ class VPDScatterScreen(Screen):
     # -------------------------------------------------
     # GSM UPDATE
     # -------------------------------------------------
+    def _on_value(self, device, channel, metric, value, ts, unit):
+        if metric in SCATTER_METRICS:
+            self._data_dirty = True
+
+    def on_pre_enter(self, *_):
+        # Offsets evtl. in den Settings geändert
+        self._data_dirty = True
+
     def update_from_global(self, d):
         self.header.update_from_global(d)
         self.header.set_clock(time.strftime("%H:%M:%S"))
-        self._load_points()
+        key = (d.get("device_id"), d.get("channel"))
+        if self._data_dirty or key != self._loaded_key:
+            self._data_dirty = False
+            self._loaded_key = key
+            self._load_points()
 
     def _tick(self, *_):
         pass
@@ -412,6 +444,7 @@ class VPDScatterScreen(Screen):
     # RESET
     # -------------------------------------------------
     def reset_from_global(self):
+        self._data_dirty = True
         self.p_in.pos = (-1000, -1000)
         self.p_ex.pos = (-1000, -1000)
     
@@ -1,10 +1,23 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, json, time, threading, csv
+import os, json, time, threading, csv, struct
 from kivy.utils import platform
 import config
 import calculator
+from file_watch import FileWatcher, file_sig
+import dump_snapshot
+from dump_snapshot import get_snapshot, DumpSnapshot
+import transport
+import frame_codec
+import atexit
+from history_writer import HistoryWriter, ChangeFilter, history_files, open_text
+import history_store
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # ------------------------------------------------------------
 # PFAD-LOGIK
@@ -24,6 +37,7 @@ else:
 
 RAW_FILE = os.path.join(DATA, "ble_dump.json")
 DEC_FILE = os.path.join(DATA, "decoded.json")
+BIN_FILE = os.path.join(DATA, "decoded.bin")
 PROFILES = os.path.join(DATA, "decoder_profiles")
 CSV_FILE = os.path.join(DATA, "log.csv")
 
@@ -44,6 +58,23 @@ _LAST_ADV_TS = {}
 _LAST_GATT_RAW = {}
 _LAST_GATT_TS = {}
 
+# Frame-Memo pro Kanal: (mac, raw_key) -> (raw, plan, config-gen, packet_counter, frame)
+# BLE-Sensoren wiederholen dasselbe Advertisement viele Sekunden lang.
+_FRAME_MEMO = {}
+
+
+def _fresh_frame(frame):
+    """
+    Kopie eines Memo-Frames (bis in die Werte-dicts): Writer, Transport und
+    UI bekommen je eigene dicts – das Memo selbst wird nie herausgegeben.
+    """
+    out = dict(frame)
+    for k in ("internal", "external"):
+        out[k] = {kk: dict(v) if isinstance(v, dict) else v for kk, v in frame[k].items()}
+    for k in ("vpd_internal", "vpd_external"):
+        out[k] = dict(frame[k])
+    return out
+
 def update_bridge_state(alive, status, last_seen):
     global BRIDGE_ALIVE, BRIDGE_STATUS, BRIDGE_LAST_SEEN
     BRIDGE_ALIVE = alive
@@ -51,9 +82,34 @@ def update_bridge_state(alive, status, last_seen):
     BRIDGE_LAST_SEEN = last_seen
 
 # ------------------------------------------------------------
-# PROFILE LOADER
+# PROFILE LOADER (Registry mit mtime/size/inode-Cache)
 # ------------------------------------------------------------
-def load_profile(name):
+# name -> {"path": str|None, "sig": tuple|None, "profile": dict|None, "plan": DecodePlan|None}
+_profile_cache = {}
+_profile_lock = threading.Lock()
+
+
+def _read_profile(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            prof = json.load(f)
+    except Exception:
+        print("[Decoder] JSON error:", path)
+        return None
+
+    if isinstance(prof, dict) and prof.get("fields"):
+        return prof
+
+    print("[Decoder] Invalid profile:", path)
+    return None
+
+
+def _profile_entry(name):
+    """
+    Registry-Eintrag zum Profilnamen.
+    JSON wird nur neu gelesen, wenn sich mtime/size/inode der Datei ändern.
+    Ungültige/fehlende Profile werden ebenfalls gecacht (kein Log-Spam pro Tick).
+    """
     if not name:
         return None
 
@@ -64,148 +120,369 @@ def load_profile(name):
         os.path.join(PROFILES, "gatt", fname),
     ]
 
+    path, sig = None, None
     for p in candidates:
-        if os.path.exists(p):
-            try:
-                prof = json.load(open(p, "r", encoding="utf-8"))
-                if isinstance(prof, dict) and prof.get("fields"):
-                    return prof
-                print("[Decoder] Invalid profile:", p)
-                return None
-            except Exception:
-                print("[Decoder] JSON error:", p)
-                return None
+        sig = file_sig(p)
+        if sig is not None:
+            path = p
+            break
+
+    with _profile_lock:
+        entry = _profile_cache.get(name)
+        if entry and entry["path"] == path and entry["sig"] == sig:
+            return entry
+
+    if path is None:
+        # 🔥 HARTER FEHLER – bewusst
+        print("[Decoder] Missing profile (no fallback):", fname)
+        prof = None
+    else:
+        prof = _read_profile(path)
+
+    plan = compile_profile(prof) if prof else None
+    if prof and plan is None:
+        print("[Decoder] Profile not compilable:", path)
+
+    entry = {"path": path, "sig": sig, "profile": prof, "plan": plan}
+    with _profile_lock:
+        _profile_cache[name] = entry
+
+    return entry
+
+
+def load_profile(name):
+    """Geparstes + validiertes Profil-Dict (oder None)."""
+    entry = _profile_entry(name)
+    return entry["profile"] if entry else None
 
-    # 🔥 HARTER FEHLER – bewusst
-    print("[Decoder] Missing profile (no fallback):", fname)
-    return None
+
+def load_plan(name):
+    """Kompilierter DecodePlan zum Profil (oder None)."""
+    entry = _profile_entry(name)
+    return entry["plan"] if entry else None
+
+
+def clear_profile_cache():
+    with _profile_lock:
+        _profile_cache.clear()
 
 
 # ------------------------------------------------------------
-# HELPER
+# DECODE-PLAN (Profil → einmal kompiliert)
 # ------------------------------------------------------------
-def _be16(b, pos):
-    if pos + 1 >= len(b): return None
-    v = (b[pos] << 8) | b[pos+1]
-    if v in (0xFFFF, 0x0FFF): return None
-    if v & 0x8000: v -= 0x10000
-    return v
-
-def _be16u(b, pos):
-    if pos + 1 >= len(b): return None
-    v = (b[pos] << 8) | b[pos+1]
-    if v in (0xFFFF, 0x0FFF): return None
-    return v
-def _u8(b, pos):
-    if pos >= len(b):
-        return None
-    v = b[pos] & 0xFF
-    if v == 0xFF:
-        return None
-    return v
+_SENTINEL_16 = (0xFFFF, 0x0FFF)
+_SENTINEL_8 = 0xFF
+
 
-def _le16(b, pos):
-    if pos + 1 >= len(b): 
+class DecodePlan:
+    """
+    Einmal kompiliertes Decoder-Profil:
+    - Offsets relativ zum MSD-Puffer (CompanyID LE + Payload)
+    - ein struct-Format über alle Felder (wenn nicht überlappend)
+    - Sentinels, Vorzeichen und Skalierung fertig aufgelöst
+    """
+
+    __slots__ = (
+        "company_id", "cid_bytes", "fields", "span", "start",
+        "struct", "order",
+    )
+
+    def __init__(self, company_id, fields, endian):
+        self.company_id = company_id
+        self.cid_bytes = bytes((company_id & 0xFF, (company_id >> 8) & 0xFF))
+
+        # fields: [(key, offset, width, signed, scale, Struct)]
+        bo = ">" if endian == "be" else "<"
+        self.fields = [
+            (key, off, width, signed, scale,
+             struct.Struct(bo + ("B" if width == 1 else "H")))
+            for key, off, width, signed, scale in fields
+        ]
+
+        self.span = max(f[1] + f[2] for f in self.fields)
+        self.start = min(f[1] for f in self.fields)
+
+        # Ein einziges unpack_from, wenn sich Felder nicht überlappen
+        self.struct = None
+        self.order = None
+
+        ordered = sorted(range(len(self.fields)), key=lambda i: self.fields[i][1])
+        fmt, cursor = bo, self.start
+        for i in ordered:
+            _, off, width, _, _, _ = self.fields[i]
+            if off < cursor:
+                return
+            if off > cursor:
+                fmt += f"{off - cursor}x"
+            fmt += "B" if width == 1 else "H"
+            cursor = off + width
+
+        self.struct = struct.Struct(fmt)
+        self.order = ordered
+
+    # --------------------------------------------------------
+    def unpack(self, b):
+        """
+        Rohwerte (unsigned) je Feld, None = Feld liegt außerhalb des Frames.
+        b = Payload-Bytes OHNE Kopie; das MSD-Präfix wird nur über den
+        Offset-Shift berücksichtigt.
+        """
+        # CID passt → Puffer ist bereits MSD, sonst 2 Bytes Präfix gedacht
+        if len(b) >= 2 and ((b[1] << 8) | b[0]) == self.company_id:
+            shift = 0
+        else:
+            shift = 2
+            if self.start < 2:
+                # Feld liest im Präfix → einmalig echten MSD-Puffer bauen
+                b = self.cid_bytes + b
+                shift = 0
+
+        n = len(b) + shift
+
+        if self.struct is not None and self.span <= n:
+            out = [None] * len(self.fields)
+            for i, v in zip(self.order, self.struct.unpack_from(b, self.start - shift)):
+                out[i] = v
+            return out
+
+        # Kurzer Frame → feldweise (wie bisher: fehlendes Feld = None)
+        return [
+            st.unpack_from(b, off - shift)[0] if off + width <= n else None
+            for _, off, width, _, _, st in self.fields
+        ]
+
+    def decode(self, raw_hex):
+        if not raw_hex:
+            return None
+
+        # 🔒 ABSICHERUNG: Null-Frames ignorieren
+        if not raw_hex.strip("0"):
+            return None
+
+        try:
+            b = bytes.fromhex(raw_hex)
+        except Exception:
+            return None
+
+        out = {"raw": raw_hex, "T_i": None, "H_i": None, "T_e": None, "H_e": None}
+
+        for (key, _, width, signed, scale, _), v in zip(self.fields, self.unpack(b)):
+            if v is None:
+                continue
+            if width == 1:
+                if v == _SENTINEL_8:
+                    continue
+            else:
+                if v in _SENTINEL_16:
+                    continue
+                if signed and v & 0x8000:
+                    v -= 0x10000
+            out[key] = v / scale
+
+        return out
+
+
+def compile_profile(prof):
+    """Profil-Dict → DecodePlan (None bei ungültigem Profil)."""
+    if not isinstance(prof, dict):
         return None
-    v = b[pos] | (b[pos+1] << 8)
-    if v in (0xFFFF, 0x0FFF): 
+
+    fields = prof.get("fields")
+    if not isinstance(fields, dict):
         return None
-    if v & 0x8000: 
-        v -= 0x10000
-    return v
 
-def _le16u(b, pos):
-    if pos + 1 >= len(b): 
+    try:
+        company_id = int(prof.get("company_id", 25))
+
+        base_offset = int(prof.get("base_offset", 0))
+        if base_offset > 0:
+            pos = base_offset
+        else:
+            pos = 2 + int(prof.get("mac_len", 6)) + int(prof.get("skip_after_mac", 2))
+
+        endian = (prof.get("endian") or "le").lower()
+        sT = float(prof.get("scale_temperature", 16))
+        sH = float(prof.get("scale_humidity", 16))
+
+        hi_width = 1 if (prof.get("H_i_type") or "u16").lower() == "u8" else 2
+
+        plan_fields = [
+            ("T_i", pos + int(fields["T_i"]), 2, True, sT),
+            ("H_i", pos + int(fields["H_i"]), hi_width, False, sH),
+        ]
+        if int(fields.get("T_e", 100)) < 100:
+            plan_fields.append(("T_e", pos + int(fields["T_e"]), 2, True, sT))
+        if int(fields.get("H_e", 100)) < 100:
+            plan_fields.append(("H_e", pos + int(fields["H_e"]), 2, False, sH))
+    except Exception:
         return None
-    v = b[pos] | (b[pos+1] << 8)
-    if v in (0xFFFF, 0x0FFF): 
+
+    if any(off < 0 for _, off, _, _, _ in plan_fields):
         return None
-    return v
+
+    return DecodePlan(company_id, plan_fields, endian)
+
+
 # ------------------------------------------------------------
 # DECODIERUNG (roh → Werte)
 # ------------------------------------------------------------
 def decode_with_profile(raw_hex, prof):
-
-    if not raw_hex:
+    """
+    prof = DecodePlan (aus load_plan) oder Profil-Dict (wird ad hoc kompiliert).
+    """
+    plan = prof if isinstance(prof, DecodePlan) else compile_profile(prof)
+    if plan is None:
         return None
+    return plan.decode(raw_hex)
 
-    # 🔒 ABSICHERUNG: Null-Frames ignorieren
-    if set(raw_hex) == {"0"}:
-        return None
 
+# ------------------------------------------------------------
+# BATCH-DECODIERUNG (viele Frames, ein Profil → Spalten)
+# ------------------------------------------------------------
+BATCH_MIN = 8           # ab so vielen Frames pro Profil lohnt NumPy im Live-Tick
+_COLUMNS = ("T_i", "H_i", "T_e", "H_e")
+
+
+def decode_batch(raw_list, prof):
+    """
+    N RAW-Payloads, die sich ein Profil teilen → Spalten.
+
+    Rückgabe: {"T_i", "H_i", "T_e", "H_e", "valid"}
+    - mit NumPy:  float64-Arrays (NaN = kein Wert), valid = bool-Array
+    - ohne NumPy: Listen (None = kein Wert)
+    valid=False entspricht decode_with_profile() → None.
+    Ergebnisse sind bitgleich zur Einzel-Decodierung.
+    """
+    plan = prof if isinstance(prof, DecodePlan) else compile_profile(prof)
+    n = len(raw_list)
+
+    if np is None or plan is None:
+        rows = [plan.decode(r) if plan else None for r in raw_list]
+        out = {k: [d[k] if d else None for d in rows] for k in _COLUMNS}
+        out["valid"] = [d is not None for d in rows]
+        return out
+
+    cid = plan.company_id
+    bufs = []
+    valid = np.zeros(n, dtype=bool)
+    lengths = np.zeros(n, dtype=np.int64)
+
+    for i, r in enumerate(raw_list):
+        b = b""
+        if r and r.strip("0"):
+            try:
+                b = bytes.fromhex(r)
+                valid[i] = True
+            except Exception:
+                b = b""
+        if valid[i] and not (len(b) >= 2 and ((b[1] << 8) | b[0]) == cid):
+            b = plan.cid_bytes + b       # MSD-Präfix wie im Einzel-Decoder
+        bufs.append(b)
+        lengths[i] = len(b)
+
+    width = max(plan.span, int(lengths.max()) if n else 0)
+    mat = np.frombuffer(
+        b"".join(b.ljust(width, b"\0") for b in bufs), dtype=np.uint8
+    ).reshape(n, width)
+
+    out = {k: np.full(n, np.nan) for k in _COLUMNS}
+    out["valid"] = valid
+
+    for key, off, w, signed, scale, st in plan.fields:
+        ok = valid & (lengths >= off + w)
+
+        if w == 1:
+            v = mat[:, off].astype(np.int32)
+            ok &= v != _SENTINEL_8
+        else:
+            lo, hi = (off, off + 1) if st.format[0] == "<" else (off + 1, off)
+            v = mat[:, lo].astype(np.int32) | (mat[:, hi].astype(np.int32) << 8)
+            ok &= (v != 0xFFFF) & (v != 0x0FFF)
+            if signed:
+                v = np.where(v & 0x8000, v - 0x10000, v)
 
-    fields = prof.get("fields")
-    if not isinstance(fields, dict):
-        return None
+        out[key] = np.where(ok, v / scale, np.nan)
 
-    try:
-        b = bytes.fromhex(raw_hex)
-    except Exception:
-        return None
+    return out
 
-    # Company-ID aus Profil (nur für ADV-Kompatibilität)
-    company_id = int(prof.get("company_id", 25))
-    cid = (b[1] << 8) | b[0] if len(b) >= 2 else -1
-
-    # Falls CID nicht passt → MSD vorne dransetzen (ADV-Altlast, stört GATT nicht)
-    if cid != company_id:
-        msd = bytearray(2 + len(b))
-        msd[0] = company_id & 0xFF
-        msd[1] = (company_id >> 8) & 0xFF
-        msd[2:] = b
-        b = bytes(msd)
-
-    # Startoffset bestimmen
-    base_offset = int(prof.get("base_offset", 0))
-    if base_offset > 0:
-        pos = base_offset
-    else:
-        pos = 2 + int(prof.get("mac_len", 6)) + int(prof.get("skip_after_mac", 2))
 
-    endian = (prof.get("endian") or "le").lower()
-    r16  = _be16  if endian == "be" else _le16
-    r16u = _be16u if endian == "be" else _le16u
+def _batch_rows(raw_list, plan):
+    """decode_batch → {raw: decoded-dict} (Format wie decode_with_profile)."""
+    cols = decode_batch(raw_list, plan)
+    rows = {}
+    for i, r in enumerate(raw_list):
+        if not cols["valid"][i]:
+            rows[r] = None
+            continue
+        d = {"raw": r}
+        for k in _COLUMNS:
+            v = cols[k][i]
+            d[k] = None if v != v else float(v)      # NaN → None
+        rows[r] = d
+    return rows
+
+
+def replay_log(csv_path, profile_name, channel=None):
+    """
+    Decodiert die 'raw'-Spalte einer log.csv erneut mit (geändertem) Profil.
+    Gleiche RAWs werden nur einmal decodiert.
+
+    Rückgabe: {"timestamp", "device_id", "channel", "raw", T_i/H_i/T_e/H_e, "valid"}
+    """
+    plan = load_plan(profile_name)
+    if plan is None:
+        return None
 
-    try:
-        ti = r16(b, pos + int(fields["T_i"]))
-    
-        hi_mode = (prof.get("H_i_type") or "u16").lower()
-        if hi_mode == "u8":
-            hi = _u8(b, pos + int(fields["H_i"]))
-        else:
-            hi = r16u(b, pos + int(fields["H_i"]))
-    
-        te = None
-        he = None
-    
-        if int(fields.get("T_e", 100)) < 100:
-            te = r16(b, pos + int(fields["T_e"]))
-    
-        if int(fields.get("H_e", 100)) < 100:
-            he = r16u(b, pos + int(fields["H_e"]))
-    
-    except Exception:
+    ts, dev, chan, raws = [], [], [], []
+    found = False
+    # aktives log.csv → auch alle rotierten (gzip-)Segmente, chronologisch
+    for path in history_files(csv_path):
+        try:
+            with open_text(path) as f:
+                reader = csv.reader(f)
+                header = next(reader, None) or []
+                try:
+                    i_ts, i_dev, i_ch, i_raw = (header.index(c) for c in
+                                                ("timestamp", "device_id", "channel", "raw"))
+                except ValueError:
+                    continue
+                found = True
+
+                for row in reader:
+                    if len(row) <= max(i_ts, i_dev, i_ch, i_raw):
+                        continue
+                    if channel and row[i_ch] != channel:
+                        continue
+                    ts.append(row[i_ts])
+                    dev.append(row[i_dev])
+                    chan.append(row[i_ch])
+                    raws.append(row[i_raw])
+        except (OSError, EOFError) as e:
+            print("[Decoder] replay read failed:", path, e)
+    if not found:
         return None
 
-    sT = float(prof.get("scale_temperature", 16))
-    sH = float(prof.get("scale_humidity", 16))
+    uniq = {}
+    idx = [uniq.setdefault(r, len(uniq)) for r in raws]
+    cols = decode_batch(list(uniq), plan)
+
+    out = {"timestamp": ts, "device_id": dev, "channel": chan, "raw": raws}
+    if np is not None:
+        idx = np.asarray(idx, dtype=np.int64)
+        for k in _COLUMNS + ("valid",):
+            out[k] = cols[k][idx]
+    else:
+        for k in _COLUMNS + ("valid",):
+            out[k] = [cols[k][i] for i in idx]
+    return out
 
-    return {
-        "raw": raw_hex,          # RAW bleibt unverändert sichtbar
-        "T_i": ti / sT if ti is not None else None,
-        "H_i": hi / sH if hi is not None else None,
-        "T_e": te / sT if te is not None else None,
-        "H_e": he / sH if he is not None else None,
-    }
 
 # -----------------------------------------------
 # MULTI-CHANNEL DECODER (ADV + GATT)
 # -----------------------------------------------
-_profile_cache = {}  # Cache für geladene Profile
-
 def decode_channel(entry, raw_key, profile_name,
                    last_signal_dict, last_ts_dict,
-                   timeout, is_gatt=False):
+                   timeout, is_gatt=False, batch=None):
 
     now = time.time()
     mac = entry.get("address")
@@ -243,11 +520,22 @@ def decode_channel(entry, raw_key, profile_name,
     if not raw_hex:
         return offline_channel_frame(None)
 
-    prof = load_profile(profile_name)
-    if not prof:
+    plan = load_plan(profile_name)
+    if not plan:
         return offline_channel_frame(raw_hex)
 
-    decoded = decode_with_profile(raw_hex, prof)
+    memo_key = (mac, raw_key)
+    gen = config.get_generation()
+    counter = entry.get("packet_counter")
+
+    memo = _FRAME_MEMO.get(memo_key)
+    if memo and memo[0] == raw_hex and memo[1] is plan and memo[2] == gen and memo[3] == counter:
+        return _fresh_frame(memo[4])
+
+    if batch is not None and raw_hex in batch:
+        decoded = batch[raw_hex]
+    else:
+        decoded = plan.decode(raw_hex)
     if not decoded:
         return offline_channel_frame(raw_hex)
 
@@ -257,10 +545,10 @@ def decode_channel(entry, raw_key, profile_name,
 
     unit = f"°{config.get_temperature_unit().upper()}"
 
-    return {
+    frame = {
         "alive": True,
         "status": "active",
-        "packet_counter": entry.get("packet_counter"),
+        "packet_counter": counter,
         "raw": decoded["raw"],
         "internal": {
             "temperature": {"value": calculator.to_unit(T_i), "unit": unit},
@@ -275,6 +563,53 @@ def decode_channel(entry, raw_key, profile_name,
         "vpd_external": {"value": calculator.vpd_external(T_e, H_e), "unit": "kPa"},
     }
 
+    _FRAME_MEMO[memo_key] = (raw_hex, plan, gen, counter, frame)
+    return _fresh_frame(frame)
+
+
+def _memo_valid(mac, raw_key, entry, plan):
+    memo = _FRAME_MEMO.get((mac, raw_key))
+    return bool(
+        memo
+        and memo[0] == entry.get(raw_key)
+        and memo[1] is plan
+        and memo[2] == config.get_generation()
+        and memo[3] == entry.get("packet_counter")
+    )
+
+
+def _prebatch(devs, by_mac):
+    """
+    Gruppiert die aktuellen RAWs nach (Kanal, Profil).
+    Gruppen ab BATCH_MIN Frames werden in einem NumPy-Durchlauf decodiert.
+    Rückgabe: {(raw_key, profile_name): {raw: decoded}}
+    """
+    if np is None:
+        return {}
+
+    groups = {}
+    for mac, dev_cfg in devs.items():
+        entry = by_mac.get(mac)
+        if entry is None:
+            continue
+        for raw_key, cfg_key in (("adv_raw", "adv_decoder"), ("gat_raw", "gatt_decoder")):
+            raw = entry.get(raw_key)
+            if not raw:
+                continue
+            pname = dev_cfg.get(cfg_key, "unknown")
+            plan = load_plan(pname)
+            # unveränderte Payloads kommen aus dem Frame-Memo
+            if plan is None or _memo_valid(mac, raw_key, entry, plan):
+                continue
+            groups.setdefault((raw_key, pname), (plan, set()))[1].add(raw)
+
+    out = {}
+    for key, (plan, raws) in groups.items():
+        if len(raws) >= BATCH_MIN:
+            out[key] = _batch_rows(list(raws), plan)
+    return out
+
+
 def offline_channel_frame(raw_hex=None):
     return {
         "alive": False,
@@ -328,6 +663,36 @@ def offline_all(cfg):
         frames.append(offline_frame(mac, prof, now))
 
     _write(frames)
+# ------------------------------------------------------------
+# MEMORY-TRANSPORT
+# ------------------------------------------------------------
+_MEM_STORE = {}          # mac -> letzter Record aus dem Ring
+_MEM_SNAP = DumpSnapshot(("mem", 0), [])
+_MEM_SEQ = 0
+_LAST_DEBUG_WRITE = 0.0
+_WRITE_SEQ = 0
+_HISTORY = None          # Verlaufs-Sinks (log.csv / history.db), lazy
+_CHANGE_FILTER = None    # ChangeFilter im history_mode "change"
+
+
+def _ingest_ring():
+    """
+    Ring leeren, neuesten Record je MAC übernehmen und als Snapshot
+    publizieren (Watchdog/Setup sehen so denselben Stand wie der Decoder).
+    """
+    global _MEM_SNAP, _MEM_SEQ
+
+    records = transport.RAW_RING.drain()
+    if records:
+        for r in records:
+            _MEM_STORE[r["address"]] = r
+        _MEM_SEQ += 1
+        _MEM_SNAP = DumpSnapshot(("mem", _MEM_SEQ), list(_MEM_STORE.values()))
+        dump_snapshot.publish(_MEM_SNAP)
+
+    return _MEM_SNAP
+
+
 # ------------------------------------------------------------
 # DECODER-STEP
 # ------------------------------------------------------------
@@ -337,17 +702,21 @@ def step_decode():
     cfg = config._init()
     devs = cfg.get("devices", {})
 
-    if not devs or not os.path.exists(RAW_FILE):
+    if transport.is_active():
+        # memory-Transport: Records direkt aus dem Ring
+        snap = _ingest_ring()
+        if not devs:
+            return offline_all(cfg)
 
-        return offline_all(cfg)
+    else:
+        if not devs or not os.path.exists(RAW_FILE):
 
-    try:
-        raw_list = json.load(open(RAW_FILE, "r"))
-    except:
-        return offline_all(cfg)
+            return offline_all(cfg)
 
-    if not isinstance(raw_list, list):
-        return offline_all(cfg)
+        # gemeinsamer Snapshot (Watchdog/Setup parsen dieselbe Version nicht erneut)
+        snap = get_snapshot(RAW_FILE)
+        if not snap.valid:
+            return offline_all(cfg)
 
     now = time.time()
     if UPTIME_START is None:
@@ -355,11 +724,13 @@ def step_decode():
 
     timeout = float(config.get_stale_timeout())
 
-    by_mac = {
-        e.get("address"): e
-        for e in raw_list
-        if isinstance(e, dict) and e.get("address")
-    }
+    by_mac = snap.by_mac
+
+    if len(_FRAME_MEMO) > 2 * len(devs):
+        for key in [k for k in _FRAME_MEMO if k[0] not in devs]:
+            del _FRAME_MEMO[key]
+
+    batches = _prebatch(devs, by_mac)
 
     frames = []
 
@@ -383,7 +754,8 @@ def step_decode():
             dev_cfg.get("adv_decoder", "unknown"),
             _LAST_ADV_RAW, _LAST_ADV_TS,
             timeout,
-            is_gatt=False
+            is_gatt=False,
+            batch=batches.get(("adv_raw", dev_cfg.get("adv_decoder", "unknown")))
         )
 
         # ------------------------------
@@ -394,7 +766,8 @@ def step_decode():
             dev_cfg.get("gatt_decoder", "unknown"),
             _LAST_GATT_RAW, _LAST_GATT_TS,
             timeout,
-            is_gatt=True
+            is_gatt=True,
+            batch=batches.get(("gat_raw", dev_cfg.get("gatt_decoder", "unknown")))
         )
 
         # ------------------------------
@@ -453,76 +826,186 @@ def step_decode():
 
 # ------------------------------------------------------------
 def _write(frames):
+    global _LAST_DEBUG_WRITE
+
+    if transport.is_active():
+        # UI bekommt die Frames direkt, decoded.json nur noch als Debug-Snapshot
+        transport.FRAMES.publish(frames)
+
+        now = time.monotonic()
+        if now - _LAST_DEBUG_WRITE >= config.get_debug_snapshot_interval():
+            _LAST_DEBUG_WRITE = now
+            _write_decoded(frames)
+
+        _write_csv(frames)
+        _write_store(frames)
+        return
+
+    name = _write_decoded(frames)
+    _write_csv(frames)
+    _write_store(frames)
+
+    print(f"[Decoder] {name} written, log.csv buffered")
+
+def _write_decoded(frames):
+    global _WRITE_SEQ
+
+    if config.get_decoded_format() == "binary":
+        _WRITE_SEQ += 1
+        try:
+            frame_codec.write_frames(
+                BIN_FILE, frames,
+                unit=config.get_temperature_unit(),
+                seq=_WRITE_SEQ,
+                written_at=time.time(),
+            )
+        except frame_codec.FrameFormatError as e:
+            # nicht darstellbar → lieber keinen Stand als einen verfälschten
+            print("[Decoder] decoded.bin skipped:", e)
+        return "decoded.bin"
+
     tmp = DEC_FILE + ".tmp"
-    json.dump(frames, open(tmp, "w"), indent=2)
+    with open(tmp, "w") as f:
+        json.dump(frames, f, indent=2)
     os.replace(tmp, DEC_FILE)
+    return "decoded.json"
+
+def _history():
+    """Liste der Sinks je nach history_backend (csv | sqlite | both)."""
+    global _HISTORY
+    if _HISTORY is None:
+        backend = config.get_history_backend()
+        settings = config.get_history_settings()
+        sinks = []
+
+        if backend in ("csv", "both"):
+            sinks.append(HistoryWriter(CSV_FILE, **settings))
+        if backend in ("sqlite", "both"):
+            try:
+                from history_sqlite import SQLiteHistory, DB_NAME
+                sinks.append(SQLiteHistory(os.path.join(DATA, DB_NAME), **settings))
+            except Exception as e:
+                print("[Decoder] SQLite history unavailable → log.csv:", e)
+                if not sinks:
+                    sinks.append(HistoryWriter(CSV_FILE, **settings))
 
-    _write_csv(frames)
+        _HISTORY = sinks
+        for sink in sinks:
+            atexit.register(sink.close)
+        atexit.register(history_store.get_store().close)
+    return _HISTORY
 
-    print("[Decoder] decoded.json + log.csv written")
 
-def _write_csv(frames):
-    file_exists = os.path.exists(CSV_FILE)
-
-    with open(CSV_FILE, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-
-        # Header nur einmal schreiben
-        if not file_exists:
-            writer.writerow([
-                "timestamp",
-                "device_id",
-                "name",
-                "channel",
-                "alive",
-                "status",
-                "packet_counter",
-                "raw",
-                "T_i",
-                "H_i",
-                "T_e",
-                "H_e",
-                "vpd_i",
-                "vpd_e",
-                "rssi"
-            ])
+def _write_store(frames):
+    try:
+        history_store.get_store().append_frames(frames)
+    except Exception as e:
+        print("[Decoder] history store failed:", e)
 
-        for frame in frames:
-            for channel in ("adv", "gatt"):
-                ch = frame.get(channel, {})
 
-                writer.writerow([
-                    frame.get("timestamp"),
-                    frame.get("device_id"),
-                    frame.get("name"),
-                    channel,
-                    ch.get("alive"),
-                    ch.get("status"),
-                    ch.get("packet_counter"),
-                    ch.get("raw"),
+def _change_filter(cfg):
+    global _CHANGE_FILTER
+    eps = float(cfg.get("history_epsilon", 0.05))
+    hb = float(cfg.get("history_heartbeat", 300.0))
 
-                    ch.get("internal", {}).get("temperature", {}).get("value"),
-                    ch.get("internal", {}).get("humidity", {}).get("value"),
+    f = _CHANGE_FILTER
+    if f is None:
+        f = _CHANGE_FILTER = ChangeFilter(eps, hb)
+    else:
+        f.epsilon, f.heartbeat = eps, hb
+    return f
 
-                    ch.get("external", {}).get("temperature", {}).get("value"),
-                    ch.get("external", {}).get("humidity", {}).get("value"),
 
-                    ch.get("vpd_internal", {}).get("value"),
-                    ch.get("vpd_external", {}).get("value"),
+def _write_csv(frames):
+    cfg = config._init()
+    change_mode = config.get_history_mode() == "change"
+
+    # im change-Modus fasst der Filter Offline-Läufe selbst zusammen
+    skip_empty = not change_mode and bool(cfg.get("history_skip_empty", True))
+    rows = []
+
+    for frame in frames:
+        for channel in ("adv", "gatt"):
+            ch = frame.get(channel, {})
+
+            T_i = ch.get("internal", {}).get("temperature", {}).get("value")
+            H_i = ch.get("internal", {}).get("humidity", {}).get("value")
+            T_e = ch.get("external", {}).get("temperature", {}).get("value")
+            H_e = ch.get("external", {}).get("humidity", {}).get("value")
+            vpd_i = ch.get("vpd_internal", {}).get("value")
+            vpd_e = ch.get("vpd_external", {}).get("value")
+
+            # Offline-Kanal ohne jede Information → keine Zeile
+            if skip_empty and not ch.get("alive") and not ch.get("raw") and T_i is None and H_i is None:
+                continue
+
+            rows.append([
+                frame.get("timestamp"),
+                frame.get("device_id"),
+                frame.get("name"),
+                channel,
+                ch.get("alive"),
+                ch.get("status"),
+                ch.get("packet_counter"),
+                ch.get("raw"),
+
+                T_i,
+                H_i,
+
+                T_e,
+                H_e,
+
+                vpd_i,
+                vpd_e,
+
+                frame.get("health", {}).get("signal", {}).get("rssi")
+            ])
+
+    if change_mode:
+        rows = _change_filter(cfg).filter(rows)
 
-                    frame.get("health", {}).get("signal", {}).get("rssi")
-                ])
+    if rows:
+        for sink in _history():
+            sink.write_rows(rows)
 
 class DecoderThread(threading.Thread):
+    """
+    Event-getrieben: wacht auf, sobald ble_dump.json neu geschrieben wurde.
+    interval bleibt als Obergrenze für den Leerlauf-Tick (Stale-Timeouts).
+    """
     def __init__(self, interval=1.0):
         super().__init__(daemon=True)
         self.running = True
         self.interval = interval
+        self.watcher = None
 
     def run(self):
+        if transport.is_active():
+            print("[Decoder] Trigger: memory ring")
+        else:
+            try:
+                self.watcher = FileWatcher(RAW_FILE)
+                print(f"[Decoder] Trigger: {self.watcher.backend}")
+            except Exception as e:
+                print("[Decoder] FileWatcher failed → fixed interval:", e)
+
         while self.running:
             step_decode()
-            time.sleep(self.interval)
+            # Flush-Frist gilt auch für Schritte ohne Zeilen (alle offline, change-Modus)
+            for sink in _HISTORY or ():
+                sink.maybe_flush()
+            if transport.is_active():
+                transport.RAW_RING.wait(self.interval)
+            elif self.watcher:
+                self.watcher.wait(self.interval)
+            else:
+                time.sleep(self.interval)
+
+        if self.watcher:
+            self.watcher.close()
+        for sink in _HISTORY or ():
+            sink.close()
+        history_store.get_store().close()
 
     def stop(self):
         self.running = False
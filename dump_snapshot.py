@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dump_snapshot.py – EIN Parse von ble_dump.json für alle Konsumenten
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+Decoder, Watchdog, Setup-Screen und Desktop-GATT-UI lesen dieselbe Datei.
+get_snapshot() parst sie nur einmal pro Dateiversion (mtime_ns/size/inode)
+und liefert allen dieselbe unveränderliche Sicht:
+
+    snap = get_snapshot()
+    snap.entries          # tuple der Einträge (read-only Mappings)
+    snap.get(mac)         # O(1) Lookup per MAC
+
+Im memory-Transport (transport.py) publiziert der Decoder seinen
+In-Memory-Stand per publish() – get_snapshot() auf den Standard-Dump
+liefert dann diesen statt der (nur periodischen) Datei.
+"""
+
+import os
+import json
+import threading
+from types import MappingProxyType
+
+import config
+from file_watch import file_sig
+
+
+def default_path():
+    return os.path.join(config.DATA, "ble_dump.json")
+
+
+class DumpSnapshot:
+    """Unveränderliche, MAC-indizierte Sicht auf eine Dump-Version."""
+
+    __slots__ = ("sig", "entries", "by_mac", "valid")
+
+    def __init__(self, sig, data):
+        self.sig = sig
+        self.valid = isinstance(data, list)
+
+        entries = []
+        by_mac = {}
+        if self.valid:
+            for e in data:
+                if not isinstance(e, dict):
+                    continue
+                e = MappingProxyType(e)
+                entries.append(e)
+                mac = e.get("address")
+                if mac:
+                    by_mac[mac] = e
+
+        self.entries = tuple(entries)
+        self.by_mac = MappingProxyType(by_mac)
+
+    def get(self, mac):
+        return self.by_mac.get(mac)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return self.valid and bool(self.entries)
+
+
+_EMPTY = DumpSnapshot(None, None)
+
+_lock = threading.Lock()
+_cache = {}          # path -> DumpSnapshot
+_memory = None       # DumpSnapshot aus dem memory-Transport
+
+
+def publish(snap):
+    """Setzt den In-Memory-Snapshot (None = zurück auf Datei)."""
+    global _memory
+    _memory = snap
+
+
+def get_snapshot(path=None):
+    """
+    Aktueller Snapshot von ble_dump.json.
+    Fehlt die Datei oder ist sie kaputt → leerer Snapshot (valid=False).
+    """
+    path = path or default_path()
+
+    mem = _memory
+    if mem is not None and os.path.abspath(path) == os.path.abspath(default_path()):
+        return mem
+
+    sig = file_sig(path)
+
+    with _lock:
+        snap = _cache.get(path)
+        if snap is not None and sig is not None and snap.sig == sig:
+            return snap
+
+    if sig is None:
+        return _EMPTY
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        data = None
+
+    snap = DumpSnapshot(sig, data)
+
+    with _lock:
+        _cache[path] = snap
+    return snap
+
+
+def invalidate(path=None):
+    with _lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(path, None)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+file_watch.py – Datei-Änderungs-Trigger für Decoder & Co.
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+Linux/Android: inotify (über ctypes, keine Zusatz-Pakete)
+Sonst:         stat-Polling auf (mtime_ns, size, inode)
+
+Bridges schreiben per tmp-Datei + os.replace / renameTo → mehrere
+Events kurz hintereinander. wait() fasst solche Bursts zusammen
+(debounce) und kehrt erst zurück, wenn es kurz ruhig war – spätestens
+nach debounce_max (Dauer-Schreiber wie ble_dump.json jeden Tick).
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+
+# inotify-Konstanten (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT = struct.Struct("iIII")
+
+
+def file_sig(path):
+    """(mtime_ns, size, inode) oder None, wenn die Datei fehlt."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+# ------------------------------------------------------------
+# inotify
+# ------------------------------------------------------------
+class _Inotify:
+    def __init__(self, path):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+
+        self._name = os.path.basename(path).encode()
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+
+        directory = os.path.dirname(os.path.abspath(path)).encode()
+        wd = libc.inotify_add_watch(
+            self._fd, directory, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, "inotify_add_watch")
+
+    def _drain(self):
+        """Liest alle anstehenden Events → True, wenn unsere Datei betroffen ist."""
+        hit = False
+        while True:
+            try:
+                buf = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return hit
+            if not buf:
+                return hit
+
+            pos = 0
+            while pos + _EVENT.size <= len(buf):
+                _, _, _, length = _EVENT.unpack_from(buf, pos)
+                pos += _EVENT.size
+                name = buf[pos:pos + length].rstrip(b"\0")
+                pos += length
+                if name == self._name:
+                    hit = True
+
+    def wait(self, timeout, debounce, debounce_max):
+        deadline = time.monotonic() + timeout
+
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return False
+            r, _, _ = select.select([self._fd], [], [], left)
+            if r and self._drain():
+                break
+
+        # Burst abwarten: so lange weiter lesen, bis debounce lang Ruhe ist
+        # (höchstens debounce_max, sonst nie zurück bei Dauer-Events)
+        quiet_deadline = time.monotonic() + debounce_max
+        while True:
+            left = quiet_deadline - time.monotonic()
+            if left <= 0:
+                return True
+            r, _, _ = select.select([self._fd], [], [], min(debounce, left))
+            if not r:
+                return True
+            self._drain()
+
+    def close(self):
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+# ------------------------------------------------------------
+# stat-Polling (Fallback)
+# ------------------------------------------------------------
+class _StatPoller:
+    def __init__(self, path, poll_interval):
+        self._path = path
+        self._poll = poll_interval
+        self._sig = file_sig(path)
+
+    def wait(self, timeout, debounce, debounce_max):
+        deadline = time.monotonic() + timeout
+
+        while True:
+            sig = file_sig(self._path)
+            if sig != self._sig:
+                break
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return False
+            time.sleep(min(self._poll, left))
+
+        # erst zurück, wenn die Datei debounce lang stabil ist (höchstens debounce_max)
+        quiet_deadline = time.monotonic() + debounce_max
+        while True:
+            time.sleep(debounce)
+            nxt = file_sig(self._path)
+            if nxt == sig or time.monotonic() >= quiet_deadline:
+                self._sig = nxt
+                return True
+            sig = nxt
+
+    def close(self):
+        pass
+
+
+# ------------------------------------------------------------
+# PUBLIC
+# ------------------------------------------------------------
+class FileWatcher:
+    """
+    watcher = FileWatcher(path)
+    changed = watcher.wait(timeout)   # True = Datei geändert, False = Timeout
+    """
+
+    def __init__(self, path, debounce=0.05, poll_interval=0.1, debounce_max=0.5):
+        self.path = path
+        self.debounce = float(debounce)
+        self.debounce_max = max(self.debounce, float(debounce_max))
+        self.backend = "poll"
+        self._impl = None
+
+        if sys.platform.startswith("linux"):
+            try:
+                self._impl = _Inotify(path)
+                self.backend = "inotify"
+            except Exception as e:
+                print("[FileWatch] inotify nicht verfügbar → Polling:", e)
+
+        if self._impl is None:
+            self._impl = _StatPoller(path, poll_interval)
+
+    def wait(self, timeout):
+        return self._impl.wait(max(0.0, float(timeout)), self.debounce, self.debounce_max)
+
+    def close(self):
+        self._impl.close()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+frame_codec.py – kompaktes Binärformat für decoded-Frames (decoded.bin)
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+decoded.json wiederholt Einheiten pro Feld und expandiert beide Kanäle
+auch offline komplett. decoded.bin speichert dieselbe Information mit
+fester Feldreihenfolge, float32-Werten und Präsenz-Bitmasken.
+Opt-in über config "decoded_format": "binary" – Standard bleibt decoded.json.
+
+Layout (little endian), Version 2:
+
+    HEADER   "DCF" | u8 version | u8 unit ('C'/'F') | u8 flags | u16 count
+             u32 seq | f64 written_at | f64 bridge_last_seen (NaN = None)
+             str16 bridge_status
+    DEVICE   u8 flags | str16 device_id | [str16 name] | ts | [i16 rssi] | [f32 uptime]
+             ts = f64 (TS_FLOAT) oder str16
+             CHANNEL adv, CHANNEL gatt
+    CHANNEL  u8 flags | u8 value_mask | f32 × popcount(mask)
+             [i64 packet_counter] | [raw: u16 len + Bytes (hex) bzw. Text]
+
+    str16 = u16 Länge + UTF-8
+
+Nichts wird still gekürzt oder maskiert: Texte/raw über 65535 Bytes,
+packet_counter außerhalb i64, rssi außerhalb i16 oder mehr als 65535
+Frames bzw. Werte jenseits float32 → FrameFormatError (ValueError) beim Schreiben.
+
+to_json_frames() liefert exakt die verschachtelte Struktur von decoded.json
+(Werte auf 4 Nachkommastellen → float32-Rauschen fällt weg).
+
+CLI:  python frame_codec.py data/decoded.bin  > decoded.json
+"""
+
+import sys
+import math
+import json
+import struct
+
+MAGIC = b"DCF"
+VERSION = 2
+
+_HEADER = struct.Struct("<3sBcBHIdd")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_I16 = struct.Struct("<h")
+_I64 = struct.Struct("<q")
+_F32 = struct.Struct("<f")
+_F64 = struct.Struct("<d")
+_CH_HEAD = struct.Struct("<BB")
+
+# Header-Flags
+HDR_BRIDGE_ALIVE = 0x01
+
+# Device-Flags
+DEV_ALIVE = 0x01
+DEV_NAME = 0x02
+DEV_TS_FLOAT = 0x04
+DEV_TS = 0x08
+DEV_RSSI = 0x10
+DEV_UPTIME = 0x20
+
+# Kanal-Flags
+CH_ALIVE = 0x01
+CH_EXTERNAL = 0x02
+CH_COUNTER = 0x04
+CH_RAW = 0x08
+CH_RAW_TEXT = 0x10
+
+# feste Reihenfolge der Messwerte (Bit i in value_mask)
+VALUES = ("T_i", "H_i", "T_e", "H_e", "vpd_i", "vpd_e")
+
+_ROUND = 4
+
+
+class FrameFormatError(ValueError):
+    pass
+
+
+# ------------------------------------------------------------
+# WRITER
+# ------------------------------------------------------------
+def _pack(st, value, what):
+    try:
+        return st.pack(value)
+    except (struct.error, OverflowError) as e:
+        raise FrameFormatError(f"{what} out of range: {value!r}") from e
+
+
+def _bytes16(out, b, what):
+    if len(b) > 0xFFFF:
+        raise FrameFormatError(f"{what} too long: {len(b)} bytes")
+    out += _U16.pack(len(b))
+    out += b
+
+
+def _str16(out, s, what):
+    _bytes16(out, str(s).encode("utf-8"), what)
+
+
+def _channel_values(ch):
+    internal = ch.get("internal", {})
+    external = ch.get("external", {})
+    return (
+        internal.get("temperature", {}).get("value"),
+        internal.get("humidity", {}).get("value"),
+        external.get("temperature", {}).get("value"),
+        external.get("humidity", {}).get("value"),
+        ch.get("vpd_internal", {}).get("value"),
+        ch.get("vpd_external", {}).get("value"),
+    )
+
+
+def _pack_channel(out, ch):
+    ch = ch or {}
+    values = _channel_values(ch)
+
+    mask = 0
+    for i, v in enumerate(values):
+        if v is not None:
+            mask |= 1 << i
+
+    counter = ch.get("packet_counter")
+    raw = ch.get("raw")
+
+    flags = 0
+    if ch.get("alive"):
+        flags |= CH_ALIVE
+    if ch.get("external", {}).get("present"):
+        flags |= CH_EXTERNAL
+    if counter is not None:
+        flags |= CH_COUNTER
+
+    raw_bytes = None
+    if raw:
+        flags |= CH_RAW
+        try:
+            raw_bytes = bytes.fromhex(raw)
+            if raw_bytes.hex().upper() != raw:
+                raise ValueError
+        except ValueError:
+            flags |= CH_RAW_TEXT
+            raw_bytes = str(raw).encode("utf-8")
+
+    out += _CH_HEAD.pack(flags, mask)
+    for name, v in zip(VALUES, values):
+        if v is not None:
+            out += _pack(_F32, v, name)
+    if counter is not None:
+        out += _pack(_I64, int(counter), "packet_counter")
+    if raw_bytes is not None:
+        _bytes16(out, raw_bytes, "raw")
+
+
+def encode_frames(frames, unit="C", seq=0, written_at=0.0):
+    """Liste decodierter Frames (decoded.json-Struktur) → bytes."""
+    frames = frames or []
+
+    bridge_alive = True
+    bridge_status = ""
+    last_seen = None
+    if frames:
+        f0 = frames[0]
+        bridge_alive = bool(f0.get("bridge_alive", True))
+        bridge_status = f0.get("bridge_status") or ""
+        last_seen = f0.get("bridge_last_seen")
+
+    if len(frames) > 0xFFFF:
+        raise FrameFormatError(f"too many frames: {len(frames)}")
+
+    out = bytearray(_HEADER.pack(
+        MAGIC, VERSION,
+        (unit or "C")[:1].upper().encode("ascii"),
+        HDR_BRIDGE_ALIVE if bridge_alive else 0,
+        len(frames),
+        seq & 0xFFFFFFFF,
+        float(written_at),
+        math.nan if last_seen is None else float(last_seen),
+    ))
+    _str16(out, bridge_status, "bridge_status")
+
+    for f in frames:
+        name = f.get("name")
+        ts = f.get("timestamp")
+        health = f.get("health", {})
+        rssi = health.get("signal", {}).get("rssi")
+        uptime = health.get("uptime", {}).get("value")
+
+        flags = 0
+        if f.get("alive"):
+            flags |= DEV_ALIVE
+        if name is not None:
+            flags |= DEV_NAME
+        if ts is not None:
+            flags |= DEV_TS
+            if isinstance(ts, (int, float)):
+                flags |= DEV_TS_FLOAT
+        if rssi is not None:
+            flags |= DEV_RSSI
+        if uptime is not None:
+            flags |= DEV_UPTIME
+
+        out += _U8.pack(flags)
+        _str16(out, f.get("device_id") or "", "device_id")
+        if flags & DEV_NAME:
+            _str16(out, name, "name")
+        if flags & DEV_TS:
+            if flags & DEV_TS_FLOAT:
+                out += _F64.pack(ts)
+            else:
+                _str16(out, ts, "timestamp")
+        if flags & DEV_RSSI:
+            out += _pack(_I16, int(rssi), "rssi")
+        if flags & DEV_UPTIME:
+            out += _pack(_F32, uptime, "uptime")
+
+        _pack_channel(out, f.get("adv"))
+        _pack_channel(out, f.get("gatt"))
+
+    return bytes(out)
+
+
+def write_frames(path, frames, unit="C", seq=0, written_at=0.0):
+    """Atomar schreiben (tmp + os.replace) wie decoded.json."""
+    import os
+    data = encode_frames(frames, unit, seq, written_at)    # wirft vor dem Öffnen
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ------------------------------------------------------------
+# READER
+# ------------------------------------------------------------
+class _Reader:
+    __slots__ = ("buf", "pos")
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+
+    def take(self, st):
+        try:
+            v = st.unpack_from(self.buf, self.pos)
+        except struct.error as e:
+            raise FrameFormatError(f"truncated at {self.pos}") from e
+        self.pos += st.size
+        return v
+
+    def one(self, st):
+        return self.take(st)[0]
+
+    def bytes16(self):
+        n = self.one(_U16)
+        b = self.buf[self.pos:self.pos + n]
+        if len(b) != n:
+            raise FrameFormatError(f"truncated at {self.pos}")
+        self.pos += n
+        return bytes(b)
+
+    def str16(self):
+        return self.bytes16().decode("utf-8", "replace")
+
+
+def _v(x):
+    return None if x is None else round(x, _ROUND)
+
+
+def _read_channel(r, unit):
+    flags, mask = r.take(_CH_HEAD)
+
+    values = [None] * len(VALUES)
+    for i in range(len(VALUES)):
+        if mask & (1 << i):
+            values[i] = _v(r.one(_F32))
+
+    counter = r.one(_I64) if flags & CH_COUNTER else None
+
+    raw = None
+    if flags & CH_RAW:
+        b = r.bytes16()
+        raw = b.decode("utf-8", "replace") if flags & CH_RAW_TEXT else b.hex().upper()
+
+    alive = bool(flags & CH_ALIVE)
+    T_i, H_i, T_e, H_e, vpd_i, vpd_e = values
+
+    return {
+        "alive": alive,
+        "status": "active" if alive else "offline",
+        "packet_counter": counter,
+        "raw": raw,
+        "internal": {
+            "temperature": {"value": T_i, "unit": unit},
+            "humidity": {"value": H_i, "unit": "%"},
+        },
+        "external": {
+            "present": bool(flags & CH_EXTERNAL),
+            "temperature": {"value": T_e, "unit": unit},
+            "humidity": {"value": H_e, "unit": "%"},
+        },
+        "vpd_internal": {"value": vpd_i, "unit": "kPa"},
+        "vpd_external": {"value": vpd_e, "unit": "kPa"},
+    }
+
+
+def read_header(buf):
+    """→ dict mit version, unit, count, seq, written_at, bridge_*."""
+    r = _Reader(memoryview(buf))
+    return _header(r)
+
+
+def _header(r):
+    magic, version, unit, hflags, count, seq, written_at, last_seen = r.take(_HEADER)
+    if magic != MAGIC:
+        raise FrameFormatError("not a decoded.bin file")
+    if version != VERSION:
+        raise FrameFormatError(f"unsupported version {version}")
+
+    return {
+        "version": version,
+        "unit": f"°{unit.decode('ascii')}",
+        "count": count,
+        "seq": seq,
+        "written_at": written_at,
+        "bridge_alive": bool(hflags & HDR_BRIDGE_ALIVE),
+        "bridge_last_seen": None if math.isnan(last_seen) else last_seen,
+        "bridge_status": r.str16(),
+    }
+
+
+def decode_frames(buf):
+    """bytes → Liste von Frames in decoded.json-Struktur (JSON-Shim)."""
+    r = _Reader(memoryview(buf))
+    h = _header(r)
+    unit = h["unit"]
+
+    frames = []
+    for _ in range(h["count"]):
+        flags = r.one(_U8)
+        mac = r.str16()
+        name = r.str16() if flags & DEV_NAME else None
+
+        ts = None
+        if flags & DEV_TS:
+            ts = r.one(_F64) if flags & DEV_TS_FLOAT else r.str16()
+
+        rssi = r.one(_I16) if flags & DEV_RSSI else None
+        uptime = r.one(_F32) if flags & DEV_UPTIME else None
+
+        adv = _read_channel(r, unit)
+        gatt = _read_channel(r, unit)
+
+        alive = bool(flags & DEV_ALIVE)
+        frames.append({
+            "timestamp": ts,
+            "device_id": mac,
+            "name": name,
+
+            "adv": adv,
+            "gatt": gatt,
+
+            "bridge_alive": h["bridge_alive"],
+            "bridge_status": h["bridge_status"],
+            "bridge_last_seen": h["bridge_last_seen"],
+
+            "alive": alive,
+            "status": "active" if alive else "offline",
+
+            "health": {
+                "uptime": {"value": uptime, "unit": "s"},
+                "battery": {"value": None, "unit": "%", "voltage": None},
+                "signal": {"rssi": rssi, "quality": None},
+            },
+        })
+
+    return frames
+
+
+def read_frames(path):
+    with open(path, "rb") as f:
+        return decode_frames(f.read())
+
+
+def to_json_frames(path):
+    """Kompatibilitäts-Shim: decoded.bin ODER decoded.json → Frame-Liste."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return read_frames(path)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python frame_codec.py <decoded.bin> [--header]", file=sys.stderr)
+        return 2
+
+    path = argv[0]
+    if "--header" in argv:
+        with open(path, "rb") as f:
+            json.dump(read_header(f.read()), sys.stdout, indent=2)
+    else:
+        json.dump(read_frames(path), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
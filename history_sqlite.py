@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+history_sqlite.py – SQLite-Verlauf als Alternative zu log.csv
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+config "history_backend": "csv" | "sqlite" | "both"
+
+    - WAL-Modus, synchronous=NORMAL
+    - gebündelte Transaktionen (flush_interval Sekunden / flush_rows Zeilen)
+    - Index (device_id, channel, ts) → "letzte 24 h von Gerät X" ohne Scan
+
+Gleiche Schnittstelle wie history_writer.HistoryWriter (write_rows/flush/close),
+Zeilen in CSV_HEADER-Reihenfolge.
+
+CLI:
+    python history_sqlite.py import data/log.csv [data/history.db]
+    python history_sqlite.py last <device_id> [stunden] [data/history.db]
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+
+from history_writer import CSV_HEADER, iter_rows
+from timeparse import parse_ts
+
+
+DB_NAME = "history.db"
+
+# Spalten der Tabelle: ts (epoch) + alle CSV-Spalten
+COLUMNS = ["ts"] + CSV_HEADER
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    ts             REAL NOT NULL,
+    timestamp      TEXT,
+    device_id      TEXT NOT NULL,
+    name           TEXT,
+    channel        TEXT NOT NULL,
+    alive          INTEGER,
+    status         TEXT,
+    packet_counter INTEGER,
+    raw            TEXT,
+    T_i            REAL,
+    H_i            REAL,
+    T_e            REAL,
+    H_e            REAL,
+    vpd_i          REAL,
+    vpd_e          REAL,
+    rssi           INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_history_dev_ch_ts ON history (device_id, channel, ts);
+CREATE INDEX IF NOT EXISTS idx_history_ts ON history (ts);
+"""
+
+_INSERT = "INSERT INTO history ({}) VALUES ({})".format(
+    ", ".join(COLUMNS), ", ".join("?" * len(COLUMNS))
+)
+
+_ALIVE = CSV_HEADER.index("alive")
+
+
+def default_path():
+    import config
+    return os.path.join(config.DATA, DB_NAME)
+
+
+def connect(path):
+    con = sqlite3.connect(path, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.executescript(_SCHEMA)
+    return con
+
+
+def _to_bool(v):
+    if v is None or v == "":
+        return None
+    if isinstance(v, str):
+        return 1 if v == "True" else 0
+    return 1 if v else 0
+
+
+def _record(row, now=None):
+    """CSV-Zeile (Liste) → Tupel für _INSERT."""
+    ts = parse_ts(row[0]) if isinstance(row[0], str) else row[0]
+    if ts is None:
+        ts = time.time() if now is None else now
+    rec = [None if v == "" else v for v in row]
+    rec[_ALIVE] = _to_bool(rec[_ALIVE])
+    return [float(ts)] + rec
+
+
+# ------------------------------------------------------------
+# SINK (Decoder)
+# ------------------------------------------------------------
+class SQLiteHistory:
+    def __init__(self, path, flush_interval=5.0, flush_rows=200, **_ignored):
+        self.path = path
+        self.flush_interval = float(flush_interval)
+        self.flush_rows = max(1, int(flush_rows))
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._con = connect(path)
+
+    def write_rows(self, rows):
+        now = time.time()
+        with self._lock:
+            self._pending.extend(_record(r, now) for r in rows)
+            due = (
+                len(self._pending) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if due:
+                self._flush_locked()
+
+    def maybe_flush(self):
+        """Flush-Frist auch ohne neue Zeilen einhalten – der Decoder ruft das jeden Tick."""
+        with self._lock:
+            if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending or self._con is None:
+            return
+        try:
+            with self._con:                       # eine Transaktion pro Batch
+                self._con.executemany(_INSERT, self._pending)
+            self._pending.clear()
+        except sqlite3.Error as e:
+            print("[HistorySQLite] insert failed:", e)
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
+# ------------------------------------------------------------
+# IMPORT (log.csv inkl. rotierter Segmente)
+# ------------------------------------------------------------
+def import_csv(csv_path, db_path=None, batch=10000):
+    """
+    log.csv (+ Segmente) → history.db. Zeilen im schon gespeicherten
+    Zeitbereich eines Geräts/Kanals werden übersprungen → erneuter Import
+    bzw. Import nach "both"-Betrieb verdoppelt nichts.
+    """
+    db_path = db_path or default_path()
+    con = connect(db_path)
+    n = skipped = 0
+    buf = []
+    try:
+        stored = {
+            (dev, ch): (lo, hi)
+            for dev, ch, lo, hi in con.execute(
+                "SELECT device_id, channel, MIN(ts), MAX(ts) FROM history GROUP BY device_id, channel"
+            )
+        }
+        for row in iter_rows(csv_path):
+            rec = _record([row.get(c) for c in CSV_HEADER])
+            span = stored.get((rec[2], rec[4]))       # device_id, channel
+            if span is not None and span[0] <= rec[0] <= span[1]:
+                skipped += 1
+                continue
+            buf.append(rec)
+            if len(buf) >= batch:
+                with con:
+                    con.executemany(_INSERT, buf)
+                n += len(buf)
+                buf.clear()
+        if buf:
+            with con:
+                con.executemany(_INSERT, buf)
+            n += len(buf)
+    finally:
+        con.close()
+    print(f"[HistorySQLite] import: {n} rows → {db_path} ({skipped} already stored)")
+    return n
+
+
+# ------------------------------------------------------------
+# QUERIES (CSV-Viewer & Ad-hoc)
+# ------------------------------------------------------------
+def _open_ro(db_path):
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    con.row_factory = sqlite3.Row
+    return con
+
+
+def query(db_path=None, device_id=None, channel=None, t0=None, t1=None,
+          limit=None, newest_first=False):
+    """Zeilen als dicts (CSV-Spaltennamen + ts), zeitlich sortiert."""
+    where, args = [], []
+    if device_id is not None:
+        where.append("device_id = ?")
+        args.append(device_id)
+    if channel is not None:
+        where.append("channel = ?")
+        args.append(channel)
+    if t0 is not None:
+        where.append("ts >= ?")
+        args.append(float(t0))
+    if t1 is not None:
+        where.append("ts <= ?")
+        args.append(float(t1))
+
+    sql = "SELECT {} FROM history".format(", ".join(COLUMNS))
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ts DESC" if (newest_first or limit) else " ORDER BY ts"
+    if limit:
+        sql += " LIMIT ?"
+        args.append(int(limit))
+
+    con = _open_ro(db_path or default_path())
+    try:
+        rows = [dict(r) for r in con.execute(sql, args)]
+    finally:
+        con.close()
+
+    # LIMIT holt die neuesten → für die Anzeige wieder chronologisch
+    if limit and not newest_first:
+        rows.reverse()
+    return rows
+
+
+def last_hours(device_id, hours=24, channel=None, db_path=None):
+    return query(db_path, device_id, channel, t0=time.time() - hours * 3600)
+
+
+def tail(db_path=None, n=300):
+    """Die letzten n Zeilen über alle Geräte (wie das Ende von log.csv)."""
+    return query(db_path, limit=n)
+
+
+def devices(db_path=None):
+    con = _open_ro(db_path or default_path())
+    try:
+        return [r[0] for r in con.execute("SELECT DISTINCT device_id FROM history ORDER BY device_id")]
+    finally:
+        con.close()
+
+
+def channels(db_path=None):
+    """[(device_id, channel, name), ...] – für Geräte-/Kanalauswahl."""
+    con = _open_ro(db_path or default_path())
+    try:
+        return [tuple(r) for r in con.execute(
+            "SELECT device_id, channel, MAX(name) FROM history "
+            "GROUP BY device_id, channel ORDER BY device_id, channel"
+        )]
+    finally:
+        con.close()
+
+
+def as_csv_row(row):
+    """Query-Zeile → Strings wie aus csv.DictReader (für die Viewer)."""
+    out = {}
+    for c in CSV_HEADER:
+        v = row.get(c)
+        if c == "alive" and v is not None:
+            v = "True" if v else "False"
+        out[c] = "" if v is None else str(v)
+    return out
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) >= 2 and argv[0] == "import":
+        import_csv(argv[1], argv[2] if len(argv) > 2 else None)
+        return 0
+
+    if len(argv) >= 2 and argv[0] == "last":
+        hours = float(argv[2]) if len(argv) > 2 else 24
+        db = argv[3] if len(argv) > 3 else None
+        for r in last_hours(argv[1], hours, db_path=db):
+            print(",".join(as_csv_row(r).values()))
+        return 0
+
+    print(__doc__.split("CLI:")[1].rstrip(), file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,742 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+history_store.py – spaltenorientierter Verlauf pro Gerät / Kanal / Metrik
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+log.csv mischt alle Geräte und beide Kanäle, die ChartTile-Buffer sind
+nach einem Neustart weg. Der Store legt pro Serie Append-only-Segmente an:
+
+    data/history/<device>/<channel>/<metric>/<YYYYMM>.seg
+
+    Record = <d f>  (epoch float64, Wert float32) → 12 Bytes, sortiert nach Zeit
+
+Segmente sind direkt memory-mappable (numpy.memmap mit RECORD_DTYPE).
+Temperaturen werden immer in °C abgelegt – Umrechnung erst beim Anzeigen.
+
+    store = get_store()
+    ts, vals = store.query(mac, "adv", "T_i", t0, t1)
+    ts, vals = store.tail(mac, "adv", "T_i", 1200)
+
+Ohne NumPy liefern query()/tail() Listen statt Arrays.
+
+Rollups: pro Serie zusätzlich min/max/mean/count je 1 min / 15 min / 1 h / 1 Tag
+(<metric>/r<sekunden>.roll, Buckets UTC-ausgerichtet), inkrementell beim
+Anhängen gepflegt. Der offene Bucket jeder Stufe steht nach jedem Flush
+vorläufig als letzter Record in der Datei (Absturz verliert nichts); fehlende
+Stufen werden im Hintergrund aus den Rohsegmenten nachgebaut. query_auto() wählt die gröbste Stufe, die noch etwa einen
+Punkt pro Pixel liefert – Render-Kosten bleiben konstant, egal wie weit
+zurück gezoomt wird.
+"""
+
+import os
+import bisect
+import struct
+import threading
+import time
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:       # Android-Build ohne numpy → reine Python-Pfade
+    np = None
+
+import config
+from timeparse import parse_ts
+
+
+RECORD = struct.Struct("<df")
+ROLLUP = struct.Struct("<dffdI")          # Bucket-Start, min, max, Summe, Anzahl
+LEVELS = (60, 900, 3600, 86400)
+METRICS = ("T_i", "H_i", "T_e", "H_e", "vpd_i", "vpd_e", "rssi")
+CHANNELS = ("adv", "gatt")
+TEMP_METRICS = ("T_i", "T_e")
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([("t", "<f8"), ("v", "<f4")])
+    ROLLUP_DTYPE = np.dtype([("t", "<f8"), ("min", "<f4"), ("max", "<f4"),
+                             ("sum", "<f8"), ("count", "<u4")])
+else:
+    RECORD_DTYPE = None
+    ROLLUP_DTYPE = None
+
+# Dashboard-Tile → Metrik im Store
+TILE_METRICS = {
+    "temp_in": "T_i",
+    "hum_in": "H_i",
+    "vpd_in": "vpd_i",
+    "temp_ex": "T_e",
+    "hum_ex": "H_e",
+    "vpd_ex": "vpd_e",
+}
+
+
+def _safe(device_id):
+    # MAC "AA:BB:.." → "AA_BB_.." (Dateisystem); CoreBluetooth-UUIDs bleiben
+    return str(device_id).replace(":", "_").replace("/", "_")
+
+
+def _unsafe(name):
+    return name.replace("_", ":")
+
+
+def _month(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y%m")
+
+
+def _frame_values(frame, ch):
+    internal = ch.get("internal", {})
+    external = ch.get("external", {})
+    T_i = internal.get("temperature", {}).get("value")
+    T_e = external.get("temperature", {}).get("value")
+
+    # zurück nach °C, falls der Frame schon in °F ist
+    unit = internal.get("temperature", {}).get("unit") or ""
+    if unit.upper().endswith("F"):
+        T_i = None if T_i is None else (T_i - 32) * 5 / 9
+        T_e = None if T_e is None else (T_e - 32) * 5 / 9
+
+    return (
+        T_i,
+        internal.get("humidity", {}).get("value"),
+        T_e,
+        external.get("humidity", {}).get("value"),
+        ch.get("vpd_internal", {}).get("value"),
+        ch.get("vpd_external", {}).get("value"),
+        frame.get("health", {}).get("signal", {}).get("rssi"),
+    )
+
+
+# ------------------------------------------------------------
+# SEGMENT LESEN
+# ------------------------------------------------------------
+def _read_segment(path, t0=None, t1=None):
+    """Records eines Segments im Bereich [t0, t1] → (ts, vals)."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return [], []
+    n = size // RECORD.size
+    if n == 0:
+        return [], []
+
+    if np is not None:
+        mm = np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(n,))
+        ts = mm["t"]
+        lo = 0 if t0 is None else int(np.searchsorted(ts, t0, "left"))
+        hi = n if t1 is None else int(np.searchsorted(ts, t1, "right"))
+        part = np.array(mm[lo:hi])
+        del mm
+        return part["t"], part["v"].astype(np.float64)
+
+    with open(path, "rb") as f:
+        buf = f.read(n * RECORD.size)
+    recs = list(RECORD.iter_unpack(buf))
+    ts = [r[0] for r in recs]
+    lo = 0 if t0 is None else bisect.bisect_left(ts, t0)
+    hi = n if t1 is None else bisect.bisect_right(ts, t1)
+    return ts[lo:hi], [r[1] for r in recs[lo:hi]]
+
+
+def _read_tail(path, n):
+    """Die letzten n Records eines Segments."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return [], []
+    total = size // RECORD.size
+    take = min(n, total)
+    if take <= 0:
+        return [], []
+
+    with open(path, "rb") as f:
+        f.seek((total - take) * RECORD.size)
+        buf = f.read(take * RECORD.size)
+
+    if np is not None:
+        arr = np.frombuffer(buf, dtype=RECORD_DTYPE)
+        return arr["t"].copy(), arr["v"].astype(np.float64)
+
+    recs = list(RECORD.iter_unpack(buf))
+    return [r[0] for r in recs], [r[1] for r in recs]
+
+
+def _read_rollup_file(path, t0=None, t1=None):
+    """Rollup-Datei → Liste von [start, min, max, sum, count] im Bereich."""
+    try:
+        with open(path, "rb") as f:
+            buf = f.read()
+    except OSError:
+        return []
+    n = len(buf) // ROLLUP.size
+    recs = [list(r) for r in ROLLUP.iter_unpack(buf[:n * ROLLUP.size])]
+    if t0 is not None or t1 is not None:
+        starts = [r[0] for r in recs]
+        lo = 0 if t0 is None else bisect.bisect_left(starts, t0)
+        hi = n if t1 is None else bisect.bisect_right(starts, t1)
+        recs = recs[lo:hi]
+    return recs
+
+
+def _build_buckets(ts, vals, level):
+    """Rohpunkte (sortiert) → Buckets [start, min, max, sum, count]."""
+    if np is not None:
+        ts = np.asarray(ts, dtype=np.float64)
+        vals = np.asarray(vals, dtype=np.float64)
+        if len(ts) == 0:
+            return []
+        starts = np.floor(ts / level) * level
+        edges = np.flatnonzero(np.diff(starts)) + 1
+        idx = np.concatenate(([0], edges))
+        counts = np.diff(np.concatenate((idx, [len(ts)])))
+        return [
+            [float(s), float(mn), float(mx), float(sm), int(c)]
+            for s, mn, mx, sm, c in zip(
+                starts[idx],
+                np.minimum.reduceat(vals, idx),
+                np.maximum.reduceat(vals, idx),
+                np.add.reduceat(vals, idx),
+                counts,
+            )
+        ]
+
+    out = []
+    for t, v in zip(ts, vals):
+        start = (t // level) * level
+        if out and out[-1][0] == start:
+            b = out[-1]
+            b[1] = min(b[1], v)
+            b[2] = max(b[2], v)
+            b[3] += v
+            b[4] += 1
+        else:
+            out.append([start, v, v, v, 1])
+    return out
+
+
+def _combine(b, other):
+    """Bucket other in b einrechnen (gleiches Intervall)."""
+    b[1] = min(b[1], other[1])
+    b[2] = max(b[2], other[2])
+    b[3] += other[3]
+    b[4] += other[4]
+
+
+def _before(ts, vals, cut):
+    if cut is None:
+        return ts, vals
+    if np is not None:
+        keep = ts < cut
+        return ts[keep], vals[keep]
+    keep = [i for i, t in enumerate(ts) if t < cut]
+    return [ts[i] for i in keep], [vals[i] for i in keep]
+
+
+def _concat(parts):
+    if np is not None:
+        if not parts:
+            return np.empty(0), np.empty(0)
+        return (np.concatenate([p[0] for p in parts]),
+                np.concatenate([p[1] for p in parts]))
+    ts, vals = [], []
+    for a, b in parts:
+        ts.extend(a)
+        vals.extend(b)
+    return ts, vals
+
+
+# ------------------------------------------------------------
+# STORE
+# ------------------------------------------------------------
+_UNSEEN = object()
+
+
+class HistoryStore:
+    def __init__(self, root, flush_interval=5.0):
+        self.root = root
+        self.flush_interval = float(flush_interval)
+        self._lock = threading.Lock()          # nur Speicher-Strukturen, nie über Platten-I/O
+        self._flush_lock = threading.Lock()    # ein Flush zur Zeit
+        self._pending = {}        # (dev, ch, metric) -> [(t, v), ...]
+        self._writing = {}        # gerade geschriebener Flush (bis er auf der Platte steht)
+        self._open = {}           # (dev, ch, metric, level) -> offener Bucket
+        self._closed = {}         # (dev, ch, metric, level) -> fertige, noch ungeschriebene Buckets
+        self._closed_writing = {}
+        self._roll_dirty = set()  # offene Buckets, die seit dem letzten Flush wuchsen
+        self._provisional = {}    # (…, level) -> Start des vorläufig geschriebenen offenen Buckets
+        self._run_first = {}      # (dev, ch, metric) -> erster Zeitpunkt dieses Laufs
+        self._rebuilding = set()  # Stufen, die gerade im Hintergrund nachgebaut werden
+        self._last_t = {}         # (dev, ch, metric) -> zuletzt übernommener Zeitpunkt
+        self._last_flush = time.monotonic()
+        os.makedirs(root, exist_ok=True)
+
+    # --------------------------------------------------------
+    def _series_dir(self, device, channel, metric):
+        return os.path.join(self.root, _safe(device), channel, metric)
+
+    def _segments(self, device, channel, metric):
+        d = self._series_dir(device, channel, metric)
+        try:
+            names = sorted(n for n in os.listdir(d) if n.endswith(".seg"))
+        except OSError:
+            return []
+        return [os.path.join(d, n) for n in names]
+
+    def _rollup_path(self, device, channel, metric, level):
+        return os.path.join(self._series_dir(device, channel, metric), f"r{level}.roll")
+
+    # --------------------------------------------------------
+    # ROLLUPS (Aufrufer hält _lock)
+    # --------------------------------------------------------
+    def _resume_bucket(self, key, level, start):
+        """
+        Erster Punkt einer Stufe in diesem Lauf: fehlt die Rollup-Datei, wird
+        sie im Hintergrund aus den Rohsegmenten nachgebaut; gehört der letzte
+        Bucket der Datei noch zum aktuellen Intervall, wird er wieder geöffnet
+        (und abgeschnitten).
+        """
+        path = self._rollup_path(*key, level)
+        if not os.path.exists(path):
+            if self._segments(*key):
+                self._request_rebuild(key, level)
+            return None
+
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        n = size // ROLLUP.size
+        if n == 0:
+            return None
+
+        with open(path, "r+b") as f:
+            f.seek((n - 1) * ROLLUP.size)
+            last = list(ROLLUP.unpack(f.read(ROLLUP.size)))
+            if last[0] != start:
+                return None
+            f.truncate((n - 1) * ROLLUP.size)
+        return last
+
+    def _request_rebuild(self, key, level):
+        okey = key + (level,)
+        if okey in self._rebuilding:
+            return
+        self._rebuilding.add(okey)
+        threading.Thread(
+            target=self._rebuild_level, args=(key, level),
+            name="RollupRebuild", daemon=True,
+        ).start()
+
+    def _rebuild_level(self, key, level):
+        """
+        Hintergrund: Rohsegmente lesen + Buckets bauen ohne Lock (Segmente
+        sind append-only, ein parallel laufender Flush des Decoders wartet
+        nicht). Punkte ab dem ersten Live-Punkt dieses Laufs stecken schon in
+        den Live-Buckets → nur ältere zählen; der Bucket an der Grenze wird
+        zusammengeführt. Nur das Zusammenführen + Schreiben hält die Locks.
+        """
+        okey = key + (level,)
+        try:
+            with self._lock:
+                cut = self._run_first.get(key)
+            ts, vals = _concat([_read_segment(p) for p in self._segments(*key)])
+            buckets = _build_buckets(*_before(ts, vals, cut), level)
+
+            with self._flush_lock:          # Rollup-Datei steht still
+                with self._lock:
+                    if self._run_first.get(key) != cut:
+                        cut = self._run_first.get(key)
+                        buckets = _build_buckets(*_before(ts, vals, cut), level)
+                    n = self._merge_rebuilt(okey, buckets)
+            print(f"[HistoryStore] rollup r{level} rebuilt: {key} ({n})")
+        except OSError as e:
+            print("[HistoryStore] rollup rebuild failed:", key, e)
+        finally:
+            with self._lock:
+                self._rebuilding.discard(okey)
+
+    def _merge_rebuilt(self, okey, buckets):
+        """Nachgebaute Buckets vor die Live-Buckets setzen (hält _lock + _flush_lock)."""
+        path = self._rollup_path(*okey)
+        existing = _read_rollup_file(path)
+
+        if buckets:
+            last = buckets[-1]
+            target = None
+            b = self._open.get(okey)
+            if b is not None and b[0] == last[0]:
+                target = b
+                self._roll_dirty.add(okey)
+            else:
+                for rec in self._closed.get(okey, []) + existing[:1]:
+                    if rec[0] == last[0]:
+                        target = rec
+                        break
+            if target is not None:
+                _combine(target, last)
+                buckets = buckets[:-1]
+
+        if not existing:
+            self._provisional.pop(okey, None)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"".join(ROLLUP.pack(*b) for b in buckets + existing))
+        os.replace(tmp, path)
+        return len(buckets) + len(existing)
+
+    def _roll(self, key, t, v):
+        for level in LEVELS:
+            start = (t // level) * level
+            okey = key + (level,)
+            b = self._open.get(okey)
+
+            if b is None:
+                b = self._resume_bucket(key, level, start)
+
+            self._roll_dirty.add(okey)
+            if b is not None and b[0] == start:
+                b[1] = min(b[1], v)
+                b[2] = max(b[2], v)
+                b[3] += v
+                b[4] += 1
+            else:
+                if b is not None:
+                    self._closed.setdefault(okey, []).append(b)
+                b = [start, v, v, v, 1]
+            self._open[okey] = b
+
+    def _last_disk_t(self, key):
+        """Zeitpunkt des letzten Records im neuesten Segment (oder None)."""
+        segs = self._segments(*key)
+        if not segs:
+            return None
+        try:
+            with open(segs[-1], "rb") as f:
+                n = f.seek(0, os.SEEK_END) // RECORD.size
+                if n == 0:
+                    return None
+                f.seek((n - 1) * RECORD.size)
+                return RECORD.unpack(f.read(RECORD.size))[0]
+        except OSError:
+            return None
+
+    def _add(self, key, t, v):
+        # Bridge-Zeitstempel bleibt bis zur nächsten Messung stehen → derselbe
+        # Punkt käme jeden Decoder-Tick erneut; nur neuere Zeitpunkte zählen
+        last = self._last_t.get(key, _UNSEEN)
+        if last is _UNSEEN:
+            last = self._last_disk_t(key)    # Neustart: nicht den letzten Punkt erneut
+        if last is not None and t <= last:
+            return
+        self._last_t[key] = t
+        self._run_first.setdefault(key, t)
+        self._pending.setdefault(key, []).append((t, v))
+        try:
+            self._roll(key, t, v)
+        except OSError as e:
+            print("[HistoryStore] rollup failed:", key, e)
+
+    # --------------------------------------------------------
+    # WRITE
+    # --------------------------------------------------------
+    def append(self, device, channel, metric, t, value):
+        if value is None:
+            return
+        with self._lock:
+            self._add((device, channel, metric), t, float(value))
+
+    def append_frames(self, frames, now=None):
+        """Alle lebenden Kanäle eines Decoder-Ticks übernehmen (Zeit = Frame-Zeitstempel)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for frame in frames:
+                dev = frame.get("device_id")
+                if not dev:
+                    continue
+                t = parse_ts(frame.get("timestamp")) or now
+                for channel in CHANNELS:
+                    ch = frame.get(channel) or {}
+                    if not ch.get("alive"):
+                        continue
+                    for metric, v in zip(METRICS, _frame_values(frame, ch)):
+                        if v is not None:
+                            self._add((dev, channel, metric), t, float(v))
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        # Puffer unter _lock tauschen, geschrieben wird ohne _lock → Leser
+        # (UI) warten nie auf die Platte; bis der Flush steht, sehen sie die
+        # Punkte über _writing
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                closed, self._closed = self._closed, {}
+                opened = {k: list(self._open[k]) for k in self._roll_dirty if k in self._open}
+                self._roll_dirty = set()
+                self._writing = pending
+                self._closed_writing = closed
+                self._last_flush = time.monotonic()
+
+            self._write_pending(pending)
+            self._write_rollups(closed, opened)
+
+            with self._lock:
+                self._writing = {}
+                self._closed_writing = {}
+
+    def _write_rollups(self, closed, opened):
+        """
+        Fertige Buckets anhängen + offenen Bucket vorläufig als letzten Record;
+        der vorläufige Record des letzten Flushs wird vorher abgeschnitten.
+        """
+        for okey in set(closed) | set(opened):
+            recs = list(closed.get(okey, ()))
+            if okey in opened:
+                recs.append(opened[okey])
+            path = self._rollup_path(*okey)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "a+b") as f:
+                    size = f.seek(0, os.SEEK_END)
+                    prov = self._provisional.pop(okey, None)
+                    if prov is not None and size >= ROLLUP.size:
+                        f.seek(size - ROLLUP.size)
+                        if ROLLUP.unpack(f.read(ROLLUP.size))[0] == prov:
+                            f.truncate(size - ROLLUP.size)
+                    f.write(b"".join(ROLLUP.pack(*b) for b in recs))
+                if okey in opened:
+                    self._provisional[okey] = opened[okey][0]
+            except OSError as e:
+                print("[HistoryStore] rollup write failed:", path, e)
+
+    def _write_pending(self, pending):
+        for (dev, channel, metric), recs in pending.items():
+            d = self._series_dir(dev, channel, metric)
+            try:
+                os.makedirs(d, exist_ok=True)
+                # pro Monat ein Segment (Records können über die Grenze laufen)
+                by_month = {}
+                for t, v in recs:
+                    by_month.setdefault(_month(t), []).append(RECORD.pack(t, v))
+                for month, chunks in by_month.items():
+                    with open(os.path.join(d, month + ".seg"), "ab") as f:
+                        f.write(b"".join(chunks))
+            except OSError as e:
+                print("[HistoryStore] write failed:", d, e)
+
+    def close(self):
+        """Flush – offene Buckets stehen danach in der Datei (beim nächsten Start wieder geöffnet)."""
+        self.flush()
+        with self._flush_lock:
+            with self._lock:
+                self._open = {}
+                self._provisional = {}
+
+    # --------------------------------------------------------
+    # READ
+    # --------------------------------------------------------
+    def _pending_part(self, device, channel, metric, t0=None, t1=None):
+        """Noch nicht (fertig) geschriebene Punkte – VOR den Segmenten lesen."""
+        key = (device, channel, metric)
+        with self._lock:
+            recs = list(self._writing.get(key, ())) + list(self._pending.get(key, ()))
+        recs = [r for r in recs if (t0 is None or r[0] >= t0) and (t1 is None or r[0] <= t1)]
+        ts = [r[0] for r in recs]
+        vals = [r[1] for r in recs]
+        if np is not None:
+            return np.asarray(ts, dtype=np.float64), np.asarray(vals, dtype=np.float64)
+        return ts, vals
+
+    @staticmethod
+    def _after(part, parts):
+        """
+        Speicher-Punkte ohne die, die ein paralleler Flush inzwischen schon
+        ins Segment geschrieben hat (Zeitstempel ≤ letzter gelesener).
+        """
+        last = None
+        for ts, _ in parts:
+            if len(ts):
+                last = ts[-1] if last is None else max(last, ts[-1])
+        if last is None:
+            return part
+        ts, vals = part
+        if np is not None:
+            keep = ts > last
+            return ts[keep], vals[keep]
+        keep = [i for i, t in enumerate(ts) if t > last]
+        return [ts[i] for i in keep], [vals[i] for i in keep]
+
+    def query(self, device, channel, metric, t0=None, t1=None):
+        """Alle Punkte der Serie in [t0, t1] (None = offen) → (ts, vals)."""
+        pend = self._pending_part(device, channel, metric, t0, t1)
+        parts = []
+        lo_month = None if t0 is None else _month(t0)
+        hi_month = None if t1 is None else _month(t1)
+
+        for path in self._segments(device, channel, metric):
+            month = os.path.basename(path)[:-4]
+            if lo_month and month < lo_month:
+                continue
+            if hi_month and month > hi_month:
+                continue
+            parts.append(_read_segment(path, t0, t1))
+
+        parts.append(self._after(pend, parts))
+        return _concat(parts)
+
+    def tail(self, device, channel, metric, n):
+        """Die letzten n Punkte der Serie (neueste Segmente zuerst gelesen)."""
+        pend = self._pending_part(device, channel, metric)
+        parts = []
+        have = len(pend[0])
+
+        for path in reversed(self._segments(device, channel, metric)):
+            if have >= n:
+                break
+            part = _read_tail(path, n - have)
+            parts.append(part)
+            have += len(part[0])
+
+        parts.reverse()
+        parts.append(self._after(pend, parts))
+        ts, vals = _concat(parts)
+        return ts[-n:], vals[-n:]
+
+    def tail_all(self, metric, n):
+        """Letzte n Punkte einer Metrik über alle Geräte/Kanäle, zeitlich gemischt."""
+        parts = [self.tail(d, c, m, n) for d, c, m in self.series() if m == metric]
+        if not parts:
+            return _concat([])
+
+        if np is not None:
+            ts, vals = _concat(parts)
+            order = np.argsort(ts, kind="stable")
+            return ts[order][-n:], vals[order][-n:]
+
+        pairs = sorted(p for part in parts for p in zip(*part))
+        pairs = pairs[-n:]
+        return [p[0] for p in pairs], [p[1] for p in pairs]
+
+    def query_rollup(self, device, channel, metric, level, t0=None, t1=None):
+        """
+        Buckets einer Stufe in [t0, t1] →
+        {"t", "min", "max", "mean", "count"} (Arrays mit numpy, sonst Listen).
+        """
+        key = (device, channel, metric)
+        okey = key + (level,)
+        path = self._rollup_path(device, channel, metric, level)
+
+        with self._lock:
+            extra = [list(b) for b in self._closed_writing.get(okey, ())]
+            extra += [list(b) for b in self._closed.get(okey, ())]
+            b = self._open.get(okey)
+            if b is not None:
+                extra.append(list(b))
+            if not os.path.exists(path) and self._segments(*key):
+                # Stufe fehlt → Hintergrund; bis dahin nur die Speicher-Buckets
+                self._request_rebuild(key, level)
+
+        recs = _read_rollup_file(path, t0, t1)
+        # Speicher-Buckets ersetzen gleichnamige aus der Datei (paralleler Flush)
+        starts = {r[0] for r in extra}
+        recs = [r for r in recs if r[0] not in starts]
+        recs.extend(r for r in extra
+                    if (t0 is None or r[0] >= t0) and (t1 is None or r[0] <= t1))
+
+        out = {
+            "t": [r[0] for r in recs],
+            "min": [r[1] for r in recs],
+            "max": [r[2] for r in recs],
+            "mean": [r[3] / r[4] if r[4] else None for r in recs],
+            "count": [r[4] for r in recs],
+        }
+        if np is not None:
+            out = {k: np.asarray(v, dtype=np.float64) for k, v in out.items()}
+        return out
+
+    def query_auto(self, device, channel, metric, t0, t1, pixels):
+        """
+        Gröbste Stufe mit noch ≥ pixels Buckets im Bereich; reicht keine,
+        Rohdaten (auf ~2 Punkte pro Pixel ausgedünnt). Ergebnis wie
+        query_rollup() plus "level" (0 = roh).
+        """
+        pixels = max(1, int(pixels))
+        span = max(0.0, float(t1) - float(t0))
+
+        level = 0
+        for L in LEVELS:
+            if span / L >= pixels:
+                level = L
+
+        if level:
+            out = self.query_rollup(device, channel, metric, level, t0, t1)
+            out["level"] = level
+            return out
+
+        ts, vals = self.query(device, channel, metric, t0, t1)
+        step = max(1, len(ts) // (2 * pixels))
+        ts, vals = ts[::step], vals[::step]
+        ones = [1] * len(ts)
+        if np is not None:
+            ones = np.ones(len(ts))
+        return {"t": ts, "min": vals, "max": vals, "mean": vals, "count": ones, "level": 0}
+
+    def latest(self, device, channel, metric):
+        ts, vals = self.tail(device, channel, metric, 1)
+        if len(ts) == 0:
+            return None
+        return float(ts[-1]), float(vals[-1])
+
+    def devices(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            names = []
+        with self._lock:
+            pending = {k[0] for k in self._pending} | {k[0] for k in self._writing}
+        return sorted({_unsafe(n) for n in names} | pending)
+
+    def series(self, device=None):
+        """[(device, channel, metric), ...] mit vorhandenen Daten."""
+        out = set()
+        for dev in ([device] if device else self.devices()):
+            base = os.path.join(self.root, _safe(dev))
+            for channel in CHANNELS:
+                for metric in METRICS:
+                    if os.path.isdir(os.path.join(base, channel, metric)):
+                        out.add((dev, channel, metric))
+        with self._lock:
+            for src in (self._pending, self._writing):
+                out.update(k for k in src if device is None or k[0] == device)
+        return sorted(out)
+
+
+# ------------------------------------------------------------
+# SINGLETON
+# ------------------------------------------------------------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore(
+                os.path.join(config.DATA, "history"),
+                flush_interval=config.get_history_settings()["flush_interval"],
+            )
+        return _store
+
+
+def display_values(metric, vals):
+    """°C aus dem Store → aktuelle Anzeige-Einheit (nur Temperaturen)."""
+    if metric not in TEMP_METRICS or config.get_temperature_unit() != "F":
+        return vals
+    if np is not None and isinstance(vals, np.ndarray):
+        return vals * 9 / 5 + 32
+    return [v * 9 / 5 + 32 for v in vals]
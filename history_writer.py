@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+history_writer.py – gepufferter, rotierender Verlauf (log.csv)
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+Statt log.csv jeden Tick neu im Append-Modus zu öffnen:
+
+    - EIN offenes Handle, Zeilen werden gesammelt
+    - Flush alle flush_interval Sekunden ODER flush_rows Zeilen
+    - fsync-Politik: "never" | "flush" | "rotate"
+    - Rotation: "daily" | "size" | "none"
+    - geschlossene Segmente werden im Hintergrund gzip-komprimiert
+
+Dateien im data/-Ordner:
+
+    log.csv                          aktives Segment
+    log-20251229-000000.csv.gz       geschlossene Segmente (chronologisch sortierbar)
+    log-20251229-000000.csv.rows     Zeilenzahl des Segments (beim Komprimieren gezählt)
+
+Lesen (CSV-Viewer & Co.):  history_files(), open_text(), iter_rows(), tail_rows()
+                           tail_file_rows() / CsvFollower – rückwärts bzw. nur Neues
+
+Zum aktiven Segment pflegt der Writer nach jedem Flush den Zeitindex
+log.csv.idx (csv_index.py, im Hintergrund-Thread; nur der Writer schreibt
+ihn) – Viewer springen damit direkt in einen Zeitbereich.
+
+Change-Modus (config history_mode = "change"):
+ChangeFilter lässt nur Zeilen durch, deren Werte sich um mehr als epsilon
+bzw. deren Status sich geändert hat, plus Heartbeat-Zeilen. Offline-Phasen
+werden zu EINER "offline seit"-Zeile zusammengefasst. iter_steps()
+rekonstruiert daraus die Stufenfunktion (Wert gilt bis zur nächsten Zeile).
+"""
+
+import os
+import io
+import csv
+import glob
+import gzip
+import time
+import threading
+from datetime import datetime
+
+from timeparse import parse_ts
+
+
+CSV_HEADER = [
+    "timestamp",
+    "device_id",
+    "name",
+    "channel",
+    "alive",
+    "status",
+    "packet_counter",
+    "raw",
+    "T_i",
+    "H_i",
+    "T_e",
+    "H_e",
+    "vpd_i",
+    "vpd_e",
+    "rssi",
+]
+
+FSYNC_POLICIES = ("never", "flush", "rotate")
+ROTATE_MODES = ("daily", "size", "none")
+
+_COL = {name: i for i, name in enumerate(CSV_HEADER)}
+VALUE_COLUMNS = ("T_i", "H_i", "T_e", "H_e", "vpd_i", "vpd_e")
+
+
+def _day(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y%m%d")
+
+
+# ------------------------------------------------------------
+# WRITER
+# ------------------------------------------------------------
+class HistoryWriter:
+    def __init__(self, path, header=CSV_HEADER,
+                 flush_interval=5.0, flush_rows=200,
+                 fsync="rotate", rotate="daily", max_bytes=50 * 1024 * 1024,
+                 compress=True, index_rows=1000):
+        self.path = path
+        self.header = list(header)
+        self.flush_interval = float(flush_interval)
+        self.flush_rows = max(1, int(flush_rows))
+        self.fsync = fsync if fsync in FSYNC_POLICIES else "rotate"
+        self.rotate = rotate if rotate in ROTATE_MODES else "daily"
+        self.max_bytes = int(max_bytes)
+        self.compress = bool(compress)
+        self.index_rows = max(0, int(index_rows))
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._fh = None
+        self._writer = None
+        self._opened_day = None
+        self._index = None
+        self._indexer = None          # Thread für CsvIndex.update()
+        self._has_rows = False
+        self._last_flush = time.monotonic()
+
+        # Reste aus einem früheren Lauf nachkomprimieren
+        if self.compress:
+            for seg in glob.glob(self._segment_glob("csv")):
+                self._compress_async(seg)
+
+    # --------------------------------------------------------
+    def _segment_glob(self, ext):
+        stem, _ = os.path.splitext(self.path)
+        return f"{stem}-*.{ext}"
+
+    def _open(self):
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+        # daily: Datei von gestern beim Start gleich wegrotieren
+        if exists and self.rotate == "daily":
+            if _day(os.path.getmtime(self.path)) != _day(time.time()):
+                self._rotate_file()
+                exists = False
+
+        self._fh = open(self.path, "a", newline="", encoding="utf-8", buffering=64 * 1024)
+        self._writer = csv.writer(self._fh)
+        self._opened_day = _day(time.time())
+
+        # Header nur einmal schreiben
+        if not exists:
+            self._writer.writerow(self.header)
+        # nur Header → nie rotieren (sonst leere Segmente bei großen Batches)
+        self._has_rows = exists
+
+    def _close_handle(self, sync):
+        if not self._fh:
+            return
+        try:
+            self._fh.flush()
+            if sync:
+                os.fsync(self._fh.fileno())
+        finally:
+            self._fh.close()
+            self._fh = None
+            self._writer = None
+
+    def _rotate_file(self):
+        """Aktives Segment umbenennen (Handle muss zu sein)."""
+        stamp = datetime.fromtimestamp(os.path.getmtime(self.path)).strftime("%Y%m%d-%H%M%S")
+        stem, ext = os.path.splitext(self.path)
+        target = f"{stem}-{stamp}{ext}"
+        n = 1
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            target = f"{stem}-{stamp}-{n}{ext}"
+            n += 1
+
+        # Index wandert mit dem Segment (bis zur Kompression → Viewer zählt nicht neu)
+        self._stop_indexer()
+
+        os.replace(self.path, target)
+        print(f"[History] rotated → {os.path.basename(target)}")
+
+        try:
+            os.replace(self.path + ".idx", target + ".idx")
+        except OSError:
+            pass
+
+        if self.compress:
+            self._compress_async(target)
+
+    def _needs_rotation(self, incoming=0):
+        """Vor dem Anhängen von incoming Bytes prüfen → Segment bleibt unter max_bytes."""
+        if not self._has_rows:
+            return False
+        if self.rotate == "daily":
+            return _day(time.time()) != self._opened_day
+        if self.rotate == "size":
+            return self._fh.tell() + incoming > self.max_bytes
+        return False
+
+    # --------------------------------------------------------
+    # PUBLIC
+    # --------------------------------------------------------
+    def write_rows(self, rows):
+        """Zeilen puffern; Flush nach Zeit/Anzahl."""
+        with self._lock:
+            self._pending.extend(rows)
+            due = (
+                len(self._pending) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if due:
+                self._flush_locked()
+
+    def maybe_flush(self):
+        """Flush-Frist auch ohne neue Zeilen einhalten – der Decoder ruft das jeden Tick."""
+        with self._lock:
+            if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+
+        if self._fh is None:
+            self._open()
+
+        buf = io.StringIO(newline="")
+        csv.writer(buf).writerows(self._pending)
+        data = buf.getvalue()
+        self._pending.clear()
+
+        # erst rotieren, dann anhängen
+        if self._needs_rotation(len(data.encode("utf-8"))):
+            self._close_handle(sync=self.fsync != "never")
+            self._rotate_file()
+            self._open()
+
+        self._fh.write(data)
+        self._has_rows = True
+        self._fh.flush()
+
+        if self.fsync == "flush":
+            os.fsync(self._fh.fileno())
+
+        self._update_index()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._close_handle(sync=self.fsync != "never")
+
+    def _update_index(self):
+        """
+        Index im Hintergrund nachziehen – der erste Aufbau auf einem großen
+        log.csv blockiert so nie den Decoder. Läuft er noch, holt der nächste
+        Flush den Rest.
+        """
+        if not self.index_rows:
+            return
+        if self._indexer is not None and self._indexer.is_alive():
+            return
+        if self._index is None:
+            from csv_index import CsvIndex
+            self._index = CsvIndex(self.path, self.index_rows, persist=True)
+        index = self._index
+
+        def run():
+            try:
+                index.update()
+            except Exception as e:
+                print("[History] index update failed:", e)
+                if self._index is index:
+                    self._index = None
+
+        self._indexer = threading.Thread(target=run, name="CsvIndexer", daemon=True)
+        self._indexer.start()
+
+    def _stop_indexer(self):
+        if self._index is not None:
+            self._index.cancelled = True
+        if self._indexer is not None:
+            self._indexer.join()
+        self._index = None
+        self._indexer = None
+
+    # --------------------------------------------------------
+    # GZIP (Hintergrund)
+    # --------------------------------------------------------
+    def _compress_async(self, path):
+        threading.Thread(target=compress_segment, args=(path,), daemon=True).start()
+
+
+def compress_segment(path):
+    """
+    path → path.gz (atomar), Original + Index werden danach gelöscht.
+    Die Zeilenzahl fällt beim Kopieren ab → path.rows (segment_rows()).
+    """
+    tmp = path + ".gz.tmp"
+    try:
+        lines = 0
+        with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            while True:
+                chunk = src.read(256 * 1024)
+                if not chunk:
+                    break
+                lines += chunk.count(b"\n")
+                dst.write(chunk)
+        # erst die Zeilenzahl, dann das Archiv → zu jedem .gz gibt es .rows
+        _write_rows(path, max(0, lines - 1))
+        os.replace(tmp, path + ".gz")
+        os.remove(path)
+        try:
+            os.remove(path + ".idx")
+        except OSError:
+            pass
+    except Exception as e:
+        print("[History] gzip failed:", path, e)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _rows_path(path):
+    """log-….csv(.gz) → log-….csv.rows"""
+    return (path[:-3] if path.endswith(".gz") else path) + ".rows"
+
+
+def _write_rows(path, rows):
+    tmp = _rows_path(path) + ".tmp"
+    with open(tmp, "w", encoding="ascii") as f:
+        f.write(f"{rows}\n")
+    os.replace(tmp, _rows_path(path))
+
+
+def segment_rows(path):
+    """Datenzeilen eines gzip-Segments (bei der Kompression gezählt) oder None."""
+    try:
+        with open(_rows_path(path), encoding="ascii") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+# ------------------------------------------------------------
+# READER
+# ------------------------------------------------------------
+def _segment_key(stem, path):
+    """log-20251229-170338-2.csv → (0, (20251229, 170338, 2)) für die Sortierung."""
+    name = os.path.splitext(path)[0][len(stem) + 1:]
+    try:
+        parts = tuple(int(x) for x in name.split("-"))
+    except ValueError:
+        return (1, (), name)
+    return (0, parts + (0,) * (3 - len(parts)), "")
+
+
+def history_files(path):
+    """
+    Chronologische Liste der Dateien hinter path.
+    Aktives log.csv → alle geschlossenen Segmente + aktives Segment.
+    Einzelnes Segment → nur dieses.
+    """
+    stem, ext = os.path.splitext(path)
+    if ext != ".csv" or os.path.basename(stem).count("-"):
+        return [path]
+
+    segs = {}
+    for p in glob.glob(f"{stem}-*{ext}") + glob.glob(f"{stem}-*{ext}.gz"):
+        key = p[:-3] if p.endswith(".gz") else p
+        # während der Kompression existieren beide → .gz bevorzugen
+        if key not in segs or p.endswith(".gz"):
+            segs[key] = p
+
+    out = [segs[k] for k in sorted(segs, key=lambda k: _segment_key(stem, k))]
+    if os.path.exists(path):
+        out.append(path)
+    return out
+
+
+def open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return open(path, "r", newline="", encoding="utf-8")
+
+
+def iter_rows(path):
+    """DictReader über alle Segmente (Header je Datei)."""
+    for p in history_files(path):
+        try:
+            with open_text(p) as f:
+                yield from csv.DictReader(f)
+        except (OSError, EOFError) as e:
+            print("[History] read failed:", p, e)
+
+
+def reverse_lines(path, stop=0, chunk_size=64 * 1024):
+    """
+    Zeilen (bytes, ohne Umbruch) von EOF rückwärts bis Offset stop.
+    Eine angefangene letzte Zeile (Writer schreibt gerade) wird übersprungen.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        rest = b""
+        trailing = True
+        while pos > stop:
+            n = min(chunk_size, pos - stop)
+            pos -= n
+            f.seek(pos)
+            parts = (f.read(n) + rest).split(b"\n")
+            rest = parts[0]
+            lines = parts[1:]
+            if trailing and lines:
+                lines.pop()          # hinter dem letzten \n: "" oder angefangen
+                trailing = False
+            for line in reversed(lines):
+                if line:
+                    yield line.rstrip(b"\r")
+        if rest and not trailing:
+            yield rest.rstrip(b"\r")
+
+
+def _parse_lines(header, lines):
+    text = b"\n".join([header.rstrip(b"\r\n")] + lines).decode("utf-8", "replace")
+    return list(csv.DictReader(io.StringIO(text, newline="")))
+
+
+def tail_file_rows(path, n, chunk_size=64 * 1024):
+    """Die letzten n Zeilen EINER unkomprimierten CSV – liest blockweise vom Ende."""
+    with open(path, "rb") as f:
+        header = f.readline()
+    if not header.endswith(b"\n"):
+        return []
+
+    lines = []
+    for line in reverse_lines(path, len(header), chunk_size):
+        lines.append(line)
+        if n and len(lines) >= n:
+            break
+    lines.reverse()
+    return _parse_lines(header, lines)
+
+
+class CsvFollower:
+    """
+    Live-Follow: liest nur die seit dem letzten Aufruf angehängten Bytes.
+    Neue/rotierte Datei (kleiner als der Offset) → von vorne.
+    """
+
+    def __init__(self, path, from_end=True):
+        self.path = path
+        self.header = b""
+        self.offset = 0
+        if from_end:
+            self._sync_end()
+
+    def _sync_end(self):
+        try:
+            with open(self.path, "rb") as f:
+                self.header = f.readline()
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size <= len(self.header):
+                    self.offset = len(self.header)
+                    return
+                # auf den Anfang einer evtl. angefangenen letzten Zeile
+                f.seek(max(len(self.header), size - 64 * 1024))
+                tail = f.read()
+                self.offset = size - len(tail) + tail.rfind(b"\n") + 1
+        except OSError:
+            self.header, self.offset = b"", 0
+
+    def read_new(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset or not self.header:
+            self.header, self.offset = b"", 0
+
+        with open(self.path, "rb") as f:
+            if not self.header:
+                self.header = f.readline()
+                if not self.header.endswith(b"\n"):
+                    self.header = b""
+                    return []
+                self.offset = len(self.header)
+            f.seek(self.offset)
+            data = f.read()
+
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return []
+        self.offset += end
+        return _parse_lines(self.header, data[:end].splitlines())
+
+
+def tail_rows(path, n):
+    """Die letzten n Zeilen – liest nur so viele Segmente wie nötig (neueste zuerst)."""
+    chunks = []
+    count = 0
+    for p in reversed(history_files(path)):
+        try:
+            if p.endswith(".gz"):
+                with open_text(p) as f:
+                    rows = list(csv.DictReader(f))
+            else:
+                # unkomprimiert → nur das Dateiende lesen
+                rows = tail_file_rows(p, n - count if n else 0)
+        except (OSError, EOFError) as e:
+            print("[History] read failed:", p, e)
+            continue
+        chunks.append(rows)
+        count += len(rows)
+        if n and count >= n:
+            break
+
+    out = []
+    for rows in reversed(chunks):
+        out.extend(rows)
+    return out[-n:] if n else out
+
+
+# ------------------------------------------------------------
+# CHANGE-BASED LOGGING
+# ------------------------------------------------------------
+class ChangeFilter:
+    """
+    rows (Listen in CSV_HEADER-Reihenfolge) → nur relevante Zeilen.
+
+    Geschrieben wird, wenn
+      - der Kanal zum ersten Mal auftaucht,
+      - alive/status wechselt,
+      - ein Messwert um mehr als epsilon vom zuletzt GESCHRIEBENEN abweicht
+        (oder zwischen None und Wert wechselt),
+      - seit der letzten Zeile heartbeat Sekunden vergangen sind (nur online).
+    Offline-Läufe ergeben genau eine Zeile (Beginn der Offline-Phase).
+    """
+
+    def __init__(self, epsilon=0.05, heartbeat=300.0):
+        self.epsilon = float(epsilon)
+        self.heartbeat = float(heartbeat)
+        self._last = {}      # (device_id, channel) -> (state, values, t_written)
+        self._idx = [_COL[c] for c in VALUE_COLUMNS]
+
+    def _changed(self, old, new):
+        for a, b in zip(old, new):
+            if (a is None) != (b is None):
+                return True
+            if a is not None and abs(a - b) > self.epsilon:
+                return True
+        return False
+
+    def filter(self, rows, now=None):
+        now = time.time() if now is None else now
+        out = []
+
+        for row in rows:
+            key = (row[_COL["device_id"]], row[_COL["channel"]])
+            alive = bool(row[_COL["alive"]])
+            state = (alive, row[_COL["status"]])
+            values = tuple(row[i] for i in self._idx)
+
+            last = self._last.get(key)
+            if last is None or last[0] != state:
+                write = True
+            elif not alive:
+                # offline bleibt offline → Lauf schon protokolliert
+                write = False
+            else:
+                write = (
+                    self._changed(last[1], values)
+                    or now - last[2] >= self.heartbeat
+                )
+
+            if write:
+                self._last[key] = (state, values, now)
+                out.append(row)
+
+        return out
+
+    def forget(self, device_id):
+        for key in [k for k in self._last if k[0] == device_id]:
+            del self._last[key]
+
+
+def iter_steps(path, heartbeat=None):
+    """
+    Stufenfunktion aus einem (change-basierten) Log:
+    yield {"device_id", "channel", "start", "end", "row"}
+
+    Ein Wert gilt von seiner Zeile bis zur nächsten Zeile desselben Kanals.
+    Mit heartbeat: online-Stufen enden spätestens nach 1.5 × heartbeat
+    (Lücke = Logger lief nicht). Die letzte Stufe je Kanal hat end=None.
+    """
+    max_gap = None if heartbeat is None else 1.5 * float(heartbeat)
+    open_steps = {}
+
+    def close(step, t_next):
+        end = t_next
+        if max_gap is not None and step["row"].get("alive") == "True":
+            if end is None or end - step["start"] > max_gap:
+                end = step["start"] + max_gap if end is not None else None
+        step["end"] = end
+        return step
+
+    for row in iter_rows(path):
+        t = parse_ts(row.get("timestamp"))
+        if t is None:
+            continue
+        key = (row.get("device_id"), row.get("channel"))
+
+        prev = open_steps.get(key)
+        if prev is not None:
+            yield close(prev, t)
+
+        open_steps[key] = {
+            "device_id": key[0],
+            "channel": key[1],
+            "start": t,
+            "end": None,
+            "row": row,
+        }
+
+    for step in open_steps.values():
+        yield close(step, None)
@@ -16,6 +16,7 @@ from dashboard_gui.dashboard import DashboardScreen
 from dashboard_gui.setup_screen import SetupScreen
 from dashboard_gui.debug_screen import DebugScreen
 from dashboard_gui.data_buffer import BUFFER
+from dashboard_gui.global_state_manager import GLOBAL_STATE
 from dashboard_gui.ui.fullscreen_content.fullscreen_view import FullScreenView
 from dashboard_gui.ui.scaling_utils import UI_SCALE
 from dashboard_gui.ui.common.device_picker import DevicePickerScreen
@@ -80,9 +81,20 @@ class DashboardApp(App):
     # Core starten nach UI-Init
     def on_start(self):
         core.start()
+        # Frames ab jetzt im Hintergrund laden (UI liest nur Snapshots)
+        GLOBAL_STATE.start_frame_loader()
+
+    # Android: App im Hintergrund / Display aus → UI-Tick komplett aus
+    def on_pause(self):
+        GLOBAL_STATE.suspend()
+        return True
+
+    def on_resume(self):
+        GLOBAL_STATE.resume()
 
     # Core sauber stoppen
     def on_stop(self):
+        GLOBAL_STATE.stop_frame_loader()
         core.stop()
 
 
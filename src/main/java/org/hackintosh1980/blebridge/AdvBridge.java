@@ -16,9 +16,11 @@ import java.io.FileInputStream;
 import java.io.FileOutputStream;
 import java.text.SimpleDateFormat;
 import java.util.Date;
+import java.util.LinkedHashSet;
 import java.util.Locale;
 import java.util.Map;
 import java.util.HashMap;
+import java.util.Set;
 import java.util.TimeZone;
 import java.util.UUID;
 
@@ -38,6 +40,11 @@ public class AdvBridge {
     private static final Object lock = new Object();
     private static final Map<String, JSONObject> last = new HashMap<>();
 
+    // In-Memory-Transport: MACs mit neuen Daten seit dem letzten drainRecords()
+    private static final Set<String> dirty = new LinkedHashSet<>();
+    // JSON-Dump-Intervall (im memory-Transport nur noch Debug-Snapshot)
+    private static volatile long snapshotIntervalMs = WRITE_INTERVAL_MS;
+
     // -------------------- helpers --------------------
     private static String ts() {
         SimpleDateFormat sdf = new SimpleDateFormat("yyyy-MM-dd'T'HH:mm:ss.SSSZ", Locale.US);
@@ -82,6 +89,7 @@ public class AdvBridge {
                 String mac = o.optString("address", null);
                 if (mac == null || mac.trim().isEmpty()) continue;
                 last.put(mac, o);
+                dirty.add(mac);
             }
             Log.i(TAG, "Preload OK: " + last.size() + " entries from existing ble_dump.json");
         } catch (Throwable t) {
@@ -199,6 +207,7 @@ public class AdvBridge {
                         obj.put("note", "raw");
 
                         last.put(mac, obj);
+                        dirty.add(mac);
                     }
 
                 } catch (Throwable t) {
@@ -219,7 +228,7 @@ public class AdvBridge {
             while (running) {
                 try {
                     synchronized (lock) { writeSnapshot(); }
-                    Thread.sleep(WRITE_INTERVAL_MS);
+                    Thread.sleep(snapshotIntervalMs);
                 } catch (Throwable t) {
                     Log.e(TAG, "writerLoop", t);
                 }
@@ -237,6 +246,51 @@ public class AdvBridge {
         Log.i(TAG, "ADV stopped");
     }
 
+    // -------------------- In-Memory-Transport (transport.py) --------------------
+    private static String field(JSONObject o, String key) {
+        if (o.isNull(key)) return "";
+        return o.optString(key, "").replace('\t', ' ').replace('\n', ' ');
+    }
+
+    /**
+     * Alle seit dem letzten Aufruf geänderten Einträge als Tab-Records:
+     * address, timestamp, name, rssi, adv_raw, gat_raw, packet_counter, log_raw
+     * (leeres Feld = null). Ersetzt das Parsen von ble_dump.json.
+     */
+    public static String[] drainRecords() {
+        synchronized (lock) {
+            String[] out = new String[dirty.size()];
+            int i = 0;
+            for (String mac : dirty) {
+                JSONObject o = last.get(mac);
+                if (o == null) continue;
+                out[i++] = field(o, "address") + "\t"
+                        + field(o, "timestamp") + "\t"
+                        + field(o, "name") + "\t"
+                        + field(o, "rssi") + "\t"
+                        + field(o, "adv_raw") + "\t"
+                        + field(o, "gat_raw") + "\t"
+                        + field(o, "packet_counter") + "\t"
+                        + field(o, "log_raw");
+            }
+            dirty.clear();
+            if (i == out.length) return out;
+            String[] trimmed = new String[i];
+            System.arraycopy(out, 0, trimmed, 0, i);
+            return trimmed;
+        }
+    }
+
+    // JSON-Dumps seltener, sobald der memory-Transport läuft
+    public static void setSnapshotIntervalMs(long ms) {
+        snapshotIntervalMs = Math.max(WRITE_INTERVAL_MS, ms);
+    }
+
+    static long getSnapshotIntervalMs() { return snapshotIntervalMs; }
+
+    // Aufrufer hält getLock()
+    static void markDirty(String mac) { dirty.add(mac); }
+
     // Optional: wenn du GATT später auf dieselbe Map mergen willst:
     static Object getLock() { return lock; }
     static Map<String, JSONObject> getStore() { return last; }
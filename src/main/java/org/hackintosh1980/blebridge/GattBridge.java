@@ -326,7 +326,7 @@ public class GattBridge {
                     //noinspection ResultOfMethodCallIgnored
                     tmp.renameTo(outFile);
 
-                    Thread.sleep(WRITE_INTERVAL_MS);
+                    Thread.sleep(AdvBridge.getSnapshotIntervalMs());
                 } catch (Throwable t) {
                     Log.e(TAG, "writer", t);
                 }
@@ -485,6 +485,7 @@ public class GattBridge {
                 obj.put("timestamp", ts());
 
                 store.put(addr, obj);
+                AdvBridge.markDirty(addr);
             } catch (Throwable ignored) {}
         }
     }
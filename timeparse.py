@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+timeparse.py – schnelles Parsen der Bridge-Zeitstempel
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+Die Bridges schreiben immer dasselbe Format:
+
+    2025-12-29T16:56:36.618+0000
+
+datetime.strptime() kostet pro Aufruf ~10 µs. Hier:
+
+    parse_ts(value)     eine Zeichenkette → epoch float
+                        (feste Positionen + Cache Minute/Zone → epoch)
+    parse_many(values)  Liste → Liste/Array; mit numpy vektorisiert über
+                        die Bytes des festen Formats
+
+Andere Formen (float-Strings, "Z", "+01:00", ohne Bruchteil) laufen über
+den langsamen Weg wie bisher.
+"""
+
+import calendar
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_DAY = {}                     # "2025-12-29" → epoch Mitternacht UTC
+_DAY_MAX = 4096
+
+# Layout der Bridges: Länge 28, Trenner an festen Positionen
+_FIXED_LEN = 28
+_SEP = {4: "-", 7: "-", 10: "T", 13: ":", 16: ":", 19: "."}
+
+
+def _midnight(prefix):
+    d = _DAY.get(prefix)
+    if d is None:
+        d = calendar.timegm((int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10]), 0, 0, 0))
+        if len(_DAY) >= _DAY_MAX:
+            _DAY.clear()
+        _DAY[prefix] = d
+    return d
+
+
+_MINUTE = {}                  # "2025-12-29T16:56" → epoch (UTC, ohne Zone)
+_TZ = {}                      # "+0100" → Sekunden, die zu addieren sind
+
+
+def _minute(prefix):
+    m = _midnight(prefix[:10]) + int(prefix[11:13]) * 3600 + int(prefix[14:16]) * 60
+    if len(_MINUTE) >= _DAY_MAX:
+        _MINUTE.clear()
+    _MINUTE[prefix] = m
+    return m
+
+
+def _zone(tz):
+    if len(tz) != 5 or tz[0] not in "+-":
+        raise ValueError(tz)
+    off = int(tz[1:3]) * 3600 + int(tz[3:5]) * 60
+    off = -off if tz[0] == "+" else off
+    _TZ[tz] = off
+    return off
+
+
+def _slow(value):
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_ts(value):
+    """Zeitstempel aus log.csv → epoch float (ISO der Bridges oder float)."""
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, bytes):
+        value = value.decode("ascii", "replace")
+
+    v = value
+    # häufigster Fall: exakt das Bridge-Layout → Minute + Zone aus dem Cache,
+    # "SS.fff" in einem float()
+    if len(v) == _FIXED_LEN and v[19] == "." and v[10] == "T":
+        base = _MINUTE.get(v[:16])
+        off = _TZ.get(v[23:])
+        try:
+            if base is None:
+                base = _minute(v[:16])
+            if off is None:
+                off = _zone(v[23:])
+            return base + off + float(v[17:23])
+        except ValueError:
+            pass
+
+    if len(v) >= 20 and v[10] == "T" and v[4] == "-" and v[13] == ":":
+        try:
+            # Bruchteil bis zum Zonen-Offset
+            i = 19
+            frac = 0.0
+            if v[19] == ".":
+                i = 20
+                while i < len(v) and v[i].isdigit():
+                    i += 1
+                frac = float(v[19:i])
+
+            tz = v[i:]
+            if len(tz) == 5 and tz[0] in "+-":
+                off = int(tz[1:3]) * 3600 + int(tz[3:5]) * 60
+                if tz[0] == "+":
+                    off = -off
+            elif tz == "Z":
+                off = 0
+            else:
+                return _slow(v)
+
+            return (
+                _midnight(v[:10])
+                + int(v[11:13]) * 3600 + int(v[14:16]) * 60 + int(v[17:19])
+                + frac + off
+            )
+        except ValueError:
+            pass
+
+    try:
+        return float(v)
+    except ValueError:
+        return _slow(v)
+
+
+# ------------------------------------------------------------
+# VEKTORISIERT
+# ------------------------------------------------------------
+def _days_from_civil(y, m, d):
+    """Tage seit 1970-01-01 (H. Hinnant), elementweise auf int-Arrays."""
+    y = y - (m <= 2)
+    era = np.floor_divide(y, 400)
+    yoe = y - era * 400
+    mp = (m + 9) % 12
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _parse_fixed(values):
+    """
+    Nur das feste Bridge-Layout → (epoch float64, ok-Maske).
+    Zeilen mit anderem Layout bekommen ok=False.
+    """
+    try:
+        raw = np.array(values, dtype=f"S{_FIXED_LEN}")
+    except (UnicodeEncodeError, TypeError, ValueError):
+        raw = np.array([v if isinstance(v, bytes) else str(v).encode("ascii", "replace")
+                        for v in values], dtype=f"S{_FIXED_LEN}")
+    u = raw.view(np.uint8).reshape(-1, _FIXED_LEN)
+
+    ok = np.ones(len(raw), dtype=bool)
+    for pos, ch in _SEP.items():
+        ok &= u[:, pos] == ord(ch)
+    ok &= (u[:, 23] == ord("+")) | (u[:, 23] == ord("-"))
+
+    def num(a, b):
+        out = u[:, a].astype(np.int64) - 48
+        for k in range(a + 1, b):
+            out *= 10
+            out += u[:, k]
+            out -= 48
+        return out
+
+    days = _days_from_civil(num(0, 4), num(5, 7), num(8, 10))
+    secs = days * 86400 + num(11, 13) * 3600 + num(14, 16) * 60 + num(17, 19)
+    off = num(24, 26) * 3600 + num(26, 28) * 60
+    off = np.where(u[:, 23] == ord("+"), -off, off)
+
+    return secs + off + num(20, 23) / 1000.0, ok
+
+
+def parse_many(values):
+    """
+    Viele Zeitstempel auf einmal → numpy float64-Array (NaN = unlesbar)
+    bzw. Liste (None = unlesbar) ohne numpy.
+    """
+    if np is None:
+        return [parse_ts(v) for v in values]
+
+    values = list(values)
+    if not values:
+        return np.zeros(0, dtype=np.float64)
+
+    out, ok = _parse_fixed(values)
+    for i in np.flatnonzero(~ok):
+        t = parse_ts(values[i])
+        out[i] = np.nan if t is None else t
+    return out
+
+
+def main():
+    import time
+    sample = ["2025-12-29T16:56:%02d.%03d+0000" % (i % 60, i % 1000) for i in range(1_000_000)]
+
+    t0 = time.perf_counter()
+    parse_many(sample)
+    t1 = time.perf_counter()
+    for s in sample[:100_000]:
+        parse_ts(s)
+    t2 = time.perf_counter()
+
+    print(f"parse_many: 1M in {t1 - t0:.3f} s  (numpy={'ja' if np is not None else 'nein'})")
+    print(f"parse_ts:   1M ≈ {(t2 - t1) * 10:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
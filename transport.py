@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+transport.py – optionaler In-Memory-Transport (Android)
+© 2025 Dominik Rosenthal (Hackintosh1980)
+
+Bridge → Decoder → UI ohne JSON-Roundtrips:
+
+    AdvBridge/GattBridge (Java)
+        └─ drainRecords()  ── AndroidPump ──▶ RAW_RING  (bounded, Lock)
+                                                  └─ Decoder
+                                                        └─ FRAMES ──▶ DataBuffer (UI)
+
+ble_dump.json und decoded.json (bzw. decoded.bin bei decoded_format
+"binary") bleiben nur noch periodische Debug-Snapshots
+(config: debug_snapshot_interval).
+Aktiv nur mit config "transport": "memory" UND laufender Android-Bridge.
+"""
+
+import threading
+import time
+from collections import deque
+
+import config
+
+
+# ------------------------------------------------------------
+# RAW-RING (Bridge → Decoder)
+# ------------------------------------------------------------
+class RawRing:
+    """Begrenzter Ring roher Advertisement-Records (älteste fliegen raus)."""
+
+    def __init__(self, maxlen=4096):
+        self._buf = deque(maxlen=maxlen)
+        self._cond = threading.Condition(threading.Lock())
+        self.dropped = 0
+
+    def push_many(self, records):
+        if not records:
+            return
+        with self._cond:
+            overflow = len(self._buf) + len(records) - self._buf.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+            self._buf.extend(records)
+            self._cond.notify_all()
+
+    def push(self, record):
+        self.push_many([record])
+
+    def drain(self):
+        with self._cond:
+            out = list(self._buf)
+            self._buf.clear()
+        return out
+
+    def wait(self, timeout):
+        """Blockiert bis neue Records da sind (True) oder Timeout (False)."""
+        with self._cond:
+            if self._buf:
+                return True
+            return self._cond.wait_for(lambda: bool(self._buf), timeout)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._buf)
+
+
+# ------------------------------------------------------------
+# FRAME-QUEUE (Decoder → UI)
+# ------------------------------------------------------------
+class FrameQueue:
+    """
+    Thread-sichere Übergabe decodierter Frames.
+    Die UI will nur den neuesten Stand → latest wins, kein Rückstau.
+    """
+
+    def __init__(self):
+        self._lock = threading.Condition(threading.Lock())
+        self._frames = None
+        self._seq = 0
+        self._taken = 0
+
+    def publish(self, frames):
+        with self._lock:
+            self._frames = frames
+            self._seq += 1
+            self._lock.notify_all()
+
+    def wait(self, timeout):
+        """Blockiert bis ungelesene Frames da sind (True) oder Timeout (False)."""
+        with self._lock:
+            return self._lock.wait_for(lambda: self._seq != self._taken, timeout)
+
+    def take(self):
+        """Neueste Frames seit dem letzten take() – sonst None."""
+        with self._lock:
+            if self._seq == self._taken:
+                return None
+            self._taken = self._seq
+            return self._frames
+
+    @property
+    def seq(self):
+        return self._seq
+
+
+RAW_RING = RawRing()
+FRAMES = FrameQueue()
+
+_active = False
+_pump = None
+
+
+def is_active():
+    return _active
+
+
+# ------------------------------------------------------------
+# ANDROID PUMP (Java-Store → RAW_RING)
+# ------------------------------------------------------------
+_FIELDS = ("address", "timestamp", "name", "rssi",
+           "adv_raw", "gat_raw", "packet_counter", "log_raw")
+
+
+def parse_record(line):
+    """Tab-separierter Record aus AdvBridge.drainRecords() → Dump-Eintrag."""
+    parts = line.split("\t")
+    if len(parts) != len(_FIELDS):
+        return None
+
+    e = {k: (v if v != "" else None) for k, v in zip(_FIELDS, parts)}
+    if not e["address"]:
+        return None
+
+    for k in ("rssi", "packet_counter"):
+        if e[k] is not None:
+            try:
+                e[k] = int(e[k])
+            except ValueError:
+                e[k] = None
+    e["note"] = "raw"
+    return e
+
+
+class AndroidPump(threading.Thread):
+    def __init__(self, poll_interval=0.2):
+        super().__init__(daemon=True)
+        self.poll_interval = poll_interval
+        self.running = True
+
+    def run(self):
+        from jnius import autoclass
+        AdvBridge = autoclass("org.hackintosh1980.blebridge.AdvBridge")
+
+        while self.running:
+            try:
+                lines = AdvBridge.drainRecords()
+                recs = [parse_record(l) for l in (lines or ())]
+                RAW_RING.push_many([r for r in recs if r])
+            except Exception as e:
+                print("[Transport] pump error:", e)
+            time.sleep(self.poll_interval)
+
+    def stop(self):
+        self.running = False
+
+
+def start_android():
+    """Von core.start() nach dem Bridge-Start (nur Android)."""
+    global _active, _pump
+
+    if config.get_transport() != "memory" or _pump:
+        return False
+
+    try:
+        from jnius import autoclass
+        AdvBridge = autoclass("org.hackintosh1980.blebridge.AdvBridge")
+        AdvBridge.setSnapshotIntervalMs(int(config.get_debug_snapshot_interval() * 1000))
+    except Exception as e:
+        print("[Transport] memory transport unavailable:", e)
+        return False
+
+    _pump = AndroidPump()
+    _pump.start()
+    _active = True
+    print("[Transport] memory transport aktiv")
+    return True
+
+
+def stop():
+    global _active, _pump
+    if _pump:
+        _pump.stop()
+        _pump = None
+    _active = False
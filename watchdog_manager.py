@@ -1,11 +1,9 @@
 import os
 import time
-import json
 import config
+from dump_snapshot import get_snapshot
 
-BASE = os.path.dirname(os.path.abspath(__file__))
-DATA = os.path.join(BASE, "data")
-RAW_PATH = os.path.join(DATA, "ble_dump.json")
+RAW_PATH = os.path.join(config.DATA, "ble_dump.json")
 
 
 class DumpWatchdog:
@@ -28,20 +26,12 @@ class DumpWatchdog:
         self.running = False
 
     def _load(self):
-        if not os.path.exists(RAW_PATH):
-            return None
-        try:
-            with open(RAW_PATH, "r", encoding="utf-8") as f:
-                d = json.load(f)
-            return d if isinstance(d, list) else None
-        except Exception:
-            return None
+        snap = get_snapshot(RAW_PATH)
+        return snap if snap.valid else None
 
     def _find(self, dump, mac):
-        for e in dump:
-            if isinstance(e, dict) and e.get("address") == mac:
-                return e
-        return None
+        # MAC-Index aus dem Snapshot → O(1)
+        return dump.get(mac)
 
     # --------------------------------------------------------
     # EINHEITLICHE KANAL-LOGIK: Bewegung = Leben